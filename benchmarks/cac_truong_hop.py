@@ -0,0 +1,315 @@
+"""
+Danh sách trường hợp đo: sinh khóa, mã hóa, giải mã, ký, xác minh cho RSA,
+ElGamal, ECDH + AES-GCM và ECDSA/EdDSA theo kích thước khóa, đường cong và kích
+thước thông điệp.
+
+Mỗi trường hợp là một BenchCase; setup() chạy ngoài phần đo và trả về hàm
+không tham số được gọi lặp lại khi đo.
+"""
+import functools
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+for _d in (ROOT / "he_mat_ElGamal", ROOT / "he_mat_RSA", ROOT):
+    if str(_d) not in sys.path:
+        sys.path.insert(0, str(_d))
+
+
+class BenchCase:
+    __slots__ = ("scheme", "op", "param", "setup", "slow", "nbytes")
+
+    def __init__(self, scheme: str, op: str, param: str, setup, slow: bool = False, nbytes: int = 0):
+        self.scheme = scheme
+        self.op = op
+        self.param = param
+        self.setup = setup
+        self.slow = slow
+        self.nbytes = nbytes  # số byte thông điệp mỗi lần gọi, để tính MB/s
+
+    @property
+    def id(self) -> str:
+        return f"{self.scheme}/{self.op}/{self.param}"
+
+
+def _cung_hoa(fn):
+    """Wrap fn so it runs with the hardened modexp engine (luy_thua_an_toan)."""
+    from luy_thua_an_toan import CHE_DO_AN_TOAN, dung_che_do
+
+    def run():
+        with dung_che_do(CHE_DO_AN_TOAN):
+            return fn()
+    return run
+
+
+def _message(size: int) -> bytes:
+    # ASCII để giai_ma_aes (trả về str) giải mã được
+    return (b"abcdefghijklmnopqrstuvwxyz012345" * (size // 32 + 1))[:size]
+
+
+# --- RSA ---
+
+@functools.lru_cache(maxsize=None)
+def _rsa_key(bits: int):
+    from Crypto.PublicKey import RSA
+    return RSA.generate(bits)
+
+
+def _rsa_cases():
+    from Crypto.Cipher import PKCS1_OAEP
+    from Crypto.Hash import SHA256
+    from Crypto.PublicKey import RSA
+    from Crypto.Signature import pss
+
+    cases = []
+    for bits in (1024, 2048):
+        cases.append(BenchCase("rsa", "keygen", f"{bits}", lambda b=bits: (lambda: RSA.generate(b)), slow=True))
+
+    for bits in (1024, 2048, 3072):
+        def enc(b=bits):
+            cipher = PKCS1_OAEP.new(_rsa_key(b).publickey())
+            msg = _message(32)
+            return lambda: cipher.encrypt(msg)
+
+        def dec(b=bits):
+            key = _rsa_key(b)
+            ct = PKCS1_OAEP.new(key.publickey()).encrypt(_message(32))
+            cipher = PKCS1_OAEP.new(key)
+            return lambda: cipher.decrypt(ct)
+
+        def dec_raw(b=bits):
+            from he_mat_RSA import giai_ma
+            key = _rsa_key(b)
+            c = pow(int.from_bytes(_message(32), "big"), key.e, key.n)
+            return lambda: giai_ma(c, (key.n, key.d))
+
+        def dec_raw_hardened(b=bits):
+            from he_mat_RSA import giai_ma
+            key = _rsa_key(b)
+            c = pow(int.from_bytes(_message(32), "big"), key.e, key.n)
+            return _cung_hoa(lambda: giai_ma(c, (key.n, key.d, key.e)))
+
+        def dec_crt(b=bits):
+            from giai_ma_CRT_RSA import KhoaBiMatCRT, giai_ma_crt
+            key = _rsa_key(b)
+            crt = KhoaBiMatCRT(key)
+            c = pow(int.from_bytes(_message(32), "big"), key.e, key.n)
+            return lambda: giai_ma_crt(c, crt)
+
+        def sign(b=bits):
+            signer = pss.new(_rsa_key(b))
+            h = SHA256.new(_message(1024))
+            return lambda: signer.sign(h)
+
+        def verify(b=bits):
+            key = _rsa_key(b)
+            msg = _message(1024)
+            sig = pss.new(key).sign(SHA256.new(msg))
+            verifier = pss.new(key.publickey())
+            return lambda: verifier.verify(SHA256.new(msg), sig)
+
+        cases += [
+            BenchCase("rsa", "encrypt", f"{bits}/msg32", enc, nbytes=32),
+            BenchCase("rsa", "decrypt", f"{bits}/msg32", dec, nbytes=32),
+            BenchCase("rsa", "decrypt-raw", f"{bits}", dec_raw),
+            BenchCase("rsa", "decrypt-raw-hardened", f"{bits}", dec_raw_hardened),
+            BenchCase("rsa", "decrypt-crt", f"{bits}", dec_crt),
+            BenchCase("rsa", "sign", f"{bits}/msg1024", sign, nbytes=1024),
+            BenchCase("rsa", "verify", f"{bits}/msg1024", verify, nbytes=1024),
+        ]
+    return cases
+
+
+# --- ElGamal ---
+
+@functools.lru_cache(maxsize=None)
+def _elgamal_keys(group: str):
+    from bang_tinh_truoc_ElGamal import attach_precomputation
+    from doc_key_ElGamal import load_elgamal_keypair
+    from sinh_key_ElGamal import generate_elgamal_key_from_group
+
+    if group == "file256":
+        return load_elgamal_keypair(ROOT / "he_mat_ElGamal")
+    private_key = generate_elgamal_key_from_group(group)
+    public_key = private_key.publickey()
+    precomp = attach_precomputation(public_key)
+    attach_precomputation(private_key, shared=precomp)
+    return private_key, public_key
+
+
+def _elgamal_cases():
+    from bang_tinh_truoc_ElGamal import get_precomputation
+    from he_mat_ElGamal import elgamal_encrypt, elgamal_decrypt, elgamal_sign, elgamal_verify
+    from ma_hoa_luong_ElGamal import elgamal_encrypt_bytes, elgamal_decrypt_bytes
+    from sinh_key_ElGamal import generate_elgamal_key, generate_elgamal_key_from_group
+
+    cases = [
+        BenchCase("elgamal", "keygen", "safe-prime256", lambda: (lambda: generate_elgamal_key(256, 1)), slow=True),
+        BenchCase("elgamal", "keygen", "ffdhe2048", lambda: (lambda: generate_elgamal_key_from_group("ffdhe2048"))),
+    ]
+    for group in ("file256", "ffdhe2048", "ffdhe3072"):
+        def enc(g=group):
+            _, pub = _elgamal_keys(g)
+            precomp = get_precomputation(pub)
+            precomp.pow_g(2)  # dựng bảng ngoài phần đo
+            precomp.pow_y(2)
+            return lambda: elgamal_encrypt(pub, 123456789)
+
+        def dec(g=group):
+            priv, pub = _elgamal_keys(g)
+            c1, c2 = elgamal_encrypt(pub, 123456789)
+            return lambda: elgamal_decrypt(priv, c1, c2)
+
+        def dec_hardened(g=group):
+            priv, pub = _elgamal_keys(g)
+            c1, c2 = elgamal_encrypt(pub, 123456789)
+            return _cung_hoa(lambda: elgamal_decrypt(priv, c1, c2))
+
+        def sign_hardened(g=group):
+            priv, _ = _elgamal_keys(g)
+            msg = _message(1024)
+            return _cung_hoa(lambda: elgamal_sign(priv, msg))
+
+        def sign(g=group):
+            priv, _ = _elgamal_keys(g)
+            msg = _message(1024)
+            return lambda: elgamal_sign(priv, msg)
+
+        def verify(g=group):
+            priv, pub = _elgamal_keys(g)
+            msg = _message(1024)
+            sig = elgamal_sign(priv, msg)
+            return lambda: elgamal_verify(pub, msg, sig)
+
+        cases += [
+            BenchCase("elgamal", "encrypt", f"{group}/int", enc),
+            BenchCase("elgamal", "decrypt", f"{group}/int", dec),
+            BenchCase("elgamal", "decrypt-hardened", f"{group}/int", dec_hardened),
+            BenchCase("elgamal", "sign", f"{group}/msg1024", sign, nbytes=1024),
+            BenchCase("elgamal", "verify", f"{group}/msg1024", verify, nbytes=1024),
+            BenchCase("elgamal", "sign-hardened", f"{group}/msg1024", sign_hardened, nbytes=1024),
+        ]
+
+    for size in (1024, 1024 * 1024):
+        def henc(s=size):
+            _, pub = _elgamal_keys("ffdhe2048")
+            msg = _message(s)
+            return lambda: elgamal_encrypt_bytes(pub, msg)
+
+        def hdec(s=size):
+            priv, pub = _elgamal_keys("ffdhe2048")
+            blob = elgamal_encrypt_bytes(pub, _message(s))
+            return lambda: elgamal_decrypt_bytes(priv, blob)
+
+        cases += [
+            BenchCase("elgamal", "hybrid-encrypt", f"ffdhe2048/msg{size}", henc, nbytes=size),
+            BenchCase("elgamal", "hybrid-decrypt", f"ffdhe2048/msg{size}", hdec, nbytes=size),
+        ]
+    return cases
+
+
+# --- ECDH + AES-GCM ---
+
+def _ecc_cases():
+    from he_mat_ECC import DUONG_CONG_ECDH, tao_cap_khoa, tinh_khoa_chung_ecdh, ma_hoa_aes, giai_ma_aes
+    from ma_hoa_luong_AES import ma_hoa_bytes, giai_ma_bytes
+
+    alice = tao_cap_khoa()
+    bob = tao_cap_khoa()
+    key = tinh_khoa_chung_ecdh(alice, bob.public_key())
+
+    cases = []
+    for curve in DUONG_CONG_ECDH:
+        def ecdh(c=curve):
+            a, b = tao_cap_khoa(c), tao_cap_khoa(c)
+            return lambda: tinh_khoa_chung_ecdh(a, b.public_key())
+
+        cases += [
+            BenchCase("ecc", "keygen", curve, lambda c=curve: functools.partial(tao_cap_khoa, c)),
+            BenchCase("ecc", "ecdh", curve, ecdh),
+        ]
+    for size in (64, 4096, 1024 * 1024):
+        def enc(s=size):
+            msg = _message(s)
+            return lambda: ma_hoa_aes(key, msg)
+
+        def dec(s=size):
+            nonce, ct, tag = ma_hoa_aes(key, _message(s))
+            return lambda: giai_ma_aes(key, nonce, ct, tag)
+
+        cases += [
+            BenchCase("ecc", "encrypt", f"P-256/msg{size}", enc, nbytes=size),
+            BenchCase("ecc", "decrypt", f"P-256/msg{size}", dec, nbytes=size),
+        ]
+
+    def senc():
+        msg = _message(8 * 1024 * 1024)
+        return lambda: ma_hoa_bytes(key, msg)
+
+    def sdec():
+        blob = ma_hoa_bytes(key, _message(8 * 1024 * 1024))
+        return lambda: giai_ma_bytes(key, blob)
+
+    cases += [
+        BenchCase("ecc", "stream-encrypt", f"P-256/msg{8 * 1024 * 1024}", senc, nbytes=8 * 1024 * 1024),
+        BenchCase("ecc", "stream-decrypt", f"P-256/msg{8 * 1024 * 1024}", sdec, nbytes=8 * 1024 * 1024),
+    ]
+    return cases
+
+
+# --- ECDSA ---
+
+def _ecdsa_cases():
+    from so_do_chu_ky_ECDSA import DUONG_CONG_CHU_KY, tao_cap_khoa_ecdsa, tao_chu_ky_ecdsa, xac_minh_chu_ky_ecdsa
+
+    private_key, public_key = tao_cap_khoa_ecdsa()
+    cases = [BenchCase("ecdsa", "keygen", "P-256", lambda: tao_cap_khoa_ecdsa)]
+    # Các đường cong khác (P-384/P-521, Ed25519/Ed448) chỉ đo với thông điệp ngắn
+    for curve in (c for c in DUONG_CONG_CHU_KY if c != "P-256"):
+        def csign(c=curve):
+            priv, _ = tao_cap_khoa_ecdsa(c)
+            msg = _message(64)
+            return lambda: tao_chu_ky_ecdsa(priv, msg)
+
+        def cverify(c=curve):
+            priv, pub = tao_cap_khoa_ecdsa(c)
+            msg = _message(64)
+            sig = tao_chu_ky_ecdsa(priv, msg)
+            return lambda: xac_minh_chu_ky_ecdsa(pub, msg, sig)
+
+        cases += [
+            BenchCase("ecdsa", "keygen", curve, lambda c=curve: functools.partial(tao_cap_khoa_ecdsa, c)),
+            BenchCase("ecdsa", "sign", f"{curve}/msg64", csign, nbytes=64),
+            BenchCase("ecdsa", "verify", f"{curve}/msg64", cverify, nbytes=64),
+        ]
+    for size in (64, 4096, 1024 * 1024):
+        def sign(s=size):
+            msg = _message(s).decode("ascii")
+            return lambda: tao_chu_ky_ecdsa(private_key, msg)
+
+        def verify(s=size):
+            msg = _message(s).decode("ascii")
+            sig = tao_chu_ky_ecdsa(private_key, msg)
+            return lambda: xac_minh_chu_ky_ecdsa(public_key, msg, sig)
+
+        cases += [
+            BenchCase("ecdsa", "sign", f"P-256/msg{size}", sign, nbytes=size),
+            BenchCase("ecdsa", "verify", f"P-256/msg{size}", verify, nbytes=size),
+        ]
+    return cases
+
+
+SCHEMES = {
+    "rsa": _rsa_cases,
+    "elgamal": _elgamal_cases,
+    "ecc": _ecc_cases,
+    "ecdsa": _ecdsa_cases,
+}
+
+
+def tat_ca_truong_hop(schemes=None) -> list:
+    cases = []
+    for name, factory in SCHEMES.items():
+        if schemes is None or name in schemes:
+            cases.extend(factory())
+    return cases
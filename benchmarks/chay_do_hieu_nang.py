@@ -0,0 +1,194 @@
+"""
+Bộ đo hiệu năng thống nhất cho mọi hệ mật trong dự án.
+
+Ví dụ:
+    python benchmarks/chay_do_hieu_nang.py                          # đo tất cả, in bảng
+    python benchmarks/chay_do_hieu_nang.py --scheme ecdsa --quick   # chỉ ECDSA, đo nhanh
+    python benchmarks/chay_do_hieu_nang.py -o ket_qua.json          # ghi JSON
+    python benchmarks/chay_do_hieu_nang.py --save-baseline          # lưu làm mốc so sánh
+    python benchmarks/chay_do_hieu_nang.py --compare                # so với mốc, mã thoát 1 nếu chậm đi
+
+Mỗi trường hợp báo cáo ops/s, độ trễ p50/p90/p99, và bộ nhớ Python cấp phát
+đỉnh (tracemalloc; không tính bộ nhớ do thư viện C cấp phát trực tiếp).
+"""
+import argparse
+import datetime
+import gc
+import json
+import platform
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from cac_truong_hop import SCHEMES, tat_ca_truong_hop
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_THRESHOLD = 0.10  # chậm đi hơn 10% ops/s so với mốc thì coi là hồi quy
+
+
+def do_mot_truong_hop(case, min_time: float, min_iters: int, max_iters: int, mem_iters: int) -> dict:
+    fn = case.setup()
+    fn()  # khởi động (cache, bảng tính trước, import lười)
+
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        latencies = []
+        start = time.perf_counter()
+        while len(latencies) < max_iters:
+            t0 = time.perf_counter_ns()
+            fn()
+            latencies.append(time.perf_counter_ns() - t0)
+            if len(latencies) >= min_iters and time.perf_counter() - start >= min_time:
+                break
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        for _ in range(mem_iters):
+            fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    total_s = sum(latencies) / 1e9
+    if len(latencies) >= 2:
+        q = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p90, p99 = q[49], q[89], q[98]
+    else:
+        p50 = p90 = p99 = latencies[0]
+    ops = len(latencies) / total_s if total_s else float("inf")
+    result = {
+        "id": case.id,
+        "scheme": case.scheme,
+        "op": case.op,
+        "param": case.param,
+        "iterations": len(latencies),
+        "ops_per_sec": ops,
+        "mean_us": statistics.fmean(latencies) / 1e3,
+        "p50_us": p50 / 1e3,
+        "p90_us": p90 / 1e3,
+        "p99_us": p99 / 1e3,
+        "peak_mem_kib": peak / 1024,
+    }
+    if case.nbytes:
+        result["mb_per_sec"] = ops * case.nbytes / 1e6
+    return result
+
+
+def thong_tin_moi_truong() -> dict:
+    try:
+        import Crypto
+        pycryptodome = Crypto.__version__
+    except ImportError:
+        pycryptodome = None
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "pycryptodome": pycryptodome,
+    }
+
+
+def so_sanh_voi_moc(results, baseline: dict, threshold: float):
+    """Trả về danh sách (id, ops mốc, ops hiện tại, tỉ lệ) của các trường hợp chậm đi quá ngưỡng."""
+    base = {r["id"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        old = base.get(r["id"])
+        if old is None or not old.get("ops_per_sec"):
+            continue
+        ratio = r["ops_per_sec"] / old["ops_per_sec"]
+        if ratio < 1 - threshold:
+            regressions.append((r["id"], old["ops_per_sec"], r["ops_per_sec"], ratio))
+    return regressions
+
+
+def in_bang(results, baseline: dict | None = None):
+    base = {r["id"]: r for r in (baseline or {}).get("results", [])}
+    header = f"{'trường hợp':<44} {'ops/s':>11} {'p50 µs':>11} {'p99 µs':>11} {'MB/s':>9} {'đỉnh KiB':>10}"
+    if base:
+        header += f" {'so mốc':>8}"
+    print(header)
+    for r in results:
+        line = (f"{r['id']:<44} {r['ops_per_sec']:>11.1f} {r['p50_us']:>11.1f} {r['p99_us']:>11.1f} "
+                f"{r.get('mb_per_sec', 0):>9.1f} {r['peak_mem_kib']:>10.1f}")
+        old = base.get(r["id"])
+        if old and old.get("ops_per_sec"):
+            line += f" {r['ops_per_sec'] / old['ops_per_sec']:>7.2f}x"
+        print(line, flush=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Đo hiệu năng RSA, ElGamal, ECDH+AES-GCM, ECDSA.")
+    parser.add_argument("--scheme", action="append", choices=sorted(SCHEMES),
+                        help="Chỉ đo lược đồ này (có thể lặp lại)")
+    parser.add_argument("--filter", help="Biểu thức chính quy lọc theo id trường hợp")
+    parser.add_argument("--quick", action="store_true", help="Đo nhanh, bỏ các trường hợp chậm (sinh khóa)")
+    parser.add_argument("--min-time", type=float, default=None, help="Thời gian đo tối thiểu mỗi trường hợp (s)")
+    parser.add_argument("--min-iters", type=int, default=5)
+    parser.add_argument("--max-iters", type=int, default=100000)
+    parser.add_argument("--mem-iters", type=int, default=3, help="Số lần gọi khi đo bộ nhớ đỉnh")
+    parser.add_argument("--list", action="store_true", help="Chỉ liệt kê các trường hợp")
+    parser.add_argument("-o", "--output", help="Ghi kết quả JSON vào file")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="File JSON mốc so sánh")
+    parser.add_argument("--save-baseline", action="store_true", help="Ghi kết quả làm mốc so sánh")
+    parser.add_argument("--compare", action="store_true", help="So với mốc; mã thoát 1 nếu có hồi quy")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Tỉ lệ ops/s giảm tối đa chấp nhận được (mặc định 0.10)")
+    args = parser.parse_args(argv)
+
+    cases = tat_ca_truong_hop(args.scheme)
+    if args.quick:
+        cases = [c for c in cases if not c.slow]
+    if args.filter:
+        pattern = re.compile(args.filter)
+        cases = [c for c in cases if pattern.search(c.id)]
+    if args.list:
+        for c in cases:
+            print(c.id + (" (chậm)" if c.slow else ""))
+        return 0
+
+    min_time = args.min_time if args.min_time is not None else (0.2 if args.quick else 1.0)
+    baseline = None
+    baseline_path = Path(args.baseline)
+    if args.compare:
+        if baseline_path.exists():
+            baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        else:
+            print(f"Không tìm thấy mốc {baseline_path}; bỏ qua so sánh.", file=sys.stderr)
+
+    results = []
+    for case in cases:
+        results.append(do_mot_truong_hop(case, min_time, args.min_iters, args.max_iters, args.mem_iters))
+        print(f"  đã đo {case.id}", file=sys.stderr, flush=True)
+
+    in_bang(results, baseline)
+    report = {"environment": thong_tin_moi_truong(), "settings": {"min_time": min_time, "quick": args.quick},
+              "results": results}
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Đã lưu mốc: {baseline_path}", file=sys.stderr)
+
+    if baseline is not None:
+        regressions = so_sanh_voi_moc(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nHỒI QUY (chậm hơn {args.threshold:.0%} so với mốc):")
+            for case_id, old, new, ratio in regressions:
+                print(f"  {case_id}: {old:.1f} -> {new:.1f} ops/s ({ratio:.2f}x)")
+            return 1
+        print("\nKhông có hồi quy so với mốc.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Kiểm tra ngân sách thời gian khởi động của `python -m mat_ma verify ecdsa`.
+
+Chạy lệnh xác minh nhiều lần với `python -X importtime`, lấy lần import nhanh
+nhất, rồi so với ngân sách. Mã thoát 1 nếu vượt ngân sách hoặc nếu lệnh import
+module không cần cho việc xác minh (asyncio, tiến trình con, module ElGamal...).
+
+Ví dụ:
+    python benchmarks/do_khoi_dong.py
+    python benchmarks/do_khoi_dong.py --budget-ms 80 --runs 10 --json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BUDGET_MS = 120.0
+DEFAULT_RUNS = 7
+# Những module này không được phép xuất hiện khi chỉ xác minh một chữ ký
+FORBIDDEN = ("asyncio", "concurrent.futures", "multiprocessing", "he_mat_ElGamal",
+             "doc_key_ElGamal", "he_mat_ECC", "Crypto.PublicKey.RSA", "Crypto.PublicKey.ElGamal")
+
+
+def _chay(args, **kwargs):
+    env = dict(os.environ, PYTHONPATH=str(ROOT) + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    return subprocess.run([sys.executable, *args], env=env, capture_output=True, **kwargs)
+
+
+def phan_tich_importtime(stderr: str):
+    """Return (total self time in µs, set of module names) from -X importtime output."""
+    total = 0
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        total += int(self_us)
+        modules.add(name.strip())
+    return total, modules
+
+
+def do_khoi_dong(runs: int = DEFAULT_RUNS) -> dict:
+    """Measure cold-start import time and wall time of a single ECDSA verify."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        message = tmp / "thong_diep.txt"
+        message.write_bytes(b"Meet at midnight\n")
+        _chay(["-m", "mat_ma", "keygen", "ecdsa", "--out", str(tmp)], check=True)
+        public = str(tmp / "ecdsa-public.pem")
+        _chay(["-m", "mat_ma", "sign", "ecdsa", str(message), "--key", str(tmp / "ecdsa-private.pem")], check=True)
+
+        cmd = ["-m", "mat_ma", "verify", "ecdsa", str(message), "--key", public, "-q"]
+        import_us = []
+        walls = []
+        modules = set()
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            proc = _chay(cmd, text=True)
+            walls.append(time.perf_counter() - t0)
+            if proc.returncode != 0:
+                raise RuntimeError(f"verify thất bại (mã {proc.returncode}): {proc.stderr[-500:]}")
+            total, names = phan_tich_importtime(_chay(["-X", "importtime", *cmd], text=True).stderr)
+            import_us.append(total)
+            modules |= names
+
+        baseline = []
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            _chay(["-c", "pass"])
+            baseline.append(time.perf_counter() - t0)
+
+    return {"runs": runs, "import_ms": min(import_us) / 1e3, "wall_ms": min(walls) * 1e3,
+            "interpreter_ms": min(baseline) * 1e3, "modules": len(modules),
+            "forbidden": sorted(m for m in modules if m in FORBIDDEN or m.startswith(tuple(f + "." for f in FORBIDDEN)))}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Kiểm tra ngân sách khởi động của lệnh verify.")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Tổng thời gian import tối đa (mặc định {DEFAULT_BUDGET_MS:.0f} ms)")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--json", action="store_true", help="In kết quả dạng JSON")
+    args = parser.parse_args(argv)
+
+    result = do_khoi_dong(args.runs)
+    result["budget_ms"] = args.budget_ms
+    result["ok"] = result["import_ms"] <= args.budget_ms and not result["forbidden"]
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print(f"verify ecdsa: import {result['import_ms']:.1f} ms ({result['modules']} module), "
+              f"toàn bộ lệnh {result['wall_ms']:.1f} ms, trình thông dịch rỗng {result['interpreter_ms']:.1f} ms")
+        print(f"ngân sách import {args.budget_ms:.0f} ms: {'đạt' if result['import_ms'] <= args.budget_ms else 'VƯỢT'}")
+        if result["forbidden"]:
+            print("module không cần thiết bị import: " + ", ".join(result["forbidden"]))
+    return 0 if result["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Bảng ops/s theo đường cong: sinh khóa, ECDH, ký và xác minh cho P-256, P-384,
+P-521, X25519/X448 (ECDH) và Ed25519/Ed448 (EdDSA). Dùng để chọn đường cong
+cho từng tenant theo thông lượng đo được trên chính máy chạy dịch vụ.
+
+Ví dụ:
+    python benchmarks/so_sanh_duong_cong.py
+    python benchmarks/so_sanh_duong_cong.py --min-time 1 -o duong_cong.json
+"""
+import argparse
+import json
+import sys
+
+from cac_truong_hop import tat_ca_truong_hop
+from chay_do_hieu_nang import do_mot_truong_hop, thong_tin_moi_truong
+
+# Cột của bảng: (scheme, op) của trường hợp đo
+COT = (("ecc", "keygen"), ("ecc", "ecdh"), ("ecdsa", "keygen"), ("ecdsa", "sign"), ("ecdsa", "verify"))
+# Hàng của bảng: cặp đường cong cùng độ an toàn dùng chung một hàng
+HANG = (("P-256", "P-256"), ("P-384", "P-384"), ("P-521", "P-521"),
+        ("Curve25519", "Ed25519"), ("Curve448", "Ed448"))
+
+
+def _duong_cong(case) -> str:
+    return case.param.split("/")[0]
+
+
+def do_theo_duong_cong(min_time: float = 0.3, min_iters: int = 5) -> list:
+    """Run every keygen/ecdh/sign/verify case that has a short message, one per curve."""
+    results = []
+    for case in tat_ca_truong_hop(["ecc", "ecdsa"]):
+        if (case.scheme, case.op) not in COT or case.nbytes not in (0, 64):
+            continue
+        result = do_mot_truong_hop(case, min_time, min_iters, 100000, 1)
+        result["curve"] = _duong_cong(case)
+        results.append(result)
+    return results
+
+
+def in_bang_duong_cong(results):
+    ops = {(r["scheme"], r["op"], r["curve"]): r["ops_per_sec"] for r in results}
+    print(f"{'đường cong':<20}" + "".join(f" {s + ' ' + o:>14}" for s, o in COT))
+    for ecdh_curve, sig_curve in HANG:
+        name = ecdh_curve if ecdh_curve == sig_curve else f"{ecdh_curve}/{sig_curve}"
+        cells = []
+        for scheme, op in COT:
+            value = ops.get((scheme, op, ecdh_curve if scheme == "ecc" else sig_curve))
+            cells.append(f" {value:>14.1f}" if value is not None else f" {'-':>14}")
+        print(f"{name:<20}" + "".join(cells))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="So sánh ops/s giữa các đường cong ECC.")
+    parser.add_argument("--min-time", type=float, default=0.3, help="Thời gian đo tối thiểu mỗi ô (s)")
+    parser.add_argument("--min-iters", type=int, default=5)
+    parser.add_argument("-o", "--output", help="Ghi kết quả JSON vào file")
+    args = parser.parse_args(argv)
+
+    results = do_theo_duong_cong(args.min_time, args.min_iters)
+    in_bang_duong_cong(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"environment": thong_tin_moi_truong(), "results": results}, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+import atexit
+import os
+import statistics
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from Crypto.PublicKey import ECC
+from Crypto.Signature import DSS
+
+from so_do_chu_ky_ECDSA import (CURVE_NAME, HASH_ALGORITHM, HASH_THEO_DUONG_CONG, hash_cua_khoa,
+                                tao_cap_khoa_ecdsa, tao_chu_ky_ecdsa, xac_minh_chu_ky_ecdsa)
+
+# --- KÝ / XÁC MINH ECDSA THEO LÔ ---
+#
+# tao_chu_ky_ecdsa / xac_minh_chu_ky_ecdsa tạo lại DSS.new(...) và mã hóa str
+# cho mỗi thông điệp. Ở đây đối tượng DSS được tạo một lần cho mỗi khóa và giữ
+# trong bộ nhớ đệm LRU có giới hạn (bộ ký giữ khóa bí mật, nên không giữ quá
+# MAX_CACHED_KEYS khóa); thông điệp có thể là bytes, đối tượng hash đã tính,
+# hoặc digest (bytes) đã băm sẵn. Hàm băm theo đường cong của khóa
+# (HASH_THEO_DUONG_CONG: SHA256 / SHA384 / SHA512 cho P-256 / P-384 / P-521).
+# Xác minh có thể chia ra nhiều tiến trình, dùng lại một pool cho mọi lần gọi.
+
+DEFAULT_CHUNK = 256
+MAX_CACHED_KEYS = 64
+
+_signers = OrderedDict()
+_verifiers = OrderedDict()
+_cache_lock = threading.Lock()
+_OID = {h: h.new().oid for h in HASH_THEO_DUONG_CONG.values()}
+
+
+class DigestDaBam:
+    """Hash-object stand-in for a pre-computed digest of hash_algo, accepted by DSS."""
+
+    __slots__ = ("_digest", "oid", "digest_size")
+
+    def __init__(self, digest: bytes, hash_algo=HASH_ALGORITHM):
+        if len(digest) != hash_algo.digest_size:
+            raise ValueError(f"Digest phải dài {hash_algo.digest_size} bytes")
+        self._digest = bytes(digest)
+        self.oid = _OID[hash_algo]
+        self.digest_size = hash_algo.digest_size
+
+    def digest(self) -> bytes:
+        return self._digest
+
+
+def _to_hash(item, prehashed: bool, hash_algo=HASH_ALGORITHM):
+    if prehashed:
+        return DigestDaBam(item, hash_algo)
+    if hasattr(item, "digest") and hasattr(item, "oid"):
+        return item
+    if isinstance(item, str):
+        item = item.encode("utf-8")
+    return hash_algo.new(item)
+
+
+def _point_id(key):
+    q = key.pointQ
+    return key.curve, int(q.x), int(q.y)
+
+
+def _lay_tu_cache(cache, ident, factory):
+    with _cache_lock:
+        obj = cache.get(ident)
+        if obj is not None:
+            cache.move_to_end(ident)
+            return obj
+        obj = cache[ident] = factory()
+        while len(cache) > MAX_CACHED_KEYS:
+            cache.popitem(last=False)
+        return obj
+
+
+def lay_bo_ky(private_key):
+    """Đối tượng DSS ký, tạo một lần cho mỗi khóa bí mật (LRU tối đa MAX_CACHED_KEYS)."""
+    return _lay_tu_cache(_signers, _point_id(private_key), lambda: DSS.new(private_key, 'fips-186-3'))
+
+
+def lay_bo_xac_minh(public_key):
+    """Đối tượng DSS xác minh, tạo một lần cho mỗi khóa công khai (LRU tối đa MAX_CACHED_KEYS)."""
+    key = public_key.public_key() if public_key.has_private() else public_key
+    return _lay_tu_cache(_verifiers, _point_id(public_key), lambda: DSS.new(key, 'fips-186-3'))
+
+
+def xoa_bo_nho_dem():
+    """Bỏ mọi bộ ký / xác minh đã lưu (và các khóa bí mật chúng giữ)."""
+    with _cache_lock:
+        _signers.clear()
+        _verifiers.clear()
+
+
+def tao_chu_ky_ecdsa_lo(private_key, messages, prehashed: bool = False) -> list:
+    """Ký nhiều thông điệp (bytes/str/hash object, hoặc digest nếu prehashed=True)."""
+    hash_algo = hash_cua_khoa(private_key)
+    signer = lay_bo_ky(private_key)
+    return [signer.sign(_to_hash(m, prehashed, hash_algo)) for m in messages]
+
+
+def _verify_items(verifier, hashes, signatures) -> list:
+    results = []
+    for h, sig in zip(hashes, signatures):
+        try:
+            verifier.verify(h, sig)
+            results.append(True)
+        except ValueError:
+            results.append(False)
+    return results
+
+
+# --- Xác minh song song: pool tiến trình dùng chung, mỗi tiến trình con giữ
+# bộ xác minh theo DER của khóa công khai (LRU như ở tiến trình chính) ---
+
+_worker_verifiers = OrderedDict()
+_pool = None
+_pool_workers = None
+_pool_lock = threading.Lock()
+
+
+def _verify_chunk(chunk) -> list:
+    public_der, digests, signatures = chunk
+    cached = _worker_verifiers.get(public_der)
+    if cached is None:
+        key = ECC.import_key(public_der)
+        cached = _worker_verifiers[public_der] = (DSS.new(key, 'fips-186-3'), hash_cua_khoa(key))
+        while len(_worker_verifiers) > MAX_CACHED_KEYS:
+            _worker_verifiers.popitem(last=False)
+    else:
+        _worker_verifiers.move_to_end(public_der)
+    verifier, hash_algo = cached
+    return _verify_items(verifier, [DigestDaBam(d, hash_algo) for d in digests], signatures)
+
+
+def lay_pool(workers: int | None = None) -> ProcessPoolExecutor:
+    """Pool tiến trình dùng chung cho xác minh song song; chỉ tạo lại khi đổi số tiến trình."""
+    global _pool, _pool_workers
+    workers = workers or os.cpu_count() or 1
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown()
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_workers = workers
+        return _pool
+
+
+def dong_pool():
+    """Tắt pool dùng chung (nếu đã tạo)."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = _pool_workers = None
+
+
+atexit.register(dong_pool)
+
+
+def xac_minh_chu_ky_ecdsa_lo(public_key, messages, signatures, prehashed: bool = False,
+                             workers: int | None = 1, chunk: int = DEFAULT_CHUNK, pool=None) -> list:
+    """Xác minh nhiều chữ ký của cùng một khóa; trả về danh sách True/False.
+
+    workers > 1 (hoặc None = số lõi CPU) chia việc xác minh ra nhiều tiến trình
+    của pool dùng chung (lay_pool), hoặc của pool truyền vào qua pool=;
+    thông điệp được băm ở tiến trình chính, chỉ digest được gửi đi.
+    """
+    hash_algo = hash_cua_khoa(public_key)
+    hashes = [_to_hash(m, prehashed, hash_algo) for m in messages]
+    signatures = list(signatures)
+    if len(hashes) != len(signatures):
+        raise ValueError("Số thông điệp và số chữ ký không khớp")
+    if (pool is None and workers == 1) or len(hashes) <= chunk:
+        return _verify_items(lay_bo_xac_minh(public_key), hashes, signatures)
+
+    public_der = public_key.public_key().export_key(format='DER')
+    digests = [h.digest() for h in hashes]
+    chunks = [(public_der, digests[i:i + chunk], signatures[i:i + chunk])
+              for i in range(0, len(digests), chunk)]
+    if pool is None:
+        pool = lay_pool(workers)
+    results = []
+    for part in pool.map(_verify_chunk, chunks):
+        results.extend(part)
+    return results
+
+
+# --- ĐO HIỆU NĂNG ---
+
+def _do_tung_lan(fn, items):
+    latencies = []
+    start = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - start
+    return len(items) / total, latencies
+
+
+def _bao_cao(label, rate, latencies):
+    q = statistics.quantiles(latencies, n=100)
+    print(f"{label:<36} {rate:9.0f} sig/s  p50 {q[49] * 1e6:8.1f} µs  p99 {q[98] * 1e6:8.1f} µs")
+
+
+def do_hieu_nang(count: int = 2000):
+    """So sánh hàm từng lần (str) với API theo lô (bytes, digest, đa tiến trình)."""
+    private_key, public_key = tao_cap_khoa_ecdsa()
+    texts = [f"thông điệp {i}" for i in range(count)]
+    raw = [t.encode("utf-8") for t in texts]
+    digests = [HASH_ALGORITHM.new(m).digest() for m in raw]
+
+    print(f"ECDSA {CURVE_NAME}, {count} thông điệp")
+    rate, lat = _do_tung_lan(lambda t: tao_chu_ky_ecdsa(private_key, t), texts)
+    _bao_cao("tao_chu_ky_ecdsa (từng lần)", rate, lat)
+    signer = lay_bo_ky(private_key)
+    rate, lat = _do_tung_lan(lambda d: signer.sign(DigestDaBam(d)), digests)
+    _bao_cao("tao_chu_ky_ecdsa_lo (digest)", rate, lat)
+
+    signatures = tao_chu_ky_ecdsa_lo(private_key, digests, prehashed=True)
+    pairs = list(zip(texts, signatures))
+    rate, lat = _do_tung_lan(lambda p: xac_minh_chu_ky_ecdsa(public_key, *p), pairs)
+    _bao_cao("xac_minh_chu_ky_ecdsa (từng lần)", rate, lat)
+    verifier = lay_bo_xac_minh(public_key)
+    rate, lat = _do_tung_lan(lambda p: _verify_items(verifier, [DigestDaBam(p[0])], [p[1]]),
+                             list(zip(digests, signatures)))
+    _bao_cao("xac_minh_chu_ky_ecdsa_lo (digest)", rate, lat)
+
+    workers = os.cpu_count() or 1
+    t0 = time.perf_counter()
+    ok = xac_minh_chu_ky_ecdsa_lo(public_key, raw, signatures, workers=workers)
+    rate = count / (time.perf_counter() - t0)
+    print(f"{'xac_minh lô, ' + str(workers) + ' tiến trình':<36} {rate:9.0f} sig/s  (tất cả hợp lệ: {all(ok)})")
+
+
+if __name__ == '__main__':
+    do_hieu_nang()
@@ -0,0 +1,607 @@
+"""
+Chùm khóa: kho lưu nhiều khóa RSA / ElGamal / ECC trong một thư mục, tra theo mã khóa.
+
+Thư mục chùm khóa gồm hai file chỉ ghi thêm (append-only):
+    khoa.dat  MAGIC | bản ghi: fingerprint (16) | kind (u8) | flags (u8) | length (u32) | crc32 (u32) | blob
+    khoa.idx  MAGIC | mục:     fingerprint (16) | kind (u8) | flags (u8) | offset (u64) | length (u32) | crc32 (u32)
+
+Mã khóa (key ID) = 16 byte đầu SHA-256(kind | khóa công khai dạng DER/nhị phân),
+viết dạng hex; khóa công khai và khóa bí mật của cùng một cặp có cùng mã. Khi
+mở, file chỉ mục được đọc một lần vào dict nên tra cứu là O(1), không quét thư
+mục; blob được đọc thẳng từ mmap của khoa.dat. Xóa khóa là ghi thêm một mục
+có cờ FLAG_DELETED; nen() viết lại hai file chỉ còn các khóa đang dùng.
+
+Dữ liệu được ghi (và fsync) trước chỉ mục, nên một lần ghi bị ngắt giữa chừng
+chỉ để lại bản ghi thừa trong khoa.dat; mục chỉ mục trỏ ra ngoài dữ liệu bị
+bỏ qua khi đọc. Phần đuôi không trọn một mục của khoa.idx (ghi bị ngắt) được
+cắt đi trước lần ghi thêm kế tiếp, để các mục sau vẫn thẳng hàng.
+
+Mọi lần ghi và nen() giữ flock độc quyền trên khoa.lock (file này không bao giờ
+bị thay thế). nen() thay hai file bằng os.replace; các handle khác nhận ra
+inode mới của khoa.idx ở lần tra cứu kế tiếp và mở lại.
+
+Ví dụ:
+    python chum_khoa.py import khoa_cua_toi he_mat_RSA he_mat_ElGamal khoa/*.pem
+    python chum_khoa.py list khoa_cua_toi
+    python chum_khoa.py export khoa_cua_toi thu_muc_pem --private
+    python chum_khoa.py benchmark --count 10000
+"""
+import argparse
+import contextlib
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: không có khóa file, chỉ nên có một tiến trình ghi
+    fcntl = None
+
+BASE_DIR = Path(__file__).resolve().parent
+for _d in (BASE_DIR / "he_mat_ElGamal", BASE_DIR):
+    if str(_d) not in sys.path:
+        sys.path.insert(0, str(_d))
+
+DATA_FILE = "khoa.dat"
+INDEX_FILE = "khoa.idx"
+LOCK_FILE = "khoa.lock"
+DATA_MAGIC = b"KRD1"
+INDEX_MAGIC = b"KRI1"
+_REC = struct.Struct(">16sBBII")
+_IDX = struct.Struct(">16sBBQII")
+
+KIND_RSA = 1
+KIND_ELGAMAL = 2
+KIND_ECC = 3
+KIND_NAMES = {KIND_RSA: "rsa", KIND_ELGAMAL: "elgamal", KIND_ECC: "ecc"}
+
+FLAG_PRIVATE = 1
+FLAG_DELETED = 2
+
+
+# --- MÃ HÓA / GIẢI MÃ KHÓA ---
+
+def loai_khoa(key) -> int:
+    from Crypto.PublicKey import ECC, ElGamal, RSA
+
+    if isinstance(key, RSA.RsaKey):
+        return KIND_RSA
+    if isinstance(key, ElGamal.ElGamalKey):
+        return KIND_ELGAMAL
+    if isinstance(key, ECC.EccKey):
+        return KIND_ECC
+    raise TypeError(f"Loại khóa không hỗ trợ: {type(key).__name__}")
+
+
+def _ma_hoa(kind: int, key, private: bool) -> bytes:
+    if kind == KIND_ELGAMAL:
+        from doc_key_ElGamal import encode_elgamal_key_binary
+
+        return encode_elgamal_key_binary(key, include_private=private)
+    if not private:
+        key = key.public_key()
+    return key.export_key(format="DER")
+
+
+def _giai_ma(kind: int, blob):
+    if kind == KIND_ELGAMAL:
+        from Crypto.PublicKey import ElGamal
+        from doc_key_ElGamal import parse_elgamal_key_binary
+        from bang_tinh_truoc_ElGamal import attach_precomputation
+
+        c = parse_elgamal_key_binary(blob)
+        fields = (c["p"], c["g"], c["y"], c["x"]) if "x" in c else (c["p"], c["g"], c["y"])
+        key = ElGamal.construct(fields)
+        attach_precomputation(key)  # bảng chỉ được dựng khi dùng lần đầu, như load_elgamal_keypair
+        return key
+    if kind == KIND_RSA:
+        from Crypto.PublicKey import RSA
+
+        return RSA.import_key(bytes(blob))
+    from Crypto.PublicKey import ECC
+
+    return ECC.import_key(bytes(blob))
+
+
+def xuat_pem(key, private: bool = False) -> str:
+    """PEM text of key (public part unless private=True) in the format this project uses for its scheme."""
+    kind = loai_khoa(key)
+    if kind == KIND_ELGAMAL:
+        from doc_key_ElGamal import encode_elgamal_key_pem
+
+        return encode_elgamal_key_pem(key, include_private=private)
+    pem = (key if private else key.public_key()).export_key(format="PEM")
+    return pem.decode("ascii") if isinstance(pem, bytes) else pem
+
+
+def dau_van_tay(key, kind: int | None = None) -> bytes:
+    """16-byte fingerprint of the public part of key (same for public and private key)."""
+    kind = kind or loai_khoa(key)
+    return hashlib.sha256(bytes([kind]) + _ma_hoa(kind, key, False)).digest()[:16]
+
+
+def ma_khoa(key) -> str:
+    """Key ID (hex fingerprint) of key."""
+    return dau_van_tay(key).hex()
+
+
+def _fp(key_id) -> bytes:
+    if isinstance(key_id, (bytes, bytearray)) and len(key_id) == 16:
+        return bytes(key_id)
+    try:
+        fp = bytes.fromhex(key_id)
+    except (TypeError, ValueError):
+        fp = b""
+    if len(fp) != 16:
+        raise KeyError(f"Mã khóa không hợp lệ: {key_id!r}")
+    return fp
+
+
+def doc_khoa_pem(path):
+    """Parse a key file of any supported format (RSA/ECC PEM or DER, ElGamal PEM/binary)."""
+    from Crypto.PublicKey import ECC, ElGamal, RSA
+    from doc_key_ElGamal import BINARY_MAGIC, load_elgamal_components
+
+    raw = Path(path).read_bytes()
+    if raw.startswith(BINARY_MAGIC) or b"ELGAMAL" in raw[:64]:
+        c = load_elgamal_components(path)
+        return ElGamal.construct(tuple(c[k] for k in ("p", "g", "y", "x") if k in c))
+    try:
+        return RSA.import_key(raw)
+    except (ValueError, IndexError, TypeError):
+        return ECC.import_key(raw)
+
+
+# --- CHÙM KHÓA ---
+
+class ChumKhoa:
+    """Append-only keyring directory with an in-memory fingerprint index and mmap reads.
+
+    Safe for concurrent use by threads; on POSIX several processes may append
+    and compact (writes are serialised with flock on khoa.lock and each side
+    picks up the other's keys via lam_moi()).
+    """
+
+    def __init__(self, thu_muc, durable: bool = True):
+        self.thu_muc = Path(thu_muc).resolve()
+        self.durable = durable
+        self.thu_muc.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._lock_file = open(self.thu_muc / LOCK_FILE, "a+b")
+        self._mo_file()
+        self.lookups = 0
+        self.reads = 0
+
+    def _mo_file(self):
+        self.data_path = self.thu_muc / DATA_FILE
+        self.index_path = self.thu_muc / INDEX_FILE
+        for path, magic in ((self.data_path, DATA_MAGIC), (self.index_path, INDEX_MAGIC)):
+            if not path.exists() or path.stat().st_size == 0:
+                with open(path, "ab") as f:
+                    if f.tell() == 0:
+                        f.write(magic)
+        self._data = open(self.data_path, "r+b")
+        self._index = open(self.index_path, "r+b")
+        for f, magic in ((self._data, DATA_MAGIC), (self._index, INDEX_MAGIC)):
+            if f.read(len(magic)) != magic:
+                self._data.close()
+                self._index.close()
+                raise ValueError(f"{f.name} không phải file chùm khóa (magic không khớp)")
+        self._map = None
+        self._entries = {}  # fingerprint -> [mục công khai, mục bí mật]; mục = (kind, offset, length, crc)
+        self._index_pos = len(INDEX_MAGIC)
+        self.lam_moi()
+
+    @contextlib.contextmanager
+    def _khoa_ghi(self):
+        """Exclusive lock against writers and compaction in other processes."""
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    # --- chỉ mục ---
+
+    def lam_moi(self) -> int:
+        """Read index entries appended since the last call (e.g. by another process)."""
+        with self._lock:
+            self._index.seek(self._index_pos)
+            raw = self._index.read()
+            # Dữ liệu luôn được ghi trước chỉ mục: đo kích thước sau khi đọc chỉ mục
+            data_size = os.fstat(self._data.fileno()).st_size
+            added = 0
+            for pos in range(0, len(raw) - _IDX.size + 1, _IDX.size):
+                fp, kind, flags, offset, length, crc = _IDX.unpack_from(raw, pos)
+                self._index_pos += _IDX.size
+                if kind not in KIND_NAMES:
+                    continue  # mục rác: bỏ qua, các mục sau vẫn thẳng hàng
+                if flags & FLAG_DELETED:
+                    self._entries.pop(fp, None)
+                elif offset + length > data_size:
+                    continue  # trỏ ra ngoài dữ liệu (ghi bị ngắt)
+                else:
+                    slot = self._entries.setdefault(fp, [None, None])
+                    slot[flags & FLAG_PRIVATE] = (kind, offset, length, crc)
+                added += 1
+            return added
+
+    def _da_bi_thay(self) -> bool:
+        # nen() của handle khác đã thay khoa.idx bằng file mới
+        try:
+            st = os.stat(self.index_path)
+        except FileNotFoundError:
+            return False  # đang ở giữa hai os.replace; lần sau kiểm tra lại
+        own = os.fstat(self._index.fileno())
+        return (st.st_ino, st.st_dev) != (own.st_ino, own.st_dev)
+
+    def _mo_lai(self):
+        self._map = None
+        self._data.close()
+        self._index.close()
+        self._mo_file()
+
+    def _dong_bo(self):
+        # stat + fstat (~2 µs): mở lại sau khi bị nén, đọc lại chỉ mục khi có handle khác vừa ghi thêm
+        if self._da_bi_thay():
+            self._mo_lai()
+        elif os.fstat(self._index.fileno()).st_size >= self._index_pos + _IDX.size:
+            self.lam_moi()
+
+    def _muc(self, key_id, private: bool):
+        fp = _fp(key_id)
+        with self._lock:
+            self.lookups += 1
+            self._dong_bo()
+            slot = self._entries.get(fp)
+            if slot is None:
+                raise KeyError(f"Không có khóa {fp.hex()} trong chùm khóa")
+            if slot[private] is None:
+                raise KeyError(f"Khóa {fp.hex()} không có phần bí mật trong chùm khóa")
+            return slot[private]
+
+    def __contains__(self, key_id) -> bool:
+        try:
+            fp = _fp(key_id)
+        except KeyError:
+            return False
+        with self._lock:
+            self._dong_bo()
+            return fp in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._dong_bo()
+            return len(self._entries)
+
+    def __iter__(self):
+        with self._lock:
+            self._dong_bo()
+            ids = [fp.hex() for fp in self._entries]
+        return iter(ids)
+
+    def thong_tin(self, key_id) -> dict:
+        """Kind and whether the private part is stored."""
+        with self._lock:
+            self._dong_bo()
+            slot = self._entries.get(_fp(key_id))
+            if slot is None:
+                raise KeyError(f"Không có khóa {key_id} trong chùm khóa")
+            entry = slot[0] or slot[1]
+            return {"id": _fp(key_id).hex(), "kind": KIND_NAMES[entry[0]], "private": slot[1] is not None}
+
+    def tham_chieu(self, key_id, private: bool = False):
+        """Stable identity (fingerprint, private, offset) of the record lay() would read."""
+        entry = self._muc(key_id, private)
+        return _fp(key_id), private, entry[1]
+
+    # --- đọc ---
+
+    def _view(self, offset: int, length: int) -> memoryview:
+        if self._map is None or offset + length > len(self._map):
+            # Dữ liệu đã dài thêm: ánh xạ lại; mmap cũ tự đóng khi không còn view nào dùng
+            self._data.flush()
+            self._map = mmap.mmap(self._data.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._map)[offset:offset + length]
+
+    def lay_bytes(self, key_id, private: bool = False) -> bytes:
+        """Raw stored encoding (DER for RSA/ECC, binary for ElGamal), CRC-checked."""
+        with self._lock:
+            kind, offset, length, crc = self._muc(key_id, private)
+            with self._view(offset, length) as view:
+                if zlib.crc32(view) != crc:
+                    raise ValueError(f"Bản ghi của khóa {key_id} bị hỏng (CRC không khớp)")
+                self.reads += 1
+                return bytes(view)
+
+    def lay(self, key_id, private: bool = False):
+        """Parsed key object for key_id (the private key if private=True)."""
+        with self._lock:
+            kind, offset, length, crc = self._muc(key_id, private)
+            with self._view(offset, length) as view:
+                if zlib.crc32(view) != crc:
+                    raise ValueError(f"Bản ghi của khóa {key_id} bị hỏng (CRC không khớp)")
+                self.reads += 1
+                return _giai_ma(kind, view)
+
+    # --- ghi ---
+
+    def _ghi(self, records) -> None:
+        """Append records [(fp, kind, flags, blob)] to data, then to the index."""
+        if not records:
+            return
+        with self._khoa_ghi():
+            self._dong_bo()
+            self.lam_moi()
+            # Cắt phần đuôi dở dang của một lần ghi bị ngắt trước khi ghi thêm
+            end = os.fstat(self._index.fileno()).st_size
+            whole = len(INDEX_MAGIC) + (end - len(INDEX_MAGIC)) // _IDX.size * _IDX.size
+            if whole != end:
+                self._index.truncate(whole)
+            self._data.seek(0, os.SEEK_END)
+            base = self._data.tell()
+            data = bytearray()
+            entries = bytearray()
+            for fp, kind, flags, blob in records:
+                if flags & FLAG_DELETED:
+                    entries += _IDX.pack(fp, kind, flags, 0, 0, 0)
+                    continue
+                crc = zlib.crc32(blob)
+                data += _REC.pack(fp, kind, flags, len(blob), crc)
+                entries += _IDX.pack(fp, kind, flags, base + len(data), len(blob), crc)
+                data += blob
+            self._data.write(data)
+            self._data.flush()
+            if self.durable:
+                os.fsync(self._data.fileno())
+            self._index.seek(0, os.SEEK_END)
+            self._index.write(entries)
+            self._index.flush()
+            if self.durable:
+                os.fsync(self._index.fileno())
+            self.lam_moi()
+
+    def them_nhieu(self, keys) -> list:
+        """Add many key objects in one append (one fsync). Returns their key IDs."""
+        ids = []
+        records = []
+        with self._lock:
+            pending = set()
+            for key in keys:
+                kind = loai_khoa(key)
+                public_blob = _ma_hoa(kind, key, False)
+                fp = hashlib.sha256(bytes([kind]) + public_blob).digest()[:16]
+                ids.append(fp.hex())
+                slot = self._entries.get(fp, (None, None))
+                if slot[0] is None and (fp, 0) not in pending:
+                    records.append((fp, kind, 0, public_blob))
+                    pending.add((fp, 0))
+                if key.has_private() and slot[1] is None and (fp, 1) not in pending:
+                    records.append((fp, kind, FLAG_PRIVATE, _ma_hoa(kind, key, True)))
+                    pending.add((fp, 1))
+            self._ghi(records)
+        return ids
+
+    def them(self, key) -> str:
+        """Add one key (public part, and private part if present). Returns its key ID."""
+        return self.them_nhieu([key])[0]
+
+    def nhap_pem(self, paths, pattern: str = "*.pem") -> list:
+        """Bulk import key files; directories are searched recursively for pattern."""
+        files = []
+        for path in paths:
+            path = Path(path)
+            files.extend(sorted(path.rglob(pattern)) if path.is_dir() else [path])
+        return self.them_nhieu(doc_khoa_pem(f) for f in files)
+
+    def xuat_pem(self, thu_muc, private: bool = False) -> int:
+        """Export every key as <id>-public.pem (and <id>-private.pem if private). Returns files written."""
+        out = Path(thu_muc)
+        out.mkdir(parents=True, exist_ok=True)
+        written = 0
+        for key_id in list(self):
+            info = self.thong_tin(key_id)
+            for want_private in ((False, True) if private and info["private"] else (False,)):
+                pem = xuat_pem(self.lay(key_id, want_private), want_private)
+                name = f"{key_id}-{'private' if want_private else 'public'}.pem"
+                (out / name).write_text(pem, encoding="ascii")
+                written += 1
+        return written
+
+    def xoa(self, key_id):
+        """Remove key_id (appends a tombstone; space is reclaimed by nen())."""
+        fp = _fp(key_id)
+        with self._lock:
+            slot = self._entries.get(fp)
+            if slot is None:
+                raise KeyError(f"Không có khóa {fp.hex()} trong chùm khóa")
+            kind = (slot[0] or slot[1])[0]
+            self._ghi([(fp, kind, FLAG_DELETED, b"")])
+
+    def nen(self) -> int:
+        """Rewrite both files with only live records. Returns bytes reclaimed.
+
+        Holds the write lock throughout, so no other process can append to the
+        files being replaced; their handles reopen on the next access.
+        """
+        with self._khoa_ghi():
+            self._dong_bo()
+            self.lam_moi()
+            before = self.data_path.stat().st_size + self.index_path.stat().st_size
+            records = []
+            for fp, slot in self._entries.items():
+                for private, entry in enumerate(slot):
+                    if entry is not None:
+                        kind, offset, length, crc = entry
+                        with self._view(offset, length) as view:
+                            records.append((fp, kind, private, bytes(view)))
+            tmp_dir = self.thu_muc / ".nen"
+            for name in (DATA_FILE, INDEX_FILE, LOCK_FILE):
+                (tmp_dir / name).unlink(missing_ok=True)  # phần còn lại của một lần nén bị ngắt
+            tmp = ChumKhoa(tmp_dir, durable=self.durable)
+            tmp._ghi(records)
+            tmp.dong()
+            # Đóng trước khi thay (Windows không cho os.replace đè lên file đang mở)
+            self._map = None
+            self._data.close()
+            self._index.close()
+            os.replace(tmp_dir / DATA_FILE, self.data_path)
+            os.replace(tmp_dir / INDEX_FILE, self.index_path)
+            (tmp_dir / LOCK_FILE).unlink()
+            tmp_dir.rmdir()
+            self._mo_file()
+            return before - (self.data_path.stat().st_size + self.index_path.stat().st_size)
+
+    # --- quản lý ---
+
+    def dong(self):
+        with self._lock:
+            self._map = None
+            self._data.close()
+            self._index.close()
+            self._lock_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.dong()
+
+    def thong_ke(self) -> dict:
+        with self._lock:
+            self._dong_bo()
+            return {
+                "keys": len(self._entries),
+                "private": sum(slot[1] is not None for slot in self._entries.values()),
+                "data_bytes": self.data_path.stat().st_size,
+                "index_bytes": self.index_path.stat().st_size,
+                "lookups": self.lookups,
+                "reads": self.reads,
+            }
+
+
+# --- ĐO HIỆU NĂNG ---
+
+def do_hieu_nang(count: int = 10_000, rounds: int = 20_000):
+    """Open time, lookup latency and bulk import/export for a keyring of count ECC keys."""
+    import random
+    import tempfile
+
+    from Crypto.PublicKey import ECC
+
+    print(f"Sinh {count} khóa ECC...")
+    keys = [ECC.generate(curve="P-256") for _ in range(count)]
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        pem_dir = tmp / "pem"
+        pem_dir.mkdir()
+        for i, key in enumerate(keys):
+            (pem_dir / f"{i}.pem").write_text(key.export_key(format="PEM"), encoding="ascii")
+
+        t0 = time.perf_counter()
+        with ChumKhoa(tmp / "chum") as chum:
+            ids = chum.nhap_pem([pem_dir])
+        t_import = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        chum = ChumKhoa(tmp / "chum")
+        t_open = time.perf_counter() - t0
+
+        sample = [random.choice(ids) for _ in range(rounds)]
+        t0 = time.perf_counter()
+        for key_id in sample:
+            chum.lay_bytes(key_id)
+        t_raw = (time.perf_counter() - t0) / rounds
+        t0 = time.perf_counter()
+        for key_id in sample[:2000]:
+            chum.lay(key_id, private=True)
+        t_parse = (time.perf_counter() - t0) / 2000
+        files = [pem_dir / f"{ids.index(k)}.pem" for k in sample[:2000]]
+        t0 = time.perf_counter()
+        for path in files:
+            ECC.import_key(path.read_bytes())
+        t_pem = (time.perf_counter() - t0) / 2000
+
+        from kho_khoa import KHO_KHOA
+
+        KHO_KHOA.lay_khoa_chum(chum, sample[0], private=True)
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            KHO_KHOA.lay_khoa_chum(chum, sample[0], private=True)
+        t_cache = (time.perf_counter() - t0) / rounds
+
+        t0 = time.perf_counter()
+        exported = chum.xuat_pem(tmp / "xuat", private=True)
+        t_export = time.perf_counter() - t0
+        stats = chum.thong_ke()
+        chum.dong()
+
+    print(f"  nhập {count} PEM:             {count / t_import:9.0f} khóa/s")
+    print(f"  mở chùm khóa (đọc chỉ mục):   {t_open * 1e3:9.1f} ms")
+    print(f"  lay_bytes (mmap, O(1)):       {t_raw * 1e6:9.1f} µs")
+    print(f"  lay (phân tích DER):          {t_parse * 1e6:9.1f} µs   so với đọc + phân tích PEM: {t_pem * 1e6:.1f} µs")
+    print(f"  lay_khoa_chum (KhoKhoa):      {t_cache * 1e6:9.1f} µs")
+    print(f"  xuất {exported} PEM:          {exported / t_export:9.0f} file/s")
+    print(f"  {stats}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Chùm khóa: lưu và tra cứu nhiều khóa theo mã khóa.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("import", help="Nhập file khóa / thư mục (tìm *.pem đệ quy)")
+    p.add_argument("keyring")
+    p.add_argument("paths", nargs="+")
+    p = sub.add_parser("export", help="Xuất mọi khóa ra file PEM")
+    p.add_argument("keyring")
+    p.add_argument("out")
+    p.add_argument("--private", action="store_true", help="Xuất cả khóa bí mật")
+    p = sub.add_parser("list", help="Liệt kê mã khóa")
+    p.add_argument("keyring")
+    p = sub.add_parser("show", help="In khóa công khai dạng PEM")
+    p.add_argument("keyring")
+    p.add_argument("key_id")
+    p = sub.add_parser("delete", help="Xóa khóa")
+    p.add_argument("keyring")
+    p.add_argument("key_id")
+    p = sub.add_parser("compact", help="Viết lại chùm khóa, bỏ bản ghi đã xóa")
+    p.add_argument("keyring")
+    p = sub.add_parser("benchmark", help="Đo hiệu năng")
+    p.add_argument("--count", type=int, default=10_000)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "benchmark":
+        do_hieu_nang(args.count)
+        return 0
+    with ChumKhoa(args.keyring) as chum:
+        if args.cmd == "import":
+            before = len(chum)
+            ids = chum.nhap_pem(args.paths)
+            print(f"Đã đọc {len(ids)} file, thêm {len(chum) - before} khóa ({len(chum)} khóa trong chùm)",
+                  file=sys.stderr)
+        elif args.cmd == "export":
+            print(f"Đã ghi {chum.xuat_pem(args.out, args.private)} file", file=sys.stderr)
+        elif args.cmd == "list":
+            for key_id in chum:
+                info = chum.thong_tin(key_id)
+                print(f"{key_id}  {info['kind']:<8} {'bí mật' if info['private'] else 'công khai'}")
+        elif args.cmd == "show":
+            pem = xuat_pem(chum.lay(args.key_id))
+            sys.stdout.write(pem if pem.endswith("\n") else pem + "\n")
+        elif args.cmd == "delete":
+            chum.xoa(args.key_id)
+        else:
+            print(f"Đã thu hồi {chum.nen()} bytes", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,514 @@
+"""
+Đo đạc các hàm mật mã: bộ đếm, biểu đồ độ trễ, số phép lũy thừa modulo / nhân
+vô hướng, số byte xử lý, và lấy mẫu cProfile / tracemalloc.
+
+Khi tắt, các hàm gốc không bị đụng tới nên chi phí bằng 0. bat_do_dac() thay
+từng hàm trong DIEM_DO bằng một hàm bọc, ở mọi module đã nạp đang giữ tham
+chiếu tới hàm đó (kể cả các bản "from X import f"); tat_do_dac() khôi phục.
+
+    import do_dac
+    do_dac.bat_do_dac(sinks=[do_dac.GhiPrometheus("crypto.prom")],
+                      ti_le_lay_mau=0.01, che_do_lay_mau="cprofile")
+    ...
+    do_dac.xuat()          # đẩy số liệu ra các sink
+    do_dac.tat_do_dac()
+
+Số phép lũy thừa / nhân vô hướng được khai báo tĩnh theo thuật toán (ví dụ
+elgamal_verify = 3 lũy thừa) chứ không đếm bên trong pow(); chỉ khai báo ở
+hàm nguyên thủy để hàm bọc lồng nhau không bị đếm hai lần.
+"""
+import bisect
+import cProfile
+import functools
+import importlib
+import json
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+for _d in (BASE_DIR / "he_mat_ElGamal", BASE_DIR / "he_mat_RSA", BASE_DIR):
+    if str(_d) not in sys.path:
+        sys.path.insert(0, str(_d))
+
+# Cận trên các ô của biểu đồ độ trễ (giây), theo kiểu Prometheus
+BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+           1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _len_arg(index, name):
+    """Số byte của tham số thứ index (hoặc tham số từ khóa name)."""
+    def count(args, kwargs):
+        value = kwargs.get(name) if name in kwargs else (args[index] if len(args) > index else None)
+        if isinstance(value, str):
+            return len(value.encode("utf-8"))
+        try:
+            return len(value)
+        except TypeError:
+            return 0
+    return count
+
+
+def _sum_len_arg(index, name):
+    """Tổng số byte của một danh sách thông điệp."""
+    def count(args, kwargs):
+        values = kwargs.get(name) if name in kwargs else (args[index] if len(args) > index else ())
+        total = 0
+        for v in values:
+            try:
+                total += len(v.encode("utf-8") if isinstance(v, str) else v)
+            except (TypeError, AttributeError):
+                pass
+        return total
+    return count
+
+
+def _per_item(index, name, factor=1):
+    """Số phần tử của tham số lô nhân với factor."""
+    def count(args, kwargs):
+        values = kwargs.get(name) if name in kwargs else (args[index] if len(args) > index else ())
+        try:
+            return factor * len(values)
+        except TypeError:
+            return 0
+    return count
+
+
+class DiemDo:
+    """Một hàm được đo: module.ten, nhãn thao tác và chi phí khai báo cho mỗi lần gọi.
+
+    modexp / scalar_mult / nbytes là số nguyên hoặc hàm (args, kwargs) -> int.
+    """
+    __slots__ = ("module", "ten", "thao_tac", "modexp", "scalar_mult", "nbytes")
+
+    def __init__(self, module: str, ten: str, thao_tac: str, modexp=0, scalar_mult=0, nbytes=0):
+        self.module = module
+        self.ten = ten
+        self.thao_tac = thao_tac
+        self.modexp = modexp
+        self.scalar_mult = scalar_mult
+        self.nbytes = nbytes
+
+
+DIEM_DO = [
+    # ElGamal
+    DiemDo("he_mat_ElGamal", "elgamal_encrypt", "elgamal.encrypt", modexp=2),
+    DiemDo("he_mat_ElGamal", "elgamal_decrypt", "elgamal.decrypt", modexp=1),
+    DiemDo("he_mat_ElGamal", "elgamal_decrypt_batch", "elgamal.decrypt_batch", modexp=_per_item(1, "ciphertexts")),
+    DiemDo("he_mat_ElGamal", "elgamal_sign", "elgamal.sign", modexp=1, nbytes=_len_arg(1, "message")),
+    DiemDo("he_mat_ElGamal", "elgamal_sign_batch", "elgamal.sign_batch", modexp=_per_item(1, "messages"),
+           nbytes=_sum_len_arg(1, "messages")),
+    DiemDo("he_mat_ElGamal", "elgamal_verify", "elgamal.verify", modexp=3, nbytes=_len_arg(1, "message")),
+    DiemDo("xac_minh_lo_ElGamal", "elgamal_verify_batch", "elgamal.verify_batch",
+           nbytes=_sum_len_arg(1, "messages")),
+    DiemDo("ma_hoa_luong_ElGamal", "elgamal_encrypt_bytes", "elgamal.hybrid_encrypt", nbytes=_len_arg(1, "data")),
+    DiemDo("ma_hoa_luong_ElGamal", "elgamal_decrypt_bytes", "elgamal.hybrid_decrypt", nbytes=_len_arg(1, "blob")),
+    # RSA
+    DiemDo("he_mat_RSA", "giai_ma", "rsa.decrypt_raw", modexp=1),
+    DiemDo("giai_ma_CRT_RSA", "giai_ma_crt", "rsa.decrypt_crt", modexp=2),
+    # ECDH + AES-GCM
+    DiemDo("he_mat_ECC", "tao_cap_khoa", "ecc.keygen", scalar_mult=1),
+    DiemDo("he_mat_ECC", "tinh_khoa_chung_ecdh", "ecc.ecdh", scalar_mult=1),
+    DiemDo("he_mat_ECC", "ma_hoa_aes", "aes_gcm.encrypt", nbytes=_len_arg(1, "data")),
+    DiemDo("he_mat_ECC", "giai_ma_aes", "aes_gcm.decrypt", nbytes=_len_arg(2, "ciphertext")),
+    DiemDo("thoa_thuan_khoa_ECDH", "tinh_khoa_chung_ecdh_lo", "ecc.ecdh_batch",
+           scalar_mult=_per_item(1, "public_keys")),
+    DiemDo("ma_hoa_luong_AES", "ma_hoa_bytes", "aes_gcm.stream_encrypt", nbytes=_len_arg(1, "data")),
+    DiemDo("ma_hoa_luong_AES", "giai_ma_bytes", "aes_gcm.stream_decrypt", nbytes=_len_arg(1, "blob")),
+    # ECDSA
+    DiemDo("so_do_chu_ky_ECDSA", "tao_cap_khoa_ecdsa", "ecdsa.keygen", scalar_mult=1),
+    DiemDo("so_do_chu_ky_ECDSA", "tao_chu_ky_ecdsa", "ecdsa.sign", scalar_mult=1,
+           nbytes=_len_arg(1, "thong_diep")),
+    DiemDo("so_do_chu_ky_ECDSA", "xac_minh_chu_ky_ecdsa", "ecdsa.verify", scalar_mult=2,
+           nbytes=_len_arg(1, "thong_diep")),
+    DiemDo("chu_ky_lo_ECDSA", "tao_chu_ky_ecdsa_lo", "ecdsa.sign_batch", scalar_mult=_per_item(1, "messages")),
+    DiemDo("chu_ky_lo_ECDSA", "xac_minh_chu_ky_ecdsa_lo", "ecdsa.verify_batch",
+           scalar_mult=_per_item(1, "messages", factor=2)),
+]
+
+
+# --- SỐ LIỆU ---
+
+class _SoLieuThaoTac:
+    __slots__ = ("calls", "errors", "total_s", "max_s", "buckets", "modexp", "scalar_mult", "nbytes",
+                 "samples", "peak_mem")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # ô cuối: +Inf
+        self.modexp = 0
+        self.scalar_mult = 0
+        self.nbytes = 0
+        self.samples = 0
+        self.peak_mem = 0
+
+    def snapshot(self) -> dict:
+        cumulative, acc = [], 0
+        for n in self.buckets:
+            acc += n
+            cumulative.append(acc)
+        return {
+            "calls": self.calls, "errors": self.errors,
+            "total_s": self.total_s, "max_s": self.max_s,
+            "mean_s": self.total_s / self.calls if self.calls else 0.0,
+            "buckets": dict(zip([str(b) for b in BUCKETS] + ["+Inf"], cumulative)),
+            "modexp": self.modexp, "scalar_mult": self.scalar_mult, "bytes": self.nbytes,
+            "profiled_samples": self.samples, "peak_mem_bytes": self.peak_mem,
+        }
+
+
+class SoDo:
+    """Sổ ghi số liệu theo thao tác; an toàn khi dùng từ nhiều luồng."""
+
+    def __init__(self):
+        self._ops = {}
+        self._lock = threading.Lock()
+        self._profiles = {}
+
+    def ghi(self, thao_tac: str, elapsed: float, ok: bool, modexp: int, scalar_mult: int, nbytes: int):
+        with self._lock:
+            op = self._ops.get(thao_tac)
+            if op is None:
+                op = self._ops[thao_tac] = _SoLieuThaoTac()
+            op.calls += 1
+            if not ok:
+                op.errors += 1
+            op.total_s += elapsed
+            if elapsed > op.max_s:
+                op.max_s = elapsed
+            op.buckets[bisect.bisect_left(BUCKETS, elapsed)] += 1
+            op.modexp += modexp
+            op.scalar_mult += scalar_mult
+            op.nbytes += nbytes
+
+    def ghi_ho_so(self, thao_tac: str, profile=None, peak_mem: int = 0):
+        with self._lock:
+            op = self._ops.get(thao_tac)
+            if op is None:
+                op = self._ops[thao_tac] = _SoLieuThaoTac()
+            op.samples += 1
+            op.peak_mem = max(op.peak_mem, peak_mem)
+            if profile is not None:
+                stats = self._profiles.get(thao_tac)
+                if stats is None:
+                    self._profiles[thao_tac] = pstats.Stats(profile)
+                else:
+                    stats.add(profile)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {name: op.snapshot() for name, op in sorted(self._ops.items())}
+
+    def ho_so(self) -> dict:
+        """pstats.Stats gộp theo thao tác (chỉ có khi lấy mẫu cProfile)."""
+        with self._lock:
+            return dict(self._profiles)
+
+    def dat_lai(self):
+        with self._lock:
+            self._ops.clear()
+            self._profiles.clear()
+
+
+# --- SINK ---
+
+class BoNhoTrong:
+    """Giữ các ảnh chụp số liệu trong bộ nhớ (dùng cho kiểm thử hoặc đọc trực tiếp)."""
+
+    def __init__(self, max_snapshots: int = 100):
+        self.max_snapshots = max_snapshots
+        self.snapshots = []
+
+    def ghi(self, timestamp: float, snapshot: dict):
+        self.snapshots.append((timestamp, snapshot))
+        del self.snapshots[:-self.max_snapshots]
+
+    def moi_nhat(self) -> dict:
+        return self.snapshots[-1][1] if self.snapshots else {}
+
+
+class GhiJsonLines:
+    """Mỗi lần xuất ghi thêm một dòng JSON {"ts": ..., "ops": {...}} vào file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def ghi(self, timestamp: float, snapshot: dict):
+        line = json.dumps({"ts": timestamp, "ops": snapshot}, ensure_ascii=False)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class GhiPrometheus:
+    """Ghi định dạng văn bản Prometheus ra file (cho textfile collector của node_exporter).
+
+    File được ghi vào file tạm rồi os.replace để bộ thu không đọc phải file dở dang.
+    """
+
+    def __init__(self, path, prefix: str = "mmattt_crypto"):
+        self.path = Path(path)
+        self.prefix = prefix
+
+    def _render(self, snapshot: dict) -> str:
+        p = self.prefix
+        lines = [f"# HELP {p}_op_duration_seconds Latency of crypto operations.",
+                 f"# TYPE {p}_op_duration_seconds histogram"]
+        for name, s in snapshot.items():
+            for le, count in s["buckets"].items():
+                lines.append(f'{p}_op_duration_seconds_bucket{{op="{name}",le="{le}"}} {count}')
+            lines.append(f'{p}_op_duration_seconds_sum{{op="{name}"}} {s["total_s"]:.9f}')
+            lines.append(f'{p}_op_duration_seconds_count{{op="{name}"}} {s["calls"]}')
+        counters = (("errors_total", "errors", "Calls that raised."),
+                    ("modexp_total", "modexp", "Modular exponentiations performed."),
+                    ("scalar_mult_total", "scalar_mult", "Elliptic-curve scalar multiplications performed."),
+                    ("bytes_total", "bytes", "Message bytes processed."))
+        for metric, field, help_text in counters:
+            lines.append(f"# HELP {p}_{metric} {help_text}")
+            lines.append(f"# TYPE {p}_{metric} counter")
+            for name, s in snapshot.items():
+                lines.append(f'{p}_{metric}{{op="{name}"}} {s[field]}')
+        return "\n".join(lines) + "\n"
+
+    def ghi(self, timestamp: float, snapshot: dict):
+        tmp = self.path.with_name(self.path.name + f".{os.getpid()}.tmp")
+        tmp.write_text(self._render(snapshot), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+# --- BẬT / TẮT ---
+
+class _TrangThai:
+    def __init__(self):
+        self.so_do = SoDo()
+        self.sinks = []
+        self.ti_le_lay_mau = 0.0
+        self.che_do_lay_mau = None
+        self.patched = []  # (đối tượng, tên thuộc tính, hàm gốc)
+        self.lock = threading.Lock()
+        self.profiling = threading.Lock()  # chỉ một lần lấy mẫu tại một thời điểm
+        self.xuat_stop = None
+
+
+_TRANG_THAI = _TrangThai()
+
+
+def _chay_lay_mau(state, diem, fn, args, kwargs):
+    # cProfile / tracemalloc là toàn cục theo tiến trình: nếu đang có lần lấy mẫu khác thì gọi bình thường
+    if not state.profiling.acquire(blocking=False):
+        return fn(*args, **kwargs)
+    try:
+        if state.che_do_lay_mau == "cprofile":
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:  # đã có profiler khác đang chạy
+                return fn(*args, **kwargs)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profile.disable()
+                state.so_do.ghi_ho_so(diem.thao_tac, profile=profile)
+        already_tracing = tracemalloc.is_tracing()
+        if not already_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            peak = tracemalloc.get_traced_memory()[1] - base
+            if not already_tracing:
+                tracemalloc.stop()
+            state.so_do.ghi_ho_so(diem.thao_tac, peak_mem=max(peak, 0))
+    finally:
+        state.profiling.release()
+
+
+def _boc(diem: DiemDo, fn):
+    state = _TRANG_THAI
+    so_do = state.so_do
+    thao_tac = diem.thao_tac
+    modexp, scalar_mult, nbytes = diem.modexp, diem.scalar_mult, diem.nbytes
+    # Chi phí tĩnh (số nguyên) được truyền thẳng; chỉ gọi hàm khi chi phí phụ thuộc tham số
+    dynamic = callable(modexp) or callable(scalar_mult) or callable(nbytes)
+    perf_counter = time.perf_counter
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        ok = False
+        t0 = perf_counter()
+        try:
+            if state.ti_le_lay_mau and random.random() < state.ti_le_lay_mau:
+                result = _chay_lay_mau(state, diem, fn, args, kwargs)
+            else:
+                result = fn(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            elapsed = perf_counter() - t0
+            if dynamic:
+                so_do.ghi(thao_tac, elapsed, ok,
+                          modexp(args, kwargs) if callable(modexp) else modexp,
+                          scalar_mult(args, kwargs) if callable(scalar_mult) else scalar_mult,
+                          nbytes(args, kwargs) if callable(nbytes) else nbytes)
+            else:
+                so_do.ghi(thao_tac, elapsed, ok, modexp, scalar_mult, nbytes)
+
+    wrapper.__wrapped_do_dac__ = fn
+    return wrapper
+
+
+def dang_bat() -> bool:
+    return bool(_TRANG_THAI.patched)
+
+
+def bat_do_dac(sinks=None, ti_le_lay_mau: float = 0.0, che_do_lay_mau: str = "cprofile",
+               diem_do=None, bo_qua_thieu: bool = True):
+    """Bật đo đạc cho các hàm trong diem_do (mặc định DIEM_DO).
+
+    ti_le_lay_mau: tỉ lệ lần gọi được chạy dưới cProfile (che_do_lay_mau="cprofile")
+    hoặc tracemalloc ("tracemalloc"). Module không nạp được (thiếu thư viện) bị bỏ
+    qua nếu bo_qua_thieu=True.
+    """
+    if che_do_lay_mau not in ("cprofile", "tracemalloc"):
+        raise ValueError(f"Chế độ lấy mẫu không hỗ trợ: {che_do_lay_mau}")
+    if not 0.0 <= ti_le_lay_mau <= 1.0:
+        raise ValueError("ti_le_lay_mau phải nằm trong [0, 1]")
+    state = _TRANG_THAI
+    with state.lock:
+        if sinks is not None:
+            state.sinks = list(sinks)
+        state.ti_le_lay_mau = ti_le_lay_mau
+        state.che_do_lay_mau = che_do_lay_mau
+        if state.patched:
+            return state.so_do
+
+        originals = {}
+        for diem in (DIEM_DO if diem_do is None else diem_do):
+            try:
+                module = importlib.import_module(diem.module)
+            except ImportError:
+                if bo_qua_thieu:
+                    continue
+                raise
+            fn = getattr(module, diem.ten)
+            originals[id(fn)] = (fn, _boc(diem, fn))
+
+        # Thay mọi tham chiếu tới hàm gốc trong các module đã nạp (gồm "from X import f")
+        for module in list(sys.modules.values()):
+            namespace = getattr(module, "__dict__", None)
+            if not isinstance(namespace, dict):
+                continue
+            for attr, value in list(namespace.items()):
+                entry = originals.get(id(value))
+                if entry is not None and entry[0] is value:
+                    setattr(module, attr, entry[1])
+                    state.patched.append((module, attr, value))
+        return state.so_do
+
+
+def tat_do_dac(xuat_truoc: bool = True):
+    """Khôi phục các hàm gốc (sau khi đẩy số liệu ra sink nếu xuat_truoc=True)."""
+    state = _TRANG_THAI
+    dung_xuat_dinh_ky()
+    if xuat_truoc:
+        xuat()
+    with state.lock:
+        for module, attr, original in reversed(state.patched):
+            setattr(module, attr, original)
+        state.patched.clear()
+
+
+def so_do() -> SoDo:
+    return _TRANG_THAI.so_do
+
+
+def xuat():
+    """Đẩy ảnh chụp số liệu hiện tại ra mọi sink."""
+    state = _TRANG_THAI
+    snapshot = state.so_do.snapshot()
+    now = time.time()
+    for sink in list(state.sinks):
+        sink.ghi(now, snapshot)
+    return snapshot
+
+
+def xuat_ho_so(out_dir):
+    """Ghi hồ sơ cProfile đã gộp thành <out_dir>/<thao_tac>.prof (mở bằng pstats / snakeviz)."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for name, stats in _TRANG_THAI.so_do.ho_so().items():
+        path = out_dir / f"{name}.prof"
+        stats.dump_stats(str(path))
+        written.append(path)
+    return written
+
+
+def bat_dau_xuat_dinh_ky(interval: float = 15.0):
+    """Xuất số liệu ra sink mỗi interval giây trên một luồng nền."""
+    state = _TRANG_THAI
+    dung_xuat_dinh_ky()
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(interval):
+            xuat()
+
+    state.xuat_stop = stop
+    threading.Thread(target=loop, name="do-dac-xuat", daemon=True).start()
+
+
+def dung_xuat_dinh_ky():
+    state = _TRANG_THAI
+    if state.xuat_stop is not None:
+        state.xuat_stop.set()
+        state.xuat_stop = None
+
+
+def in_bang(snapshot: dict | None = None):
+    snapshot = xuat() if snapshot is None else snapshot
+    print(f"{'thao tác':<26} {'số lần':>8} {'TB µs':>10} {'max µs':>10} {'modexp':>8} {'nhân VH':>8} {'bytes':>12}")
+    for name, s in snapshot.items():
+        print(f"{name:<26} {s['calls']:>8} {s['mean_s'] * 1e6:>10.1f} {s['max_s'] * 1e6:>10.1f} "
+              f"{s['modexp']:>8} {s['scalar_mult']:>8} {s['bytes']:>12}")
+
+
+def do_chi_phi(count: int = 20000):
+    """Chi phí đo đạc trên một hàm rỗng: chưa bật, đã bật, và đã bật có lấy mẫu 1%."""
+    def _noop(data):
+        return data
+
+    module = sys.modules[__name__]
+    module._noop = _noop
+    diem = [DiemDo(__name__, "_noop", "noop", nbytes=_len_arg(0, "data"))]
+    data = b"x" * 64
+
+    def rate():
+        fn = module._noop
+        t0 = time.perf_counter()
+        for _ in range(count):
+            fn(data)
+        return (time.perf_counter() - t0) / count * 1e9
+
+    print(f"tắt:              {rate():8.0f} ns/lần gọi")
+    bat_do_dac(sinks=[], diem_do=diem)
+    print(f"bật:              {rate():8.0f} ns/lần gọi")
+    tat_do_dac(xuat_truoc=False)
+    bat_do_dac(sinks=[], diem_do=diem, ti_le_lay_mau=0.01)
+    print(f"bật + mẫu 1%:     {rate():8.0f} ns/lần gọi")
+    tat_do_dac(xuat_truoc=False)
+    _TRANG_THAI.so_do.dat_lai()
+    del module._noop
+
+
+if __name__ == "__main__":
+    do_chi_phi()
@@ -1,29 +1,102 @@
 from Crypto.PublicKey import ECC
-from Crypto.Hash import SHA256
+from Crypto.Hash import SHA256, SHA384, SHA512
 from Crypto.Cipher import AES
 from Crypto.Random import get_random_bytes
 from Crypto.Util import number
 
+from so_do_chu_ky_ECDSA import chuan_hoa_duong_cong
+
 # --- THÔNG SỐ ĐƯỜNG CONG VÀ CHUẨN MÃ HÓA ---
 
 # Chuẩn mực đường cong được sử dụng phổ biến (ví dụ: NIST P-256)
 CURVE_NAME = 'P-256' 
 KEY_LENGTH = 16 # Độ dài khóa AES 128 bit (16 bytes)
 
+# Các đường cong dùng được cho ECDH: NIST (nhanh vừa, cần cho tuân thủ) và
+# Montgomery X25519 / X448 (RFC 7748, nhanh hơn nhiều)
+DUONG_CONG_ECDH = ('P-256', 'P-384', 'P-521', 'Curve25519', 'Curve448')
+_MONTGOMERY = ('Curve25519', 'Curve448')
+# Hàm băm và độ dài khóa AES theo độ an toàn của đường cong: P-256 / X25519
+# (~128 bit) giữ AES-128 với SHA256; các đường cong lớn hơn dùng AES-256
+KDF_THEO_DUONG_CONG = {
+    'P-256': (SHA256, KEY_LENGTH),
+    'Curve25519': (SHA256, KEY_LENGTH),
+    'P-384': (SHA384, 32),
+    'P-521': (SHA512, 32),
+    'Curve448': (SHA512, 32),
+}
+
+
+def ten_duong_cong(key):
+    """Tên đường cong ngắn của một khóa ECC ('NIST P-256' -> 'P-256')."""
+    return chuan_hoa_duong_cong(key.curve)
+
+
+def do_dai_khoa(curve) -> int:
+    """Độ dài khóa AES theo đường cong (16 byte cho P-256 / X25519, 32 byte cho còn lại)."""
+    return KDF_THEO_DUONG_CONG[chuan_hoa_duong_cong(curve)][1]
+
+
+def la_montgomery(curve) -> bool:
+    """True với X25519 / X448 (chỉ có tọa độ u, thỏa thuận khóa theo RFC 7748)."""
+    return chuan_hoa_duong_cong(curve) in _MONTGOMERY
+
+
+def ma_hoa_diem_cong_khai(key) -> bytes:
+    """Điểm công khai dạng gọn: SEC1 nén (NIST) hoặc tọa độ u little-endian (X25519 / X448)."""
+    if la_montgomery(key.curve):
+        return key.public_key().export_key(format='raw')
+    return key.public_key().export_key(format='SEC1', compress=True)
+
+
+def giai_ma_diem_cong_khai(data: bytes, curve):
+    """Khóa công khai ECC từ ma_hoa_diem_cong_khai(...) trên đường cong curve."""
+    curve = chuan_hoa_duong_cong(curve)
+    if curve in _MONTGOMERY:
+        if len(data) != (32 if curve == 'Curve25519' else 56):
+            raise ValueError(f"Độ dài điểm {curve} không hợp lệ")
+        return ECC.construct(curve=curve, point_x=int.from_bytes(data, 'little'))
+    return ECC.import_key(data, curve_name=curve)
+
+
+def _cung_duong_cong(private_key_a, public_key_b, curve=None):
+    ten_a = ten_duong_cong(private_key_a)
+    if ten_duong_cong(public_key_b) != ten_a:
+        raise ValueError("Hai khóa không cùng đường cong")
+    if curve is not None and chuan_hoa_duong_cong(curve) != ten_a:
+        raise ValueError(f"Khóa thuộc đường cong {ten_a}, không phải {curve}")
+    return ten_a
+
 # --- 1. HÀM THỎA THUẬN KHÓA ECDH ---
 
-def tao_cap_khoa():
-    """Tạo khóa bí mật (private key) và khóa công khai (public key) cho ECC."""
+def tao_cap_khoa(curve=CURVE_NAME):
+    """Tạo khóa bí mật (private key) và khóa công khai (public key) cho ECC trên đường cong curve."""
+    curve = chuan_hoa_duong_cong(curve)
+    if curve not in DUONG_CONG_ECDH:
+        raise ValueError(f"Đường cong không hỗ trợ cho ECDH: {curve} (chọn trong {DUONG_CONG_ECDH})")
     # Khóa ECC trong PyCryptodome chứa cả d (bí mật) và điểm công khai Q (P_A hoặc P_B)
-    key = ECC.generate(curve=CURVE_NAME)
+    key = ECC.generate(curve=curve)
     return key
 
-def tinh_khoa_chung_ecdh(private_key_a, public_key_b):
+def tinh_khoa_chung_ecdh(private_key_a, public_key_b, curve=None):
     """
     Tính Khóa Bí Mật Chung S.
     S = d_A * P_B (Điểm)
-    Sau đó, băm tọa độ x của S thành khóa đối xứng dùng cho AES.
+    Sau đó, băm tọa độ x của S thành khóa đối xứng dùng cho AES, với hàm băm
+    và độ dài khóa theo đường cong (KDF_THEO_DUONG_CONG: 16 byte cho P-256 /
+    X25519, 32 byte cho P-384 / P-521 / X448).
+
+    curve (nếu có) bắt buộc cả hai khóa thuộc đường cong đó. Với X25519 / X448
+    giá trị chung là tọa độ u theo RFC 7748 (little-endian, từ chối kết quả 0).
     """
+    ten_a = _cung_duong_cong(private_key_a, public_key_b, curve)
+    hash_algo, key_length = KDF_THEO_DUONG_CONG[ten_a]
+    if ten_a in _MONTGOMERY:
+        from Crypto.Protocol.DH import key_agreement
+
+        return key_agreement(static_priv=private_key_a, static_pub=public_key_b,
+                             kdf=lambda z: hash_algo.new(z).digest()[:key_length])
+
     # Lấy số mũ bí mật d_A từ khóa riêng của Alice
     d_A = private_key_a.d
     
@@ -33,23 +106,43 @@ def tinh_khoa_chung_ecdh(private_key_a, public_key_b):
     # SỬA LỖI: Thực hiện phép nhân vô hướng S = d_A * P_B
     shared_point = d_A * P_B 
     
-    # Lấy tọa độ x của điểm S và băm nó thành khóa đối xứng có độ dài cố định (SHA256)
+    # Lấy tọa độ x của điểm S và băm nó thành khóa đối xứng có độ dài cố định
     # Tọa độ x là số lớn, cần chuyển thành bytes trước khi băm
     x_coord = shared_point.x.to_bytes() 
     
     # Dùng hàm băm để tạo ra khóa K có độ dài cố định (Khóa đối xứng)
-    shared_secret_key = SHA256.new(x_coord).digest()
+    shared_secret_key = hash_algo.new(x_coord).digest()
     
-    # Chỉ lấy 16 byte đầu (128 bit) cho khóa AES-128
-    return shared_secret_key[:KEY_LENGTH]
+    # Chỉ lấy key_length byte đầu (AES-128 cho P-256, AES-256 cho P-384 / P-521)
+    return shared_secret_key[:key_length]
+
+
+def bi_mat_chung_ecdh(private_key_a, public_key_b, curve=None) -> bytes:
+    """
+    Giá trị chung Z chưa băm, làm đầu vào cho KDF (xem thoa_thuan_khoa_ECDH):
+    tọa độ x của d_A * P_B với độ dài cố định của đường cong, hoặc tọa độ u
+    theo RFC 7748 (key_agreement) với X25519 / X448.
+    """
+    ten_a = _cung_duong_cong(private_key_a, public_key_b, curve)
+    if ten_a in _MONTGOMERY:
+        from Crypto.Protocol.DH import key_agreement
+
+        return key_agreement(static_priv=private_key_a, static_pub=public_key_b, kdf=lambda z: z)
+    shared_point = private_key_a.d * public_key_b.pointQ
+    return shared_point.x.to_bytes(shared_point.size_in_bytes())
 
 # --- 2. HÀM MÃ HÓA VÀ GIẢI MÃ ĐỐI XỨNG (SỬ DỤNG KHÓA CHUNG) ---
 
 # Thường dùng AES ở chế độ GCM (Galois/Counter Mode) để đảm bảo tính xác thực
 def ma_hoa_aes(key, data):
-    """Mã hóa dữ liệu bằng Khóa Bí Mật Chung (AES-GCM)."""
+    """Mã hóa dữ liệu (str hoặc bytes) bằng Khóa Bí Mật Chung (AES-GCM).
+
+    Dữ liệu lớn hoặc file: dùng ma_hoa_luong_AES để mã hóa theo từng khối.
+    """
     cipher = AES.new(key, AES.MODE_GCM)
-    ciphertext, tag = cipher.encrypt_and_digest(data.encode('utf-8'))
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    ciphertext, tag = cipher.encrypt_and_digest(data)
     # Trả về nonce, bản mã và tag (để kiểm tra xác thực)
     return cipher.nonce, ciphertext, tag
 
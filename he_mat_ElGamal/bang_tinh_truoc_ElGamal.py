@@ -0,0 +1,219 @@
+import random
+import time
+
+# --- BẢNG TÍNH TRƯỚC CHO LŨY THỪA CƠ SỐ CỐ ĐỊNH (FIXED-BASE) ---
+#
+# Với một khóa ElGamal đã nạp, g và y không đổi nên g^k, y^k có thể tính bằng
+# phương pháp cửa sổ cố định: chia k thành các chữ số w bit
+#     k = sum(d_i * 2^(w*i))
+# và tra bảng T[i][d] = base^(d * 2^(w*i)) mod p. Khi đó base^k chỉ cần
+# ceil(bits/w) phép nhân, không cần bình phương nào.
+
+DEFAULT_TABLE_BYTES = 4 * 1024 * 1024  # ngân sách bộ nhớ mặc định cho mỗi bảng
+MAX_WINDOW = 10
+_INT_OVERHEAD = 32  # chi phí xấp xỉ của một đối tượng int trong CPython
+
+
+def _table_bytes(exp_bits: int, mod_bytes: int, window: int) -> int:
+    rows = -(-exp_bits // window)
+    return rows * ((1 << window) - 1) * (mod_bytes + _INT_OVERHEAD)
+
+
+def choose_window(exp_bits: int, mod_bytes: int, max_bytes: int) -> int:
+    """Pick the widest window whose table fits in max_bytes (0 if none fits)."""
+    best = 0
+    for w in range(1, MAX_WINDOW + 1):
+        if _table_bytes(exp_bits, mod_bytes, w) <= max_bytes:
+            best = w
+    return best
+
+
+class FixedBaseTable:
+    """Windowed fixed-base table computing base^e mod modulus for e < 2^exp_bits."""
+
+    def __init__(self, base: int, modulus: int, exp_bits: int, window: int):
+        if window < 1:
+            raise ValueError("window phải >= 1")
+        self.base = int(base) % int(modulus)
+        self.modulus = int(modulus)
+        self.exp_bits = int(exp_bits)
+        self.window = int(window)
+
+        rows = []
+        size = 1 << window
+        row_base = self.base
+        for _ in range(-(-self.exp_bits // window)):
+            # row[d] = row_base^d, row[0] = 1 để tra bảng không cần rẽ nhánh
+            row = [1, row_base]
+            for _ in range(2, size):
+                row.append(row[-1] * row_base % self.modulus)
+            rows.append(row)
+            row_base = row[-1] * row_base % self.modulus
+        self._rows = rows
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the table."""
+        return _table_bytes(self.exp_bits, (self.modulus.bit_length() + 7) // 8, self.window)
+
+    def pow(self, e: int) -> int:
+        """Return base^e mod modulus, falling back to pow() outside the table range."""
+        e = int(e)
+        if e < 0 or e.bit_length() > self.exp_bits:
+            return pow(self.base, e, self.modulus)
+        mod = self.modulus
+        mask = (1 << self.window) - 1
+        w = self.window
+        result = 1
+        for row in self._rows:
+            if not e:
+                break
+            d = e & mask
+            if d:
+                result = result * row[d] % mod
+            e >>= w
+        return result
+
+
+class ElGamalPrecomputation:
+    """Lazily built fixed-base tables for g and y of one ElGamal key.
+
+    Tables are only built on first use, so loading a key stays cheap for
+    callers that never encrypt or sign.
+    """
+
+    def __init__(self, p: int, g: int, y: int, max_table_bytes: int = DEFAULT_TABLE_BYTES):
+        self.p = int(p)
+        self.g = int(g)
+        self.y = int(y)
+        self.max_table_bytes = int(max_table_bytes)
+        self.exp_bits = (self.p - 1).bit_length()
+        self.window = choose_window(self.exp_bits, (self.p.bit_length() + 7) // 8, self.max_table_bytes)
+        self._g_table = None
+        self._y_table = None
+
+    def _build(self, base: int):
+        if self.window == 0:
+            return None
+        return FixedBaseTable(base, self.p, self.exp_bits, self.window)
+
+    def pow_g(self, k: int) -> int:
+        if self._g_table is None:
+            self._g_table = self._build(self.g)
+            if self._g_table is None:
+                return pow(self.g, k, self.p)
+        return self._g_table.pow(k)
+
+    def pow_y(self, k: int) -> int:
+        if self._y_table is None:
+            self._y_table = self._build(self.y)
+            if self._y_table is None:
+                return pow(self.y, k, self.p)
+        return self._y_table.pow(k)
+
+
+def attach_precomputation(key, max_table_bytes: int = DEFAULT_TABLE_BYTES, shared=None):
+    """Attach an ElGamalPrecomputation to key (as key._precomp) and return it.
+
+    Pass shared to reuse the tables of the other half of a keypair.
+    max_table_bytes <= 0 disables the tables for this key.
+    """
+    if max_table_bytes <= 0:
+        key._precomp = None
+        return None
+    precomp = shared
+    if precomp is None:
+        precomp = ElGamalPrecomputation(int(key.p), int(key.g), int(key.y), max_table_bytes)
+    key._precomp = precomp
+    return precomp
+
+
+def get_precomputation(key):
+    """Return the precomputation attached to key, or None."""
+    return getattr(key, "_precomp", None)
+
+
+# --- LŨY THỪA ĐA CƠ SỐ (MULTI-EXPONENTIATION, STRAUS) ---
+
+def multi_exp_window(exp_bits: int) -> int:
+    """Window width minimising 2^w + exp_bits/w (table build + additions per base)."""
+    return min(range(1, 9), key=lambda w: (1 << w) + exp_bits / w)
+
+
+def multi_exp(bases, exps, modulus: int, window: int | None = None) -> int:
+    """Return prod(b_i^e_i) mod modulus with one shared chain of squarings.
+
+    Exponents must be non-negative. Cost is max_bits squarings plus about
+    n * (2^w + max_bits/w) multiplications instead of n full exponentiations.
+    """
+    bases = [int(b) % modulus for b in bases]
+    exps = [int(e) for e in exps]
+    if len(bases) != len(exps):
+        raise ValueError("bases và exps phải có cùng độ dài")
+    if any(e < 0 for e in exps):
+        raise ValueError("multi_exp chỉ nhận số mũ không âm")
+    max_bits = max((e.bit_length() for e in exps), default=0)
+    if max_bits == 0:
+        return 1 % modulus
+    w = window or multi_exp_window(max_bits)
+    size = 1 << w
+    mask = size - 1
+
+    tables = []
+    for b in bases:
+        row = [1, b]
+        for _ in range(2, size):
+            row.append(row[-1] * b % modulus)
+        tables.append(row)
+
+    result = 1
+    for shift in range(((max_bits + w - 1) // w - 1) * w, -1, -w):
+        if result != 1:
+            for _ in range(w):
+                result = result * result % modulus
+        for row, e in zip(tables, exps):
+            d = (e >> shift) & mask
+            if d:
+                result = result * row[d] % modulus
+    return result
+
+
+# --- ĐO HIỆU NĂNG ---
+
+def _ops_per_sec(fn, exps, min_time: float = 0.5) -> float:
+    count = 0
+    start = time.perf_counter()
+    while True:
+        for e in exps:
+            fn(e)
+        count += len(exps)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return count / elapsed
+
+
+def benchmark(bits_list=(256, 1024, 2048), table_bytes_list=(256 * 1024, DEFAULT_TABLE_BYTES)):
+    """Print ops/sec of fixed-base tables against plain pow() for several modulus sizes."""
+    from Crypto.Util import number
+
+    print(f"{'bits':>6} {'budget':>10} {'w':>3} {'build(s)':>9} {'pow ops/s':>12} {'table ops/s':>12} {'speedup':>8}")
+    for bits in bits_list:
+        p = number.getPrime(bits)
+        g = random.randrange(2, p - 1)
+        exps = [random.randrange(1, p - 1) for _ in range(64)]
+        base_rate = _ops_per_sec(lambda e: pow(g, e, p), exps)
+        for budget in table_bytes_list:
+            window = choose_window(bits, (bits + 7) // 8, budget)
+            if window == 0:
+                continue
+            t0 = time.perf_counter()
+            table = FixedBaseTable(g, p, (p - 1).bit_length(), window)
+            build = time.perf_counter() - t0
+            assert all(table.pow(e) == pow(g, e, p) for e in exps[:4])
+            rate = _ops_per_sec(table.pow, exps)
+            print(f"{bits:>6} {budget // 1024:>8}KB {window:>3} {build:>9.3f} "
+                  f"{base_rate:>12.0f} {rate:>12.0f} {rate / base_rate:>7.2f}x")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -1,24 +1,84 @@
+import sys
 from Crypto.Util.number import bytes_to_long, long_to_bytes
-import random
 from pathlib import Path
 
+from Crypto.Random import random as crypto_random
+
 # Import loader from doc_key_ElGamal (expects the PEM-like files in the same folder)
 from doc_key_ElGamal import load_elgamal_keypair
+from bang_tinh_truoc_ElGamal import get_precomputation
+from so_hoc_modulo import egcd as _egcd, modinv as _modinv, batch_modinv
+
+# Bộ lũy thừa an toàn dùng chung (luy_thua_an_toan) nằm ở thư mục gốc của dự án
+_ROOT_DIR = str(Path(__file__).resolve().parent.parent)
+if _ROOT_DIR not in sys.path:
+    sys.path.append(_ROOT_DIR)
+
+from luy_thua_an_toan import dang_cung_hoa, luy_thua_an_toan
+
+
+def _pow_bi_mat(key, base: int, k: int, precomp_pow=None) -> int:
+    """base^k mod p for a secret k (ephemeral or signing nonce).
+
+    Fast mode uses the fixed-base table when one is attached; hardened mode
+    always goes through the blinded constant-access engine.
+    """
+    p = int(key.p)
+    if dang_cung_hoa():
+        return luy_thua_an_toan(base, k, p, order=p - 1)
+    if precomp_pow is not None:
+        return precomp_pow(k)
+    return pow(base, k, p)
+
+
+def _cap_che_mu(privkey):
+    """Return (g^rho, y^rho) for base blinding.
+
+    rho is drawn once per key and the pair is squared after every use (same
+    refresh as KhoaBiMatCRT in he_mat_RSA), so no extra exponentiation per call.
+    """
+    p = int(privkey.p)
+    pair = getattr(privkey, "_blind", None)
+    if pair is None:
+        rho = crypto_random.randrange(1, p - 1)
+        pair = (luy_thua_an_toan(int(privkey.g), rho, p, order=p - 1),
+                luy_thua_an_toan(int(privkey.y), rho, p, order=p - 1))
+    else:
+        pair = (pair[0] * pair[0] % p, pair[1] * pair[1] % p)
+    privkey._blind = pair
+    return pair
+
+
+def _luy_thua_giai_ma(privkey, c1s):
+    """Return ([t_i], u) with c1_i^x == t_i * u^-1 mod p for every c1_i.
+
+    Hardened mode blinds the base with g^rho (so t_i = (c1_i * g^rho)^x and
+    u = y^rho) and the exponent inside luy_thua_an_toan; fast mode has u = 1.
+    """
+    p = int(privkey.p)
+    x = int(privkey.x)
+    if not dang_cung_hoa():
+        return [pow(c1, x, p) for c1 in c1s], 1
+    g_rho, y_rho = _cap_che_mu(privkey)
+    return [luy_thua_an_toan(c1 * g_rho % p, x, p, order=p - 1) for c1 in c1s], y_rho
 
 
 def elgamal_encrypt(pubkey, m: int, k: int | None = None):
     """Encrypt integer m with public key object pubkey.
 
     Returns (c1, c2) where c1 = g^k mod p and c2 = m * y^k mod p.
+    Uses the key's fixed-base tables when load_elgamal_keypair attached them
+    (fast mode only); k is drawn from a CSPRNG when omitted.
     """
     # Convert key components to plain Python ints to avoid mixed-type math
     p = int(pubkey.p)
     g = int(pubkey.g)
     y = int(pubkey.y)
     if k is None:
-        k = random.randrange(1, p - 1)
-    c1 = pow(g, k, p)
-    s = pow(y, k, p)
+        k = crypto_random.randrange(1, p - 1)
+    precomp = get_precomputation(pubkey)
+    c1 = _pow_bi_mat(pubkey, g, k, precomp.pow_g if precomp is not None else None)
+    s = _pow_bi_mat(pubkey, y, k, precomp.pow_y if precomp is not None else None)
     c2 = (int(m) * int(s)) % p
     return c1, c2
 
@@ -29,41 +89,39 @@ def elgamal_decrypt(privkey, c1: int, c2: int):
     Returns integer plaintext m.
     """
     p = int(privkey.p)
-    x = int(privkey.x)
     c1 = int(c1)
     c2 = int(c2)
-    s = pow(c1, x, p)
+    (s,), u = _luy_thua_giai_ma(privkey, [c1])
     # modular inverse of s modulo p
-    try:
-        s_inv = pow(s, -1, p)
-    except TypeError:
-        # older Python versions: use Fermat's little theorem (p is prime)
-        s_inv = pow(s, p - 2, p)
-    m = (c2 * s_inv) % p
+    s_inv = _modinv(s, p)
+    m = (c2 * u * s_inv) % p
     return m
 
 
-def _egcd(a: int, b: int):
-    if b == 0:
-        return a, 1, 0
-    g, x1, y1 = _egcd(b, a % b)
-    return g, y1, x1 - (a // b) * y1
+def elgamal_decrypt_batch(privkey, ciphertexts):
+    """Decrypt many (c1, c2) pairs, sharing one modular inversion across the batch.
 
+    Returns a list of integer plaintexts in input order.
+    """
+    p = int(privkey.p)
+    pairs = [(int(c1), int(c2)) for c1, c2 in ciphertexts]
+    shared, u = _luy_thua_giai_ma(privkey, [c1 for c1, _ in pairs])
+    inverses = batch_modinv(shared, p)
+    return [(c2 * u * s_inv) % p for (_, c2), s_inv in zip(pairs, inverses)]
 
-def _modinv(a: int, m: int) -> int:
-    try:
-        return pow(a, -1, m)
-    except TypeError:
-        # older Python where pow(..., -1, mod) not supported
-        g, x, _ = _egcd(a, m)
-        if g != 1:
-            raise ValueError(f"No modular inverse for {a} mod {m}")
-        return x % m
+
+def _hash_message(message: bytes, p: int) -> int:
+    """Hash message with SHA-256 and reduce it modulo p-1."""
+    import hashlib
+
+    h = hashlib.sha256(message).digest()
+    return int.from_bytes(h, "big") % (p - 1)
 
 
-def elgamal_sign(privkey, message: bytes):
+def elgamal_sign(privkey, message: bytes, k: int | None = None):
     """Sign message (bytes) using ElGamal private key (x, p, g).
 
+    k must satisfy gcd(k, p-1) == 1; when omitted it is drawn from a CSPRNG.
     Returns (r, s).
     """
     p = int(privkey.p)
@@ -71,23 +129,49 @@ def elgamal_sign(privkey, message: bytes):
     x = int(privkey.x)
 
     # Hash message to integer
-    import hashlib
-
-    h = hashlib.sha256(message).digest()
-    m = int.from_bytes(h, "big") % (p - 1)
+    m = _hash_message(message, p)
 
     # choose k with gcd(k, p-1) == 1
-    while True:
-        k = random.randrange(2, p - 1)
-        if _egcd(k, p - 1)[0] == 1:
-            break
+    while k is None:
+        k = crypto_random.randrange(2, p - 1)
+        if _egcd(k, p - 1)[0] != 1:
+            k = None
 
-    r = pow(g, k, p)
+    precomp = get_precomputation(privkey)
+    r = _pow_bi_mat(privkey, g, k, precomp.pow_g if precomp is not None else None)
     k_inv = _modinv(k, p - 1)
     s = (k_inv * (m - x * r)) % (p - 1)
     return r, s
 
 
+def elgamal_sign_batch(privkey, messages):
+    """Sign many messages; all k^-1 mod p-1 are computed with one batched inversion.
+
+    Returns a list of (r, s) in input order.
+    """
+    p = int(privkey.p)
+    g = int(privkey.g)
+    x = int(privkey.x)
+    order = p - 1
+    precomp = get_precomputation(privkey)
+
+    ks = []
+    for _ in messages:
+        while True:
+            k = crypto_random.randrange(2, order)
+            if _egcd(k, order)[0] == 1:
+                break
+        ks.append(k)
+    k_invs = batch_modinv(ks, order)
+
+    signatures = []
+    for message, k, k_inv in zip(messages, ks, k_invs):
+        r = _pow_bi_mat(privkey, g, k, precomp.pow_g if precomp is not None else None)
+        m = _hash_message(message, p)
+        signatures.append((r, (k_inv * (m - x * r)) % order))
+    return signatures
+
+
 def elgamal_verify(pubkey, message: bytes, signature) -> bool:
     """Verify ElGamal signature (r, s) for message (bytes) using public key (p,g,y)."""
     p = int(pubkey.p)
@@ -98,10 +182,7 @@ def elgamal_verify(pubkey, message: bytes, signature) -> bool:
     if not (0 < r < p):
         return False
 
-    import hashlib
-
-    h = hashlib.sha256(message).digest()
-    m = int.from_bytes(h, "big") % (p - 1)
+    m = _hash_message(message, p)
 
     v1 = (pow(y, r, p) * pow(r, s, p)) % p
     v2 = pow(g, m, p)
@@ -128,6 +209,14 @@ def main():
 
     if message_int >= public_key.p:
         print("Thông điệp quá lớn để mã hóa trực tiếp bằng ElGamal với độ dài khóa này.")
+        print("Chuyển sang mã hóa lai ElGamal + AES-GCM theo luồng.")
+        from ma_hoa_luong_ElGamal import elgamal_encrypt_bytes, elgamal_decrypt_bytes
+
+        blob = elgamal_encrypt_bytes(public_key, message_bytes)
+        print(f"Bản mã lai: {len(blob)} bytes")
+        if private_key is not None:
+            ok = elgamal_decrypt_bytes(private_key, blob) == message_bytes
+            print(f"Thông điệp gốc và thông điệp đã giải mã khớp: {ok}")
         return
 
     try:
@@ -0,0 +1,186 @@
+import hashlib
+import hmac
+import math
+import queue
+import threading
+import time
+from pathlib import Path
+
+from Crypto.Random import random as crypto_random
+
+from doc_key_ElGamal import load_elgamal_keypair
+from he_mat_ElGamal import elgamal_sign, elgamal_verify, _hash_message, _modinv, _pow_bi_mat
+from bang_tinh_truoc_ElGamal import get_precomputation
+
+
+# --- SINH k TẤT ĐỊNH THEO KIỂU RFC 6979 ---
+#
+# k được dẫn xuất bằng HMAC-DRBG từ khóa bí mật x và H(m), nên không phụ thuộc
+# vào chất lượng bộ sinh số ngẫu nhiên: cùng (x, m) luôn cho cùng k, khác m cho
+# k khác nhau. Khác với DSA/ECDSA, "bậc" ở đây là p - 1 và ElGamal còn cần
+# gcd(k, p - 1) = 1, nên ứng viên không thỏa điều kiện đó cũng bị loại (bước h.3).
+
+def rfc6979_k(x: int, order: int, h1: bytes, hashfunc=hashlib.sha256) -> int:
+    """Deterministic k in [2, order) with gcd(k, order) == 1, derived from x and digest h1."""
+    qlen = order.bit_length()
+    rlen = (qlen + 7) // 8
+    hlen = hashfunc().digest_size
+
+    def bits2int(b: bytes) -> int:
+        v = int.from_bytes(b, "big")
+        extra = len(b) * 8 - qlen
+        return v >> extra if extra > 0 else v
+
+    def int2octets(v: int) -> bytes:
+        return v.to_bytes(rlen, "big")
+
+    def mac(key: bytes, data: bytes) -> bytes:
+        return hmac.new(key, data, hashfunc).digest()
+
+    seed = int2octets(x % order) + int2octets(bits2int(h1) % order)
+    v = b"\x01" * hlen
+    k = b"\x00" * hlen
+    k = mac(k, v + b"\x00" + seed)
+    v = mac(k, v)
+    k = mac(k, v + b"\x01" + seed)
+    v = mac(k, v)
+    while True:
+        t = b""
+        while len(t) < rlen:
+            v = mac(k, v)
+            t += v
+        candidate = bits2int(t)
+        if 1 < candidate < order and math.gcd(candidate, order) == 1:
+            return candidate
+        k = mac(k, v + b"\x00")
+        v = mac(k, v)
+
+
+def elgamal_sign_deterministic(privkey, message: bytes):
+    """ElGamal signature with k derived as in RFC 6979 (no RNG on the signing path)."""
+    p = int(privkey.p)
+    k = rfc6979_k(int(privkey.x), p - 1, hashlib.sha256(message).digest())
+    return elgamal_sign(privkey, message, k)
+
+
+# --- KÝ OFFLINE/ONLINE VỚI KHO (k, g^k, k^-1) TÍNH SẴN ---
+#
+# Phần đắt của chữ ký (g^k mod p và k^-1 mod p-1) không phụ thuộc thông điệp,
+# nên một luồng nền tính sẵn các bộ ba. Khi ký chỉ còn
+#     s = k^-1 * (m - x*r) mod (p-1)
+# tức hai phép nhân. Mỗi bộ ba chỉ được dùng đúng một lần (lấy ra khỏi hàng đợi).
+
+class ElGamalSigner:
+    """Signing engine with "deterministic", "pool" (offline/online) or "random" k."""
+
+    def __init__(self, privkey, mode: str = "deterministic", pool_size: int = 64):
+        if mode not in ("deterministic", "pool", "random"):
+            raise ValueError(f"Chế độ không hỗ trợ: {mode}")
+        self.privkey = privkey
+        self.mode = mode
+        self.p = int(privkey.p)
+        self.g = int(privkey.g)
+        self.x = int(privkey.x)
+        self.pool_size = pool_size
+        self._pool = queue.Queue(maxsize=pool_size)
+        self._stop = threading.Event()
+        self._thread = None
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        if mode == "pool":
+            self.start()
+
+    def _new_triple(self):
+        order = self.p - 1
+        while True:
+            k = crypto_random.randrange(2, order)
+            if math.gcd(k, order) == 1:
+                break
+        precomp = get_precomputation(self.privkey)
+        r = _pow_bi_mat(self.privkey, self.g, k, precomp.pow_g if precomp is not None else None)
+        return k, r, _modinv(k, order)
+
+    def _refill(self):
+        while not self._stop.is_set():
+            triple = self._new_triple()
+            self.generated += 1
+            while not self._stop.is_set():
+                try:
+                    self._pool.put(triple, timeout=0.2)
+                    break
+                except queue.Full:
+                    continue
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._refill, name="elgamal-sign-pool", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def fill(self, count: int | None = None):
+        """Synchronously top the pool up (e.g. before a burst of signatures)."""
+        target = self.pool_size if count is None else min(count, self.pool_size)
+        while self._pool.qsize() < target:
+            try:
+                self._pool.put_nowait(self._new_triple())
+                self.generated += 1
+            except queue.Full:
+                break
+
+    def _take_triple(self):
+        try:
+            triple = self._pool.get_nowait()
+            self.hits += 1
+            return triple
+        except queue.Empty:
+            self.misses += 1
+            return self._new_triple()
+
+    def sign(self, message: bytes):
+        if self.mode == "deterministic":
+            return elgamal_sign_deterministic(self.privkey, message)
+        if self.mode == "random":
+            return elgamal_sign(self.privkey, message)
+        _, r, k_inv = self._take_triple()
+        m = _hash_message(message, self.p)
+        s = (k_inv * (m - self.x * r)) % (self.p - 1)
+        return r, s
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"mode": self.mode, "pool_size": self.pool_size, "ready": self._pool.qsize(),
+                "hits": self.hits, "misses": self.misses, "generated": self.generated,
+                "hit_rate": self.hits / total if total else 0.0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def benchmark(count: int = 500):
+    """Compare online signing cost of the three modes on the stored key."""
+    private_key, public_key = load_elgamal_keypair(Path(__file__).parent)
+    messages = [f"message {i}".encode() for i in range(count)]
+    for mode in ("random", "deterministic", "pool"):
+        with ElGamalSigner(private_key, mode=mode, pool_size=count) as signer:
+            if mode == "pool":
+                signer.stop()  # đo riêng phần online: tính sẵn đầy kho trước
+                signer.fill()
+            t0 = time.perf_counter()
+            sigs = [signer.sign(msg) for msg in messages]
+            rate = count / (time.perf_counter() - t0)
+            ok = all(elgamal_verify(public_key, msg, sig) for msg, sig in zip(messages, sigs))
+            print(f"{mode:<14} {rate:10.0f} sig/s  hợp lệ: {ok}  {signer.stats()}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,242 @@
+import functools
+import mmap
+import struct
+import time
+from pathlib import Path
+
+from Crypto.Random import get_random_bytes
+
+from bang_tinh_truoc_ElGamal import attach_precomputation, get_precomputation
+from doc_key_ElGamal import load_elgamal_keypair
+from he_mat_ElGamal import _pow_bi_mat, elgamal_encrypt, elgamal_decrypt_batch
+
+
+# --- MÃ HÓA ElGamal THEO LÔ, LƯU BẢN MÃ DẠNG MẢNG BYTE CỐ ĐỊNH ---
+#
+# Mỗi bản mã (c1, c2) chiếm đúng 2 * width byte big-endian (width = số byte của p)
+# trong một bytearray liền mạch, thay vì hai đối tượng int Python (~2 * (width + 32)
+# byte cộng danh sách và tuple). Mọi giá trị dùng chung bảng cơ số cố định của
+# g và y; số ngẫu nhiên k được lấy theo khối RANDOM_BLOCK bản ghi mỗi lần gọi
+# get_random_bytes.
+#
+# File: MAGIC | width (u16) | count (u64) | các bản ghi c1 | c2, đọc lại bằng mmap.
+
+MAGIC = b"EGB1"
+_HEADER = struct.Struct(">4sHQ")
+RANDOM_BLOCK = 4096
+
+
+class BanMaLo:
+    """Array-backed batch of ElGamal ciphertexts: record i = c1 | c2, each width bytes big-endian."""
+
+    __slots__ = ("width", "count", "_buf", "_mmap")
+
+    def __init__(self, width: int, count: int, buffer=None):
+        self.width = int(width)
+        self.count = int(count)
+        size = 2 * self.width * self.count
+        if buffer is None:
+            buffer = bytearray(size)
+        view = memoryview(buffer)
+        if view.nbytes != size:
+            raise ValueError(f"Bộ đệm dài {view.nbytes} bytes, cần {size}")
+        self._buf = view.cast("B")
+        self._mmap = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def record_size(self) -> int:
+        return 2 * self.width
+
+    @property
+    def nbytes(self) -> int:
+        return self._buf.nbytes
+
+    @property
+    def buffer(self) -> memoryview:
+        """Zero-copy view of the packed records."""
+        return self._buf
+
+    def __getitem__(self, i: int):
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        w = self.width
+        start = 2 * w * i
+        rec = self._buf[start:start + 2 * w]
+        return int.from_bytes(rec[:w], "big"), int.from_bytes(rec[w:], "big")
+
+    def __iter__(self):
+        w = self.width
+        buf = self._buf
+        for start in range(0, self.nbytes, 2 * w):
+            yield int.from_bytes(buf[start:start + w], "big"), int.from_bytes(buf[start + w:start + 2 * w], "big")
+
+    def set(self, i: int, c1: int, c2: int):
+        w = self.width
+        start = 2 * w * i
+        self._buf[start:start + w] = c1.to_bytes(w, "big")
+        self._buf[start + w:start + 2 * w] = c2.to_bytes(w, "big")
+
+    def as_numpy(self):
+        """NumPy view (count, 2, width) of uint8 sharing this buffer (requires numpy)."""
+        import numpy as np
+
+        return np.frombuffer(self._buf, dtype=np.uint8).reshape(self.count, 2, self.width)
+
+    def ghi_file(self, path) -> int:
+        """Write header + records; the records are written straight from the buffer."""
+        header = _HEADER.pack(MAGIC, self.width, self.count)
+        with open(path, "wb") as f:
+            f.write(header)
+            f.write(self._buf)
+        return len(header) + self.nbytes
+
+    @classmethod
+    def doc_file(cls, path, use_mmap: bool = True):
+        """Load a batch written by ghi_file. With use_mmap the records stay on disk (read-only view)."""
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                raise ValueError("File bản mã lô quá ngắn")
+            magic, width, count = _HEADER.unpack(header)
+            if magic != MAGIC:
+                raise ValueError("Sai định dạng file bản mã lô (magic không khớp)")
+            size = 2 * width * count
+            if not use_mmap or size == 0:
+                data = bytearray(size)
+                if f.readinto(data) != size:
+                    raise ValueError("File bản mã lô bị cắt cụt")
+                return cls(width, count, data)
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mapped) < _HEADER.size + size:
+            mapped.close()
+            raise ValueError("File bản mã lô bị cắt cụt")
+        batch = cls(width, count, memoryview(mapped)[_HEADER.size:_HEADER.size + size])
+        batch._mmap = mapped
+        return batch
+
+    def close(self):
+        """Release the mmap backing a batch loaded with doc_file(use_mmap=True)."""
+        if self._mmap is not None:
+            self._buf.release()
+            self._mmap.close()
+            self._mmap = None
+
+
+def elgamal_encrypt_many(pubkey, messages, exponent_bits: int | None = None) -> BanMaLo:
+    """Encrypt each integer in messages (0 < m < p) under pubkey into one BanMaLo.
+
+    messages may be any sequence or iterable of ints (list, array.array, NumPy
+    array). exponent_bits shortens the random exponent k (e.g. 256 for
+    2048-bit RFC 7919 groups, which allow short exponents); default is full length.
+    With the hardened modexp engine enabled (luy_thua_an_toan), g^k and y^k
+    skip the fixed-base tables.
+    """
+    p = int(pubkey.p)
+    width = (p.bit_length() + 7) // 8
+    precomp = get_precomputation(pubkey)
+    if precomp is None:
+        precomp = attach_precomputation(pubkey)
+    if precomp is None:
+        raise ValueError("Mã hóa theo lô cần bảng tính trước (max_table_bytes > 0)")
+
+    values = messages if hasattr(messages, "__len__") else list(messages)
+    count = len(values)
+    batch = BanMaLo(width, count)
+
+    k_bits = (p - 1).bit_length() if exponent_bits is None else int(exponent_bits)
+    k_bytes = (k_bits + 7) // 8 + 8  # thêm 64 bit để lấy mod gần đều
+    k_range = (1 << k_bits) - 2 if exponent_bits is not None else p - 3
+
+    # k bí mật: bảng cơ số cố định ở chế độ "fast", bộ lũy thừa cứng hóa ở "hardened"
+    pow_g = functools.partial(_pow_bi_mat, pubkey, int(pubkey.g), precomp_pow=precomp.pow_g)
+    pow_y = functools.partial(_pow_bi_mat, pubkey, int(pubkey.y), precomp_pow=precomp.pow_y)
+    buf = batch.buffer
+    rec = 2 * width
+    randomness = b""
+    for i, m in enumerate(values):
+        m = int(m)
+        # m = 0 cho c2 = 0, lộ bản rõ ngay trong bản mã
+        if not 0 < m < p:
+            raise ValueError(f"Giá trị thứ {i} nằm ngoài (0, p): {m}")
+        j = i % RANDOM_BLOCK
+        if j == 0:
+            # Lấy ngẫu nhiên theo khối cố định, không cấp một bộ đệm tỉ lệ với cả lô
+            randomness = memoryview(get_random_bytes(k_bytes * min(RANDOM_BLOCK, count - i)))
+        k = int.from_bytes(randomness[j * k_bytes:(j + 1) * k_bytes], "big") % k_range + 1
+        start = i * rec
+        buf[start:start + width] = pow_g(k).to_bytes(width, "big")
+        buf[start + width:start + rec] = (m * pow_y(k) % p).to_bytes(width, "big")
+    return batch
+
+
+def elgamal_decrypt_many(privkey, batch: BanMaLo, chunk: int = 4096) -> list:
+    """Decrypt every record of batch; inversions are shared per chunk (Montgomery's trick)."""
+    out = []
+    pairs = []
+    for c1, c2 in batch:
+        pairs.append((c1, c2))
+        if len(pairs) == chunk:
+            out.extend(elgamal_decrypt_batch(privkey, pairs))
+            pairs.clear()
+    if pairs:
+        out.extend(elgamal_decrypt_batch(privkey, pairs))
+    return out
+
+
+# --- ĐO HIỆU NĂNG ---
+
+def benchmark(counts=(100_000,), base_dir=None, exponent_bits: int | None = None):
+    """Values/sec and memory of elgamal_encrypt in a loop vs elgamal_encrypt_many."""
+    import sys
+    import tempfile
+
+    private_key, public_key = load_elgamal_keypair(Path(base_dir) if base_dir else Path(__file__).parent)
+    p_bits = int(public_key.p).bit_length()
+    print(f"Khóa {p_bits} bit, exponent_bits={exponent_bits or 'đầy đủ'}")
+    for count in counts:
+        values = list(range(1, count + 1))
+
+        sample = values[: min(count, 20_000)]
+        t0 = time.perf_counter()
+        loop = [elgamal_encrypt(public_key, m) for m in sample]
+        loop_rate = len(sample) / (time.perf_counter() - t0)
+        list_bytes = sys.getsizeof(loop) + sum(sys.getsizeof(t) + sys.getsizeof(t[0]) + sys.getsizeof(t[1])
+                                               for t in loop)
+
+        t0 = time.perf_counter()
+        batch = elgamal_encrypt_many(public_key, values, exponent_bits)
+        batch_rate = count / (time.perf_counter() - t0)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "batch.egb"
+            t0 = time.perf_counter()
+            batch.ghi_file(path)
+            t_write = time.perf_counter() - t0
+            loaded = BanMaLo.doc_file(path)
+            t0 = time.perf_counter()
+            check = elgamal_decrypt_many(private_key, loaded)
+            t_dec = time.perf_counter() - t0
+            ok = check == values
+            loaded.close()
+
+        print(f"{count:>9} giá trị: vòng lặp elgamal_encrypt {loop_rate:9.0f}/s, "
+              f"elgamal_encrypt_many {batch_rate:9.0f}/s ({batch_rate / loop_rate:.2f}x)")
+        print(f"{'':>9} bộ nhớ: list (int, int) {list_bytes / len(sample):6.0f} B/bản mã, "
+              f"BanMaLo {batch.record_size} B/bản mã; ghi file {batch.nbytes / 1e6 / t_write:7.0f} MB/s; "
+              f"giải mã lô {count / t_dec:9.0f}/s, khớp: {ok}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Đo mã hóa ElGamal theo lô.")
+    parser.add_argument("--count", type=int, action="append", help="Số giá trị (có thể lặp lại)")
+    parser.add_argument("--key-dir", help="Thư mục khóa ElGamal (mặc định: thư mục này)")
+    parser.add_argument("--exponent-bits", type=int, help="Độ dài số mũ ngẫu nhiên k")
+    args = parser.parse_args()
+    benchmark(tuple(args.count or (100_000,)), args.key_dir, args.exponent_bits)
@@ -0,0 +1,217 @@
+import io
+import struct
+from pathlib import Path
+
+from Crypto.Cipher import AES
+from Crypto.Hash import SHA256
+from Crypto.Protocol.KDF import HKDF
+from Crypto.Random import random as crypto_random
+
+from doc_key_ElGamal import load_elgamal_keypair
+from he_mat_ElGamal import elgamal_encrypt, elgamal_decrypt
+
+
+# --- ĐỊNH DẠNG LUỒNG ---
+#
+# header = MAGIC | chunk_size (u32) | len_c (u16) | c1 | c2
+# chunk  = AES-GCM(ciphertext) | tag (16 bytes)
+#
+# Một lần đóng gói khóa ElGamal (c1, c2) cho cả luồng, sau đó AES-GCM mã hóa
+# từng khối có kích thước cố định. Nonce của mỗi khối được suy ra từ bộ đếm
+# (STREAM): 11 byte bộ đếm big-endian + 1 byte cờ "khối cuối", nên kẻ tấn công
+# không thể đổi thứ tự, xóa hay cắt cụt khối mà không bị phát hiện.
+
+MAGIC = b"EGS1"
+AES_KEY_LENGTH = 32
+TAG_LENGTH = 16
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# Giới hạn chunk_size đọc từ header: bên giải mã cấp phát ~2 * (chunk_size + 16) byte
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+_HEADER_FIXED = struct.Struct(">4sIH")
+_MAX_COUNTER = 1 << 88
+
+
+def _modulus_bytes(key) -> int:
+    return (int(key.p).bit_length() + 7) // 8
+
+
+def _derive_key(m: int, p: int, header_prefix: bytes) -> bytes:
+    secret = m.to_bytes((p.bit_length() + 7) // 8, "big")
+    return HKDF(secret, AES_KEY_LENGTH, header_prefix, SHA256, context=b"elgamal-stream")
+
+
+def _chunk_nonce(counter: int, final: bool) -> bytes:
+    if counter >= _MAX_COUNTER:
+        raise ValueError("Luồng quá dài: bộ đếm nonce bị tràn")
+    return counter.to_bytes(11, "big") + (b"\x01" if final else b"\x00")
+
+
+def _read_exact(src, size: int) -> bytes:
+    """Read up to size bytes, looping over short reads (pipes, sockets)."""
+    parts = []
+    remaining = size
+    while remaining > 0:
+        data = src.read(remaining)
+        if not data:
+            break
+        parts.append(data)
+        remaining -= len(data)
+    return b"".join(parts)
+
+
+def encapsulate_key(pubkey, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Run one ElGamal key encapsulation for a stream.
+
+    Returns (header, aes_key). The header carries (c1, c2) encrypting a random
+    element m of Z_p*; the AES key is derived from m with HKDF-SHA256.
+    """
+    if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+        raise ValueError(f"chunk_size phải nằm trong khoảng (0, {MAX_CHUNK_SIZE}]")
+    p = int(pubkey.p)
+    width = _modulus_bytes(pubkey)
+    m = crypto_random.randint(2, p - 2)
+    k = crypto_random.randint(1, p - 2)
+    c1, c2 = elgamal_encrypt(pubkey, m, k)
+    header = (
+        _HEADER_FIXED.pack(MAGIC, chunk_size, width)
+        + int(c1).to_bytes(width, "big")
+        + int(c2).to_bytes(width, "big")
+    )
+    return header, _derive_key(m, p, header)
+
+
+def parse_header(src):
+    """Read the stream header from src. Returns (header, chunk_size, c1, c2)."""
+    fixed = _read_exact(src, _HEADER_FIXED.size)
+    if len(fixed) != _HEADER_FIXED.size:
+        raise ValueError("Luồng quá ngắn: thiếu header")
+    magic, chunk_size, width = _HEADER_FIXED.unpack(fixed)
+    if magic != MAGIC:
+        raise ValueError("Sai định dạng luồng ElGamal (magic không khớp)")
+    if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+        raise ValueError("chunk_size trong header không hợp lệ")
+    body = _read_exact(src, 2 * width)
+    if len(body) != 2 * width:
+        raise ValueError("Luồng quá ngắn: header bị cắt cụt")
+    c1 = int.from_bytes(body[:width], "big")
+    c2 = int.from_bytes(body[width:], "big")
+    return fixed + body, chunk_size, c1, c2
+
+
+def elgamal_encrypt_stream(pubkey, src, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Encrypt the file-like object src, yielding ciphertext pieces.
+
+    The first yielded value is the header, then one sealed frame per chunk.
+    At most two plaintext chunks are held in memory at any time.
+    """
+    header, key = encapsulate_key(pubkey, chunk_size)
+    yield header
+
+    counter = 0
+    current = _read_exact(src, chunk_size)
+    while True:
+        # Đọc trước một khối để biết khối hiện tại có phải khối cuối không
+        nxt = _read_exact(src, chunk_size) if len(current) == chunk_size else b""
+        final = not nxt
+        cipher = AES.new(key, AES.MODE_GCM, nonce=_chunk_nonce(counter, final))
+        cipher.update(header)
+        ciphertext, tag = cipher.encrypt_and_digest(current)
+        yield ciphertext + tag
+        if final:
+            return
+        counter += 1
+        current = nxt
+
+
+def elgamal_decrypt_stream(privkey, src):
+    """Decrypt a stream produced by elgamal_encrypt_stream, yielding plaintext chunks.
+
+    Each chunk is authenticated before it is yielded. Raises ValueError if a
+    chunk fails verification or the stream is truncated/reordered.
+    """
+    header, chunk_size, c1, c2 = parse_header(src)
+    p = int(privkey.p)
+    if not (0 < c1 < p and 0 < c2 < p):
+        raise ValueError("Bản mã khóa (c1, c2) không hợp lệ")
+    m = elgamal_decrypt(privkey, c1, c2)
+    key = _derive_key(m, p, header)
+
+    frame_size = chunk_size + TAG_LENGTH
+    counter = 0
+    current = _read_exact(src, frame_size)
+    while True:
+        if len(current) < TAG_LENGTH:
+            raise ValueError("Luồng bị cắt cụt: khối thiếu tag")
+        nxt = _read_exact(src, frame_size) if len(current) == frame_size else b""
+        final = not nxt
+        cipher = AES.new(key, AES.MODE_GCM, nonce=_chunk_nonce(counter, final))
+        cipher.update(header)
+        try:
+            plaintext = cipher.decrypt_and_verify(current[:-TAG_LENGTH], current[-TAG_LENGTH:])
+        except ValueError:
+            raise ValueError(f"Xác thực khối {counter} thất bại (dữ liệu bị thay đổi hoặc cắt cụt)")
+        yield plaintext
+        if final:
+            return
+        counter += 1
+        current = nxt
+
+
+def elgamal_encrypt_file(pubkey, src, dst, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Encrypt src into dst (file-like objects). Returns the number of bytes written."""
+    written = 0
+    for piece in elgamal_encrypt_stream(pubkey, src, chunk_size):
+        dst.write(piece)
+        written += len(piece)
+    return written
+
+
+def elgamal_decrypt_file(privkey, src, dst) -> int:
+    """Decrypt src into dst (file-like objects). Returns the number of plaintext bytes."""
+    written = 0
+    for piece in elgamal_decrypt_stream(privkey, src):
+        dst.write(piece)
+        written += len(piece)
+    return written
+
+
+def elgamal_encrypt_bytes(pubkey, data: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE) -> bytes:
+    """Convenience wrapper: encrypt an in-memory bytes payload."""
+    out = io.BytesIO()
+    elgamal_encrypt_file(pubkey, io.BytesIO(data), out, chunk_size)
+    return out.getvalue()
+
+
+def elgamal_decrypt_bytes(privkey, blob: bytes) -> bytes:
+    """Convenience wrapper: decrypt an in-memory ciphertext."""
+    out = io.BytesIO()
+    elgamal_decrypt_file(privkey, io.BytesIO(blob), out)
+    return out.getvalue()
+
+
+def main():
+    base_dir = Path(__file__).parent
+    private_key, public_key = load_elgamal_keypair(base_dir)
+    if private_key is None:
+        print("Không có private key để giải mã. Kết thúc.")
+        return
+
+    message = ("Thông điệp dài hơn modulus p rất nhiều lần. " * 2000).encode("utf-8")
+    blob = elgamal_encrypt_bytes(public_key, message, chunk_size=4096)
+    print("--- Mã hóa lai ElGamal + AES-GCM theo luồng ---")
+    print(f"Độ dài bản rõ: {len(message)} bytes, độ dài bản mã: {len(blob)} bytes")
+
+    decrypted = elgamal_decrypt_bytes(private_key, blob)
+    print(f"Giải mã khớp với bản gốc: {decrypted == message}")
+
+    tampered = bytearray(blob)
+    tampered[-1] ^= 1
+    try:
+        elgamal_decrypt_bytes(private_key, bytes(tampered))
+        print("Lỗi! Lẽ ra bản mã bị sửa phải bị từ chối.")
+    except ValueError as e:
+        print(f"Phát hiện bản mã bị sửa: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import random
+import time
+
+# --- SỐ HỌC MODULO: EUCLID MỞ RỘNG KHÔNG ĐỆ QUY VÀ NGHỊCH ĐẢO THEO LÔ ---
+
+
+def egcd(a: int, b: int):
+    """Iterative extended Euclid. Returns (g, x, y) with a*x + b*y == g == gcd(a, b)."""
+    x0, x1, y0, y1 = 1, 0, 0, 1
+    while b:
+        q, r = divmod(a, b)
+        a, b = b, r
+        x0, x1 = x1, x0 - q * x1
+        y0, y1 = y1, y0 - q * y1
+    return a, x0, y0
+
+
+def binary_egcd(a: int, b: int):
+    """Binary extended gcd (HAC 14.61) for a, b > 0. Returns (g, x, y) with a*x + b*y == g."""
+    if a <= 0 or b <= 0:
+        raise ValueError("binary_egcd cần a, b > 0")
+    shift = 0
+    while not (a | b) & 1:
+        a >>= 1
+        b >>= 1
+        shift += 1
+    u, v = a, b
+    A, B, C, D = 1, 0, 0, 1
+    while u:
+        while not u & 1:
+            u >>= 1
+            if A & 1 or B & 1:
+                A, B = A + b, B - a
+            A >>= 1
+            B >>= 1
+        while not v & 1:
+            v >>= 1
+            if C & 1 or D & 1:
+                C, D = C + b, D - a
+            C >>= 1
+            D >>= 1
+        if u >= v:
+            u, A, B = u - v, A - C, B - D
+        else:
+            v, C, D = v - u, C - A, D - B
+    return v << shift, C, D
+
+
+def modinv(a: int, m: int) -> int:
+    """Modular inverse of a mod m; raises ValueError if it does not exist."""
+    try:
+        return pow(a, -1, m)
+    except TypeError:
+        # Python cũ không hỗ trợ pow(..., -1, mod)
+        g, x, _ = egcd(a % m, m)
+        if g != 1:
+            raise ValueError(f"No modular inverse for {a} mod {m}")
+        return x % m
+
+
+def batch_modinv(values, m: int) -> list:
+    """Invert every value mod m with one inversion and 3(N-1) multiplications (Montgomery's trick).
+
+    Raises ValueError if any value is not invertible mod m.
+    """
+    values = [int(v) % m for v in values]
+    n = len(values)
+    if n == 0:
+        return []
+    # prefix[i] = v_0 * ... * v_i
+    prefix = [0] * n
+    acc = 1
+    for i, v in enumerate(values):
+        acc = acc * v % m
+        prefix[i] = acc
+    try:
+        inv = modinv(acc, m)
+    except ValueError:
+        raise ValueError("Có phần tử không khả nghịch trong lô") from None
+    out = [0] * n
+    for i in range(n - 1, 0, -1):
+        out[i] = inv * prefix[i - 1] % m
+        inv = inv * values[i] % m
+    out[0] = inv
+    return out
+
+
+# --- ĐO HIỆU NĂNG ---
+
+def _recursive_egcd(a: int, b: int):
+    # Bản đệ quy cũ của he_mat_ElGamal._egcd, chỉ dùng để so sánh
+    if b == 0:
+        return a, 1, 0
+    g, x1, y1 = _recursive_egcd(b, a % b)
+    return g, y1, x1 - (a // b) * y1
+
+
+def _old_modinv(a: int, m: int) -> int:
+    g, x, _ = _recursive_egcd(a, m)
+    if g != 1:
+        raise ValueError(f"No modular inverse for {a} mod {m}")
+    return x % m
+
+
+def benchmark(bits_list=(256, 1024, 2048), count: int = 2000):
+    """Inverses/sec of each method for count random values modulo a bits-bit odd modulus."""
+    import sys
+
+    print(f"{'bits':>6} {'phương pháp':<22} {'nghịch đảo/s':>14}")
+    for bits in bits_list:
+        m = random.getrandbits(bits) | (1 << (bits - 1)) | 1
+        values = []
+        while len(values) < count:
+            v = random.randrange(2, m)
+            if egcd(v, m)[0] == 1:
+                values.append(v)
+        expected = [pow(v, -1, m) for v in values]
+        methods = [
+            ("pow(x, -1, m)", lambda: [pow(v, -1, m) for v in values]),
+            ("egcd lặp", lambda: [egcd(v, m)[1] % m for v in values]),
+            ("binary_egcd", lambda: [binary_egcd(v, m)[1] % m for v in values]),
+            ("batch_modinv", lambda: batch_modinv(values, m)),
+        ]
+        # Bản đệ quy cần khoảng 0.6 * bits mức đệ quy
+        if bits * 0.6 < sys.getrecursionlimit() - 50:
+            methods.insert(1, ("_egcd cũ (đệ quy)", lambda: [_old_modinv(v, m) for v in values]))
+        for label, fn in methods:
+            t0 = time.perf_counter()
+            got = fn()
+            rate = count / (time.perf_counter() - t0)
+            assert got == expected, label
+            print(f"{bits:>6} {label:<22} {rate:>14.0f}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,377 @@
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from bang_tinh_truoc_ElGamal import attach_precomputation, get_precomputation
+from doc_key_ElGamal import load_elgamal_keypair
+from he_mat_ElGamal import _pow_bi_mat, elgamal_decrypt, elgamal_encrypt
+from ma_hoa_lo_ElGamal import BanMaLo, elgamal_encrypt_many
+from so_hoc_modulo import modinv
+
+
+# --- CỘNG ĐỒNG HÌNH TRÊN BẢN MÃ ElGamal (ElGamal SỐ MŨ) ---
+#
+# ElGamal nhân tính: (g^a, m1*y^a) * (g^b, m2*y^b) = (g^(a+b), m1*m2*y^(a+b)).
+# Mã hóa g^m thay cho m ("ElGamal số mũ") thì tích các bản mã là bản mã của
+# g^(m1+m2+...), nên có thể cộng các bộ đếm đã mã hóa mà không giải mã từng cái.
+# Chỉ bản mã tổng được giải mã: tính g^M rồi tìm M bằng baby-step giant-step,
+# dùng bảng baby-step tính trước, lưu ra file và đọc lại bằng mmap.
+
+DEFAULT_CHUNK = 4096       # số bản mã mỗi tiến trình nhân trong một lá của cây
+PARALLEL_THRESHOLD = 50_000  # dưới ngưỡng này nhân ngay trong tiến trình hiện tại
+
+
+def elgamal_encrypt_exp(pubkey, m: int, k: int | None = None):
+    """Exponential ElGamal: encrypt g^m so that ciphertext products add plaintexts."""
+    precomp = get_precomputation(pubkey)
+    gm = _pow_bi_mat(pubkey, int(pubkey.g), int(m), precomp.pow_g if precomp is not None else None)
+    return elgamal_encrypt(pubkey, gm, k)
+
+
+def elgamal_encrypt_exp_many(pubkey, values, exponent_bits: int | None = None) -> BanMaLo:
+    """Exponential-ElGamal encryption of many small non-negative integers into a BanMaLo."""
+    precomp = get_precomputation(pubkey) or attach_precomputation(pubkey)
+    # Bản rõ m cũng là bí mật: g^m đi qua cùng đường lũy thừa bí mật như k
+    g = int(pubkey.g)
+    pow_g = precomp.pow_g if precomp is not None else None
+    return elgamal_encrypt_many(pubkey, [_pow_bi_mat(pubkey, g, int(m), pow_g) for m in values], exponent_bits)
+
+
+# --- NHÂN BẢN MÃ: TUẦN TỰ, THEO CÂY TRÊN NHIỀU TIẾN TRÌNH ---
+
+def nhan_ban_ma(a, b, p: int):
+    """Component-wise product of two ciphertexts (homomorphic addition)."""
+    return a[0] * b[0] % p, a[1] * b[1] % p
+
+
+def _nhan_day(ciphertexts, p: int):
+    c1, c2 = 1, 1
+    for a, b in ciphertexts:
+        c1 = c1 * int(a) % p
+        c2 = c2 * int(b) % p
+    return c1, c2
+
+
+def _nhan_doan_bytes(args):
+    """Worker: product of the packed records in one BanMaLo slice."""
+    raw, width, p = args
+    c1, c2 = 1, 1
+    view = memoryview(raw)
+    for start in range(0, len(view), 2 * width):
+        c1 = c1 * int.from_bytes(view[start:start + width], "big") % p
+        c2 = c2 * int.from_bytes(view[start + width:start + 2 * width], "big") % p
+    return c1, c2
+
+
+def _nhan_doan(args):
+    """Worker: product of one chunk of (c1, c2) pairs."""
+    pairs, p = args
+    return _nhan_day(pairs, p)
+
+
+def _giam_cay(partials, p: int):
+    """Pairwise (tree) reduction of partial products."""
+    level = list(partials)
+    if not level:
+        return 1, 1
+    while len(level) > 1:
+        nxt = [nhan_ban_ma(level[i], level[i + 1], p) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            nxt.append(level[-1])
+        level = nxt
+    return level[0]
+
+
+def tong_ban_ma(ciphertexts, p: int, workers: int | None = None, chunk: int = DEFAULT_CHUNK):
+    """Homomorphic sum of many ciphertexts (a BanMaLo or a sequence of (c1, c2)).
+
+    Leaves of chunk ciphertexts are multiplied in a process pool when there are
+    at least PARALLEL_THRESHOLD of them and workers != 1; partial products are
+    then combined pairwise.
+    """
+    p = int(p)
+    count = len(ciphertexts)
+    parallel = count >= PARALLEL_THRESHOLD and (workers is None or workers > 1)
+    if isinstance(ciphertexts, BanMaLo):
+        rec = ciphertexts.record_size
+        buf = ciphertexts.buffer
+        if not parallel:
+            return _nhan_doan_bytes((buf, ciphertexts.width, p))
+        jobs = ((bytes(buf[i * rec:(i + chunk) * rec]), ciphertexts.width, p) for i in range(0, count, chunk))
+        fn = _nhan_doan_bytes
+    else:
+        if not parallel:
+            return _nhan_day(ciphertexts, p)
+        seq = list(ciphertexts)
+        jobs = (([(int(a), int(b)) for a, b in seq[i:i + chunk]], p) for i in range(0, count, chunk))
+        fn = _nhan_doan
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        partials = list(pool.map(fn, jobs))
+    return _giam_cay(partials, p)
+
+
+class BoCongDon:
+    """Incremental (streaming) aggregator: fold ciphertexts in as they arrive.
+
+    Thread-safe; aggregators built on different shards can be combined with gop().
+    """
+
+    def __init__(self, p: int):
+        self.p = int(p)
+        self.c1 = 1
+        self.c2 = 1
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def them(self, c1: int, c2: int):
+        with self._lock:
+            self.c1 = self.c1 * int(c1) % self.p
+            self.c2 = self.c2 * int(c2) % self.p
+            self.count += 1
+
+    def them_nhieu(self, ciphertexts, workers: int | None = 1):
+        """Fold a batch (BanMaLo or sequence of pairs); multiplies outside the lock."""
+        a, b = tong_ban_ma(ciphertexts, self.p, workers)
+        with self._lock:
+            self.c1 = self.c1 * a % self.p
+            self.c2 = self.c2 * b % self.p
+            self.count += len(ciphertexts)
+
+    def gop(self, other: "BoCongDon"):
+        if other.p != self.p:
+            raise ValueError("Không thể gộp bộ cộng dồn của hai nhóm khác nhau")
+        with other._lock:
+            a, b, n = other.c1, other.c2, other.count
+        with self._lock:
+            self.c1 = self.c1 * a % self.p
+            self.c2 = self.c2 * b % self.p
+            self.count += n
+
+    def ket_qua(self):
+        """Current aggregate ciphertext (c1, c2)."""
+        with self._lock:
+            return self.c1, self.c2
+
+    def thong_ke(self) -> dict:
+        with self._lock:
+            return {"count": self.count}
+
+
+# --- BẢNG BABY-STEP GIANT-STEP LƯU TRÊN ĐĨA ---
+#
+# File: MAGIC | group_id (16 bytes, SHA-256 của p, g) | baby (u64) | slots (u64)
+#       | slots x (fingerprint u64 | j+1 u32), bảng băm địa chỉ mở, slots = 2^k.
+# fingerprint là 64 bit thấp của g^j mod p; ô có j+1 == 0 là ô trống. Khớp
+# fingerprint luôn được kiểm tra lại bằng một phép lũy thừa nên không thể sai.
+
+BSGS_MAGIC = b"BSG1"
+_BSGS_HEADER = struct.Struct(">4s16sQQ")
+_SLOT = struct.Struct(">QI")
+_FP_MASK = (1 << 64) - 1
+
+
+def _group_id(p: int, g: int) -> bytes:
+    return hashlib.sha256(f"{p}:{g}".encode("ascii")).digest()[:16]
+
+
+class BangBSGS:
+    """Discrete log g^M -> M for 0 <= M < baby * giant_steps, backed by a mmap-able table."""
+
+    def __init__(self, p: int, g: int, baby: int, slots: int, data, mapped=None):
+        self.p = int(p)
+        self.g = int(g)
+        self.baby = int(baby)
+        self.slots = int(slots)
+        self._data = data
+        self._mmap = mapped
+        self._offset = _BSGS_HEADER.size if mapped is not None else 0
+        self._giant = modinv(pow(self.g, self.baby, self.p), self.p)  # g^-baby
+
+    @classmethod
+    def tao(cls, p: int, g: int, bound: int, baby: int | None = None):
+        """Build the baby-step table in memory for sums up to bound."""
+        p, g = int(p), int(g)
+        baby = int(baby or max(1, math.isqrt(max(int(bound), 1) - 1) + 1))
+        if baby >= 1 << 32:
+            raise ValueError("Bảng baby-step quá lớn (tối đa 2^32 - 1 phần tử)")
+        slots = 1 << max(1, (2 * baby - 1).bit_length())
+        mask = slots - 1
+        data = bytearray(slots * _SLOT.size)
+        pack_into = _SLOT.pack_into
+        unpack_from = _SLOT.unpack_from
+        value = 1
+        for j in range(baby):
+            fp = value & _FP_MASK
+            i = fp & mask
+            while unpack_from(data, i * _SLOT.size)[1]:
+                i = (i + 1) & mask
+            pack_into(data, i * _SLOT.size, fp, j + 1)
+            value = value * g % p
+        return cls(p, g, baby, slots, data)
+
+    def luu(self, path):
+        """Write the table atomically (temp file + rename)."""
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(_BSGS_HEADER.pack(BSGS_MAGIC, _group_id(self.p, self.g), self.baby, self.slots))
+            f.write(memoryview(self._data)[self._offset:self._offset + self.slots * _SLOT.size])
+        os.replace(tmp, path)
+
+    @classmethod
+    def mo(cls, path, p: int, g: int):
+        """Memory-map a saved table; raises ValueError if it belongs to another group."""
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, group, baby, slots = _BSGS_HEADER.unpack_from(mapped, 0)
+            if magic != BSGS_MAGIC:
+                raise ValueError("Sai định dạng bảng BSGS (magic không khớp)")
+            if group != _group_id(int(p), int(g)):
+                raise ValueError("Bảng BSGS được tạo cho nhóm (p, g) khác")
+            if len(mapped) < _BSGS_HEADER.size + slots * _SLOT.size:
+                raise ValueError("File bảng BSGS bị cắt cụt")
+        except Exception:
+            mapped.close()
+            raise
+        return cls(p, g, baby, slots, mapped, mapped)
+
+    @classmethod
+    def nap_hoac_tao(cls, path, p: int, g: int, bound: int):
+        """Open the table at path if it covers bound for (p, g), otherwise build and save it."""
+        path = Path(path)
+        if path.exists():
+            try:
+                table = cls.mo(path, p, g)
+                if table.baby * table.baby >= bound:
+                    return table
+                table.close()
+            except ValueError:
+                pass
+        table = cls.tao(p, g, bound)
+        table.luu(path)
+        return table
+
+    def _tra(self, value: int):
+        fp = value & _FP_MASK
+        mask = self.slots - 1
+        i = fp & mask
+        data, base, size = self._data, self._offset, _SLOT.size
+        unpack_from = _SLOT.unpack_from
+        while True:
+            slot_fp, j1 = unpack_from(data, base + i * size)
+            if not j1:
+                return
+            if slot_fp == fp:
+                yield j1 - 1
+            i = (i + 1) & mask
+
+    def log(self, h: int, bound: int | None = None) -> int:
+        """Return M with g^M == h (mod p) and 0 <= M < bound; ValueError if none."""
+        if bound is None:
+            bound = self.baby * self.baby
+        h = int(h) % self.p
+        giant_steps = -(-int(bound) // self.baby)
+        gamma = h
+        for i in range(giant_steps):
+            for j in self._tra(gamma):
+                m = i * self.baby + j
+                if m < bound and pow(self.g, m, self.p) == h:
+                    return m
+            gamma = gamma * self._giant % self.p
+        raise ValueError(f"Tổng nằm ngoài giới hạn [0, {bound})")
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+            self._data = None
+
+
+def giai_ma_tong(privkey, ciphertext, table: BangBSGS, bound: int | None = None) -> int:
+    """Decrypt an aggregate exponential-ElGamal ciphertext to the integer sum."""
+    gm = elgamal_decrypt(privkey, int(ciphertext[0]), int(ciphertext[1]))
+    return table.log(gm, bound)
+
+
+# --- ĐO HIỆU NĂNG ---
+
+def benchmark(count: int = 100_000, bound_bits: int = 32, base_dir=None, table_path=None, workers=None):
+    """Aggregate count encrypted counters and time each stage."""
+    import random
+    import tempfile
+
+    private_key, public_key = load_elgamal_keypair(Path(base_dir) if base_dir else Path(__file__).parent)
+    p, g = int(public_key.p), int(public_key.g)
+    values = [random.randrange(0, 1000) for _ in range(count)]
+    bound = 1 << bound_bits
+
+    t0 = time.perf_counter()
+    batch = elgamal_encrypt_exp_many(public_key, values)
+    t_enc = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    serial = tong_ban_ma(batch, p, workers=1)
+    t_serial = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    tree = tong_ban_ma(batch, p, workers=workers) if count >= PARALLEL_THRESHOLD else serial
+    t_tree = time.perf_counter() - t0
+
+    acc = BoCongDon(p)
+    t0 = time.perf_counter()
+    for c1, c2 in batch:
+        acc.them(c1, c2)
+    t_stream = time.perf_counter() - t0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(table_path) if table_path else Path(tmp) / "bsgs.bin"
+        t0 = time.perf_counter()
+        BangBSGS.nap_hoac_tao(path, p, g, bound).close()
+        t_build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        table = BangBSGS.mo(path, p, g)
+        t_open = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        total = giai_ma_tong(private_key, tree, table, bound)
+        t_dec = time.perf_counter() - t0
+        table.close()
+
+    ok = total == sum(values) and serial == tree == acc.ket_qua()
+    print(f"{count} bộ đếm, khóa {p.bit_length()} bit, giới hạn tổng 2^{bound_bits}")
+    print(f"  mã hóa lô:          {count / t_enc:10.0f} bản mã/s")
+    print(f"  nhân tuần tự:       {count / t_serial:10.0f} bản mã/s")
+    print(f"  nhân theo cây:      {count / t_tree:10.0f} bản mã/s")
+    print(f"  cộng dồn từng cái:  {count / t_stream:10.0f} bản mã/s")
+    print(f"  bảng BSGS: nạp/tạo {t_build:.2f}s, mở (mmap) {t_open * 1e3:.2f}ms, giải mã tổng {t_dec * 1e3:.1f}ms")
+    print(f"  tổng = {total}, khớp: {ok}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Cộng đồng hình bản mã ElGamal số mũ.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    build = sub.add_parser("build-table", help="Tạo và lưu bảng baby-step cho khóa")
+    build.add_argument("path")
+    build.add_argument("--bound-bits", type=int, default=32)
+    build.add_argument("--key-dir", help="Thư mục khóa ElGamal (mặc định: thư mục này)")
+    bench = sub.add_parser("benchmark", help="Đo mã hóa, tổng hợp và giải mã tổng")
+    bench.add_argument("--count", type=int, default=100_000)
+    bench.add_argument("--bound-bits", type=int, default=32)
+    bench.add_argument("--key-dir")
+    bench.add_argument("--table", help="Dùng lại bảng BSGS đã lưu")
+    bench.add_argument("--workers", type=int)
+    args = parser.parse_args()
+    if args.cmd == "build-table":
+        _, pub = load_elgamal_keypair(Path(args.key_dir) if args.key_dir else Path(__file__).parent)
+        t0 = time.perf_counter()
+        BangBSGS.tao(int(pub.p), int(pub.g), 1 << args.bound_bits).luu(args.path)
+        print(f"Đã lưu {args.path} trong {time.perf_counter() - t0:.2f}s")
+    else:
+        benchmark(args.count, args.bound_bits, args.key_dir, args.table, args.workers)
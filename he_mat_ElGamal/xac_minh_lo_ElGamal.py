@@ -0,0 +1,161 @@
+import time
+from pathlib import Path
+
+from Crypto.Random import random as crypto_random
+
+from doc_key_ElGamal import load_elgamal_keypair
+from he_mat_ElGamal import elgamal_sign, elgamal_verify, _hash_message
+from bang_tinh_truoc_ElGamal import multi_exp
+
+
+# --- XÁC MINH CHỮ KÝ ElGamal THEO LÔ ---
+#
+# Mỗi chữ ký hợp lệ thỏa y^r_i * r_i^s_i = g^m_i (mod p). Chọn ngẫu nhiên các
+# số mũ nhỏ e_i (security_bits bit) rồi kiểm tra một phương trình duy nhất
+#     y^(sum e_i r_i) * prod r_i^(e_i s_i) * g^-(sum e_i m_i) = 1 (mod p)
+# bằng một lần lũy thừa đa cơ số. Một chữ ký sai lọt qua với xác suất
+# khoảng 2^-security_bits trong nhóm con bậc q của p = 2q+1; thành phần bậc 2
+# (dấu ±1) được kiểm tra riêng từng chữ ký bằng ký hiệu Legendre.
+#
+# Khi lô thất bại, chia đôi lô và kiểm tra lại từng nửa để tìm chữ ký sai.
+
+DEFAULT_SECURITY_BITS = 64
+DEFAULT_BATCH_SIZE = 256
+_LEAF_SIZE = 2  # lô nhỏ hơn ngưỡng này được kiểm tra từng chữ ký
+
+
+def _jacobi(a: int, n: int) -> int:
+    """Iterative Jacobi symbol (a/n) for odd n > 0."""
+    a %= n
+    result = 1
+    while a:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def _sign_component_ok(chi_y: int, chi_g: int, p: int, r: int, s: int, m: int) -> bool:
+    # Kiểm tra phương trình xác minh trên thành phần {±1}: chi(y)^r chi(r)^s = chi(g)^m
+    lhs = (chi_y if r & 1 else 1) * (_jacobi(r, p) if s & 1 else 1)
+    rhs = chi_g if m & 1 else 1
+    return lhs == rhs
+
+
+def _batch_holds(p: int, g: int, y: int, items, security_bits: int) -> bool:
+    order = p - 1
+    sum_r = 0
+    sum_m = 0
+    bases = []
+    exps = []
+    for r, s, m in items:
+        e = crypto_random.getrandbits(security_bits) | 1
+        sum_r += e * r
+        sum_m += e * m
+        bases.append(r)
+        exps.append(e * s % order)
+    bases.append(y)
+    exps.append(sum_r % order)
+    bases.append(g)
+    exps.append(-sum_m % order)  # g^-B = g^(p-1-B)
+    return multi_exp(bases, exps, p) == 1
+
+
+def _verify_range(pubkey, p, g, y, messages, signatures, items, lo, hi, results, security_bits):
+    if hi - lo <= _LEAF_SIZE:
+        for i in range(lo, hi):
+            results[i] = elgamal_verify(pubkey, messages[i], signatures[i])
+        return
+    if _batch_holds(p, g, y, items[lo:hi], security_bits):
+        for i in range(lo, hi):
+            results[i] = True
+        return
+    mid = (lo + hi) // 2
+    _verify_range(pubkey, p, g, y, messages, signatures, items, lo, mid, results, security_bits)
+    _verify_range(pubkey, p, g, y, messages, signatures, items, mid, hi, results, security_bits)
+
+
+def elgamal_verify_batch(pubkey, messages, signatures,
+                         security_bits: int = DEFAULT_SECURITY_BITS,
+                         batch_size: int = DEFAULT_BATCH_SIZE):
+    """Verify many ElGamal signatures from the same public key.
+
+    Returns a list of booleans, one per (message, signature) pair, equal to
+    what elgamal_verify would return for each entry. Assumes p is a safe prime
+    (as produced by ElGamal.generate).
+    """
+    messages = list(messages)
+    signatures = list(signatures)
+    if len(messages) != len(signatures):
+        raise ValueError("Số thông điệp và số chữ ký không khớp")
+
+    p = int(pubkey.p)
+    g = int(pubkey.g)
+    y = int(pubkey.y)
+    chi_y = _jacobi(y, p)
+    chi_g = _jacobi(g, p)
+
+    n = len(messages)
+    results = [False] * n
+    items = [None] * n
+    candidates = []
+    for i, (message, (r, s)) in enumerate(zip(messages, signatures)):
+        r = int(r)
+        s = int(s)
+        if not (0 < r < p):
+            continue
+        m = _hash_message(message, p)
+        if not _sign_component_ok(chi_y, chi_g, p, r, s, m):
+            continue
+        items[i] = (r, s, m)
+        candidates.append(i)
+
+    # Các chữ ký đã bị loại ở trên giữ kết quả False; phần còn lại kiểm tra theo lô
+    cand_messages = [messages[i] for i in candidates]
+    cand_signatures = [signatures[i] for i in candidates]
+    cand_items = [items[i] for i in candidates]
+    cand_results = [False] * len(candidates)
+    for lo in range(0, len(candidates), batch_size):
+        hi = min(lo + batch_size, len(candidates))
+        _verify_range(pubkey, p, g, y, cand_messages, cand_signatures, cand_items,
+                      lo, hi, cand_results, security_bits)
+    for i, ok in zip(candidates, cand_results):
+        results[i] = ok
+    return results
+
+
+def benchmark(count: int = 2000, bad_every: int = 0):
+    """Compare elgamal_verify_batch with a loop of elgamal_verify on the stored key."""
+    private_key, public_key = load_elgamal_keypair(Path(__file__).parent)
+    messages = [f"batch message {i}".encode() for i in range(count)]
+    signatures = [elgamal_sign(private_key, msg) for msg in messages]
+    if bad_every:
+        for i in range(0, count, bad_every):
+            r, s = signatures[i]
+            signatures[i] = (r, s + 1)
+
+    t0 = time.perf_counter()
+    expected = [elgamal_verify(public_key, msg, sig) for msg, sig in zip(messages, signatures)]
+    loop_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    got = elgamal_verify_batch(public_key, messages, signatures)
+    batch_time = time.perf_counter() - t0
+
+    print(f"p: {int(public_key.p).bit_length()} bits, {count} chữ ký, "
+          f"{expected.count(False)} chữ ký sai")
+    print(f"elgamal_verify (vòng lặp): {count / loop_time:10.0f} sig/s")
+    print(f"elgamal_verify_batch     : {count / batch_time:10.0f} sig/s "
+          f"({loop_time / batch_time:.2f}x)")
+    print(f"Kết quả khớp: {got == expected}")
+
+
+if __name__ == "__main__":
+    benchmark()
+    print()
+    benchmark(bad_every=500)
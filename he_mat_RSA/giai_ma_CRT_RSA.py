@@ -0,0 +1,124 @@
+import sys
+import time
+from pathlib import Path
+
+from Crypto.PublicKey import RSA
+from Crypto.Random import random as crypto_random
+from Crypto.Util import number
+
+from he_mat_RSA import giai_ma, nghich_dao_modulo, PRIVATE_FILE
+
+# Bộ lũy thừa an toàn dùng chung (luy_thua_an_toan) nằm ở thư mục gốc của dự án
+_ROOT_DIR = str(Path(__file__).resolve().parent.parent)
+if _ROOT_DIR not in sys.path:
+    sys.path.append(_ROOT_DIR)
+
+from luy_thua_an_toan import luy_thua_bi_mat
+
+# --- GIẢI MÃ RSA BẰNG ĐỊNH LÝ SỐ DƯ TRUNG HOA (CRT) ---
+#
+# Thay vì M = C^d mod n, tính hai lũy thừa với số mũ và modulo bằng một nửa:
+#     m_p = C^dP mod p,  m_q = C^dQ mod q
+#     h   = qInv * (m_p - m_q) mod p
+#     M   = m_q + h * q
+# Mỗi lũy thừa nửa kích thước rẻ hơn khoảng 8 lần, nên tổng nhanh hơn ~3-4 lần.
+#
+# Che mù (blinding): giải mã C * r^e thay vì C rồi nhân kết quả với r^-1, để
+# thời gian tính không phụ thuộc vào bản mã do kẻ tấn công chọn. Cặp (r^e, r^-1)
+# được làm mới bằng cách bình phương sau mỗi lần dùng, tránh một phép nghịch đảo
+# cho mỗi lần giải mã.
+
+
+class KhoaBiMatCRT:
+    """Tham số CRT (p, q, dP, dQ, qInv) tính sẵn một lần cho một khóa bí mật RSA."""
+
+    def __init__(self, private_key, blinding: bool = True):
+        self.n = int(private_key.n)
+        self.e = int(private_key.e)
+        self.p = int(private_key.p)
+        self.q = int(private_key.q)
+        d = int(private_key.d)
+        self.dP = d % (self.p - 1)
+        self.dQ = d % (self.q - 1)
+        self.qInv = nghich_dao_modulo(self.q, self.p)
+        self.blinding = blinding
+        self._blind = None
+
+    def _lay_cap_che_mu(self):
+        if self._blind is None:
+            while True:
+                r = crypto_random.randint(2, self.n - 1)
+                r_inv = nghich_dao_modulo(r, self.n)
+                if r_inv is not None:
+                    break
+            self._blind = (pow(r, self.e, self.n), r_inv)
+        else:
+            r_e, r_inv = self._blind
+            self._blind = (r_e * r_e % self.n, r_inv * r_inv % self.n)
+        return self._blind
+
+    def luy_thua_bi_mat(self, ban_ma: int) -> int:
+        """Tính ban_ma^d mod n bằng CRT (có che mù nếu được bật)."""
+        c = int(ban_ma)
+        if not 0 <= c < self.n:
+            raise ValueError("Bản mã phải nằm trong khoảng [0, n)")
+        if self.blinding:
+            r_e, r_inv = self._lay_cap_che_mu()
+            c = c * r_e % self.n
+        m_p = luy_thua_bi_mat(c % self.p, self.dP, self.p, order=self.p - 1)
+        m_q = luy_thua_bi_mat(c % self.q, self.dQ, self.q, order=self.q - 1)
+        h = self.qInv * (m_p - m_q) % self.p
+        m = m_q + h * self.q
+        if self.blinding:
+            m = m * r_inv % self.n
+        return m
+
+
+def giai_ma_crt(ban_ma, khoa_crt: KhoaBiMatCRT):
+    """
+    Giải mã bản mã C thành bản rõ như giai_ma, nhưng dùng tham số CRT tính sẵn.
+    """
+    M_int = khoa_crt.luy_thua_bi_mat(ban_ma)
+    byte_length = (M_int.bit_length() + 7) // 8
+    M_bytes = M_int.to_bytes(byte_length, byteorder='big')
+    return M_bytes.decode('utf-8').lstrip('\x00')
+
+
+# --- ĐO HIỆU NĂNG ---
+
+def _ops_per_sec(fn, min_time: float = 1.0) -> float:
+    count = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        count += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return count / elapsed
+
+
+def do_hieu_nang(bit_lengths=(1024, 2048, 4096)):
+    """So sánh giai_ma (C^d mod n) với giai_ma_crt có/không che mù."""
+    message = b'Meet at midnight'
+    m = number.bytes_to_long(message)
+    print(f"{'bits':>6} {'giai_ma':>10} {'CRT':>10} {'CRT+mù':>10} {'tăng tốc':>9}")
+    for bits in bit_lengths:
+        key = RSA.generate(bits)
+        c = pow(m, key.e, key.n)
+        khoa = KhoaBiMatCRT(key, blinding=False)
+        khoa_mu = KhoaBiMatCRT(key, blinding=True)
+        assert giai_ma(c, (key.n, key.d)) == giai_ma_crt(c, khoa) == giai_ma_crt(c, khoa_mu) == message.decode()
+
+        goc = _ops_per_sec(lambda: giai_ma(c, (key.n, key.d)))
+        crt = _ops_per_sec(lambda: giai_ma_crt(c, khoa))
+        crt_mu = _ops_per_sec(lambda: giai_ma_crt(c, khoa_mu))
+        print(f"{bits:>6} {goc:>8.0f}/s {crt:>8.0f}/s {crt_mu:>8.0f}/s {crt_mu / goc:>8.2f}x")
+
+
+if __name__ == '__main__':
+    private_key = RSA.import_key(open(PRIVATE_FILE).read())
+    khoa_crt = KhoaBiMatCRT(private_key)
+    C = pow(number.bytes_to_long(b'Meet at midnight'), private_key.e, private_key.n)
+    print(f"Giải mã CRT (có che mù): {giai_ma_crt(C, khoa_crt)}")
+    print("\n[SO SÁNH HIỆU NĂNG]")
+    do_hieu_nang()
@@ -1,7 +1,17 @@
 from Crypto.Util import number
 from Crypto.PublicKey import RSA
 from Crypto.Cipher import PKCS1_OAEP
+from Crypto.Random import random as crypto_random
 import random
+import sys
+from pathlib import Path
+
+# Bộ lũy thừa an toàn dùng chung (luy_thua_an_toan) nằm ở thư mục gốc của dự án
+_ROOT_DIR = str(Path(__file__).resolve().parent.parent)
+if _ROOT_DIR not in sys.path:
+    sys.path.append(_ROOT_DIR)
+
+from luy_thua_an_toan import dang_cung_hoa, luy_thua_an_toan
 
 PUBLIC_FILE = "public-key.pem"
 PRIVATE_FILE = "private-key.pem"
@@ -36,14 +46,34 @@ def luy_thua_modulo(co_so, so_mu, modulo):
     """
     return pow(co_so, so_mu, modulo)
 
+def luy_thua_che_mu(ban_ma, n, d, e=None):
+    """
+    Tính C^d mod n bằng bộ lũy thừa cứng hóa. Nếu biết e thì che mù cả cơ số
+    (C * r^e, rồi nhân kết quả với r^-1) lẫn số mũ (d + t*(e*d - 1), vì e*d - 1
+    là bội của bậc nhóm nhân modulo n).
+    """
+    if e is None:
+        return luy_thua_an_toan(ban_ma, d, n)
+    while True:
+        r = crypto_random.randint(2, n - 1)
+        r_inv = nghich_dao_modulo(r, n)
+        if r_inv is not None:
+            break
+    c = ban_ma * pow(r, e, n) % n
+    return luy_thua_an_toan(c, d, n, order=e * d - 1) * r_inv % n
+
 def giai_ma(ban_ma, private_key):
     """
     Giải mã bản mã C thành bản rõ M: M = C^d mod n
+    private_key là (n, d) hoặc (n, d, e); e chỉ dùng để che mù ở chế độ "hardened".
     """
-    n, d = private_key
+    n, d = private_key[0], private_key[1]
     
     # Tính M = C^d mod n
-    M_int = luy_thua_modulo(ban_ma, d, n)
+    if dang_cung_hoa():
+        M_int = luy_thua_che_mu(ban_ma, n, d, private_key[2] if len(private_key) > 2 else None)
+    else:
+        M_int = luy_thua_modulo(ban_ma, d, n)
     
     # Chuyển số nguyên lớn M thành chuỗi byte, sau đó giải mã về chuỗi ký tự
     byte_length = (M_int.bit_length() + 7) // 8
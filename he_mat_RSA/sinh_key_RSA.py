@@ -1,15 +1,33 @@
+import argparse
+from pathlib import Path
+
 from Crypto.PublicKey import RSA
 
 PUBLIC_FILE = "public-key.pem"
 PRIVATE_FILE = "private-key.pem"
 BIT_LENGTH = 1024
 
+
+def generate_rsa_key(bits: int = BIT_LENGTH):
+	"""Sinh cặp khóa RSA (chỉ chạy khi được gọi, không chạy lúc import)."""
+	return RSA.generate(bits)
+
+
+def write_key_files(key, out_dir: Path = Path(".")):
+	"""Ghi private-key.pem và public-key.pem của key vào out_dir."""
+	out_dir = Path(out_dir)
+	out_dir.mkdir(parents=True, exist_ok=True)
+	(out_dir / PRIVATE_FILE).write_bytes(key.export_key(format="PEM"))
+	(out_dir / PUBLIC_FILE).write_bytes(key.publickey().export_key(format="PEM"))
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Sinh cặp khóa RSA.")
+	parser.add_argument("--bits", type=int, default=BIT_LENGTH)
+	parser.add_argument("--out", default=".", help="Thư mục ghi public-key.pem/private-key.pem")
+	args = parser.parse_args(argv)
+	write_key_files(generate_rsa_key(args.bits), Path(args.out))
+
+
 if __name__ == "__main__":
-	key = RSA.generate(BIT_LENGTH)
-	private_pem = key.export_key(format="PEM")
-	public_pem = key.publickey().export_key(format="PEM")
-
-	with open(PRIVATE_FILE, "wb") as f:
-		f.write(private_pem)
-	with open(PUBLIC_FILE, "wb") as f:
-		f.write(public_pem)
\ No newline at end of file
+	main()
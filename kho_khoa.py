@@ -0,0 +1,211 @@
+"""
+Kho khóa dùng chung: bộ nhớ đệm LRU các khóa đã phân tích, khóa theo đường dẫn.
+
+Mỗi mục lưu kèm (mtime_ns, size) của các file nguồn; khi file thay đổi thì mục
+bị coi là cũ và được nạp lại. Việc nạp (đọc file, phân tích khóa) chạy ngoài
+khóa của cache: luồng đầu tiên nạp, các luồng cùng hỏi khóa đó chờ kết quả
+của nó, còn các khóa khác vẫn tra được trong lúc đó. Các giá trị dẫn xuất (tham số CRT của RSA, bảng
+lũy thừa cơ số cố định của ElGamal) được giữ trong mục nên chỉ tính một lần
+cho đến khi file khóa đổi.
+"""
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+for _d in (BASE_DIR / "he_mat_ElGamal", BASE_DIR / "he_mat_RSA", BASE_DIR):
+    if str(_d) not in sys.path:
+        sys.path.insert(0, str(_d))
+
+DEFAULT_MAX_ENTRIES = 128
+
+
+def _chu_ky_file(paths):
+    """Trả về (mtime_ns, size) của từng file; None nếu file không tồn tại."""
+    sig = []
+    for path in paths:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            sig.append(None)
+        else:
+            sig.append((st.st_mtime_ns, st.st_size))
+    return tuple(sig)
+
+
+class _MucKhoa:
+    __slots__ = ("value", "signature", "derived")
+
+    def __init__(self, value, signature):
+        self.value = value
+        self.signature = signature
+        self.derived = {}
+
+
+class KhoKhoa:
+    """LRU cache of parsed key objects with mtime/size invalidation and hit/miss counters."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        if max_entries < 1:
+            raise ValueError("max_entries phải >= 1")
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        # cache_key -> (signature, Future) của lần nạp đang chạy
+        self._dang_nap = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def _lay_muc(self, cache_key, paths, loader) -> _MucKhoa:
+        signature = _chu_ky_file(paths)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                if entry.signature == signature:
+                    self.hits += 1
+                    self._entries.move_to_end(cache_key)
+                    return entry
+                self.invalidations += 1
+                del self._entries[cache_key]
+            pending = self._dang_nap.get(cache_key)
+            if pending is not None and pending[0] == signature:
+                # Luồng khác đang nạp đúng phiên bản này của file: chờ kết quả
+                self.hits += 1
+                future = pending[1]
+            else:
+                self.misses += 1
+                pending = (signature, Future())
+                self._dang_nap[cache_key] = pending
+                future = None
+        if future is not None:
+            return future.result()
+
+        try:
+            entry = _MucKhoa(loader(), signature)
+        except BaseException as exc:
+            with self._lock:
+                if self._dang_nap.get(cache_key) is pending:
+                    del self._dang_nap[cache_key]
+            pending[1].set_exception(exc)
+            raise
+        with self._lock:
+            if self._dang_nap.get(cache_key) is pending:
+                del self._dang_nap[cache_key]
+            self._entries[cache_key] = entry
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        pending[1].set_result(entry)
+        return entry
+
+    # --- RSA ---
+
+    def _muc_rsa(self, path):
+        from Crypto.PublicKey import RSA
+
+        path = Path(path).resolve()
+        return self._lay_muc(("rsa", path), (path,), lambda: RSA.import_key(path.read_bytes()))
+
+    def lay_khoa_rsa(self, path):
+        """Trả về đối tượng khóa RSA (công khai hoặc bí mật) đọc từ file PEM."""
+        return self._muc_rsa(path).value
+
+    def lay_crt_rsa(self, path, blinding: bool = True):
+        """Trả về KhoaBiMatCRT của khóa bí mật RSA, tính sẵn một lần cho mỗi mục."""
+        from giai_ma_CRT_RSA import KhoaBiMatCRT
+
+        entry = self._muc_rsa(path)
+        with self._lock:
+            crt = entry.derived.get(("crt", blinding))
+            if crt is None:
+                if not entry.value.has_private():
+                    raise ValueError(f"{path} không chứa khóa bí mật RSA")
+                crt = KhoaBiMatCRT(entry.value, blinding=blinding)
+                entry.derived[("crt", blinding)] = crt
+            return crt
+
+    # --- ElGamal ---
+
+    def lay_cap_khoa_elgamal(self, base_dir, table_bytes: int | None = None):
+        """Trả về (private_key, public_key) ElGamal; bảng cơ số cố định được giữ trong cache."""
+        from doc_key_ElGamal import load_elgamal_keypair
+        from bang_tinh_truoc_ElGamal import DEFAULT_TABLE_BYTES
+
+        base = Path(base_dir).resolve()
+        budget = DEFAULT_TABLE_BYTES if table_bytes is None else table_bytes
+        paths = (base / "public-key.pem", base / "private-key.pem")
+        entry = self._lay_muc(("elgamal", base, budget), paths,
+                              lambda: load_elgamal_keypair(base, budget))
+        return entry.value
+
+    # --- ECC / ECDSA ---
+
+    def lay_khoa_ecc(self, path):
+        """Trả về đối tượng khóa ECC đọc từ file PEM/DER."""
+        from Crypto.PublicKey import ECC
+
+        path = Path(path).resolve()
+        return self._lay_muc(("ecc", path), (path,), lambda: ECC.import_key(path.read_bytes())).value
+
+    # --- Chùm khóa ---
+
+    def lay_khoa_chum(self, chum, key_id, private: bool = False):
+        """Trả về khóa đã phân tích từ một ChumKhoa (chum_khoa.py).
+
+        Bản ghi trong chùm khóa không bao giờ bị sửa tại chỗ, nên mục cache được
+        định danh bằng vị trí bản ghi thay vì mtime/size của file.
+        """
+        ref = chum.tham_chieu(key_id, private)
+        return self._lay_muc(("chum", chum.thu_muc, ref), (), lambda: chum.lay(key_id, private)).value
+
+    # --- Quản lý ---
+
+    def xoa(self):
+        """Xóa toàn bộ cache (không đặt lại bộ đếm)."""
+        with self._lock:
+            self._entries.clear()
+
+    def thong_ke(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+# Kho dùng chung cho toàn tiến trình
+KHO_KHOA = KhoKhoa()
+
+
+if __name__ == "__main__":
+    import time
+
+    rsa_priv = BASE_DIR / "he_mat_RSA" / "private-key.pem"
+    elgamal_dir = BASE_DIR / "he_mat_ElGamal"
+
+    for label, fn in (
+        ("RSA import_key", lambda: KHO_KHOA.lay_khoa_rsa(rsa_priv)),
+        ("RSA CRT", lambda: KHO_KHOA.lay_crt_rsa(rsa_priv)),
+        ("ElGamal keypair", lambda: KHO_KHOA.lay_cap_khoa_elgamal(elgamal_dir)),
+    ):
+        t0 = time.perf_counter()
+        fn()
+        cold = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for _ in range(1000):
+            fn()
+        warm = (time.perf_counter() - t0) / 1000
+        print(f"{label:<16} lần đầu: {cold * 1e6:9.1f} µs, từ cache: {warm * 1e6:7.1f} µs")
+
+    print("\nThống kê:", KHO_KHOA.thong_ke())
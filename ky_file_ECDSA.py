@@ -0,0 +1,387 @@
+"""
+Ký / xác minh ECDSA cho file lớn với bộ nhớ không đổi, chữ ký tách rời.
+
+Ví dụ:
+    python ky_file_ECDSA.py sign ban_phat_hanh.iso --key ecdsa-private.pem
+    python ky_file_ECDSA.py sign ban_phat_hanh.iso --key ecdsa-private.pem --merkle --workers 8
+    python ky_file_ECDSA.py verify ban_phat_hanh.iso --key ecdsa-public.pem
+    python ky_file_ECDSA.py benchmark --size-mb 256
+
+Chế độ tuần tự băm cả file (mmap với file thường, readinto với luồng) rồi ký
+digest. Chế độ Merkle chia file thành các khối chunk_size, băm các khối song
+song trên nhiều luồng (hashlib nhả GIL khi băm) rồi ghép thành gốc Merkle:
+    lá   = H(0x00 | khối)
+    nút  = H(0x01 | trái | phải)      (số nút lẻ thì nút cuối được đưa lên mức trên)
+Tiền tố 0x00/0x01 chỉ tách miền lá và nút bên trong cây: gốc của một cây
+một lá H(0x00 | X) vẫn bằng digest tuần tự của 0x00 | X. Vì vậy chữ ký không
+ký trực tiếp digest nội dung mà ký một cam kết
+    H(NGU_CANH | header | digest)
+trong đó header gồm hash_id, mode, chunk_size, file_size và độ dài digest.
+Đổi chế độ, kích thước khối hay kích thước file trong file .esig đều làm
+cam kết thay đổi, và cam kết không trùng với digest của một thông điệp thường
+(như chữ ký băm sẵn của chu_ky_lo_ECDSA) trừ khi tìm được tiền ảnh.
+
+File chữ ký (.esig):
+    MAGIC | hash_id (u8) | mode (u8) | chunk_size (u32) | file_size (u64)
+          | digest_len (u8) | digest | sig_len (u16) | chữ ký DSS (r | s)
+Digest lưu trong file chỉ để tra cứu; khi xác minh digest luôn được tính lại.
+"""
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from Crypto.PublicKey import ECC
+
+from chu_ky_lo_ECDSA import lay_bo_ky, lay_bo_xac_minh
+from ma_hoa_luong_AES import doc_vao_day_du
+
+MAGIC = b"ESG2"  # ESG1 ký digest trần, không còn được chấp nhận
+_HEADER = struct.Struct(">4sBBIQB")
+_SIG_LEN = struct.Struct(">H")
+SIG_SUFFIX = ".esig"
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+MODE_LINEAR = 0
+MODE_MERKLE = 1
+_MODE_NAMES = {MODE_LINEAR: "linear", MODE_MERKLE: "merkle"}
+
+# hash_id ghi trong file chữ ký -> tên thuật toán trong hashlib
+HASHES = {1: "sha256", 2: "sha384", 3: "sha512"}
+_HASH_IDS = {name: ident for ident, name in HASHES.items()}
+_LEAF = b"\x00"
+_NODE = b"\x01"
+# Tiền tố miền của cam kết được ký
+NGU_CANH = b"ky_file_ECDSA/cam-ket\x00"
+
+
+def _oid(hash_name: str) -> str:
+    from Crypto.Hash import SHA256, SHA384, SHA512
+
+    return {"sha256": SHA256, "sha384": SHA384, "sha512": SHA512}[hash_name].new().oid
+
+
+class DigestFile:
+    """Digest computed with hashlib, carrying the OID that DSS needs."""
+
+    __slots__ = ("oid", "digest_size", "_digest")
+
+    def __init__(self, hash_name: str, digest: bytes):
+        self.oid = _oid(hash_name)
+        self.digest_size = len(digest)
+        self._digest = bytes(digest)
+
+    def digest(self) -> bytes:
+        return self._digest
+
+
+# --- BĂM: TUẦN TỰ VÀ MERKLE ---
+
+def _mo_mmap(src):
+    """mmap of a regular file object (read-only), or None if src cannot be mapped."""
+    try:
+        fileno = src.fileno()
+        size = os.fstat(fileno).st_size
+    except (AttributeError, OSError, ValueError):
+        return None
+    if size == 0 or src.tell() != 0:
+        return None
+    try:
+        mapped = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+        mapped.madvise(mmap.MADV_SEQUENTIAL)
+    return mapped
+
+
+def bam_tuan_tu(src, hash_name: str = "sha256", chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Hash file-like src in one pass. Returns (digest, total bytes)."""
+    h = hashlib.new(hash_name)
+    mapped = _mo_mmap(src)
+    if mapped is not None:
+        with mapped, memoryview(mapped) as view:
+            for start in range(0, len(view), chunk_size):
+                h.update(view[start:start + chunk_size])
+            return h.digest(), len(view)
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    total = 0
+    while True:
+        n = doc_vao_day_du(src, view)
+        if not n:
+            break
+        h.update(view[:n])
+        total += n
+        if n < chunk_size:
+            break
+    return h.digest(), total
+
+
+def _bam_la(hash_name: str, chunk) -> bytes:
+    h = hashlib.new(hash_name, _LEAF)
+    h.update(chunk)
+    return h.digest()
+
+
+def goc_merkle(leaves, hash_name: str = "sha256") -> bytes:
+    """Merkle root of a list of leaf digests."""
+    level = list(leaves)
+    if not level:
+        return _bam_la(hash_name, b"")
+    while len(level) > 1:
+        nxt = [hashlib.new(hash_name, _NODE + level[i] + level[i + 1]).digest()
+               for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            nxt.append(level[-1])
+        level = nxt
+    return level[0]
+
+
+def bam_merkle(src, hash_name: str = "sha256", chunk_size: int = DEFAULT_CHUNK_SIZE,
+               workers: int | None = None):
+    """Hash src as a Merkle tree of chunk_size leaves on a thread pool. Returns (root, total bytes).
+
+    At most 2 * workers chunks are in flight, so memory stays bounded for streams;
+    regular files are hashed straight from an mmap.
+    """
+    workers = workers or os.cpu_count() or 1
+    leaves = []
+    pending = deque()
+    total = 0
+    mapped = _mo_mmap(src)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        if mapped is not None:
+            with mapped, memoryview(mapped) as view:
+                total = len(view)
+                for start in range(0, total, chunk_size):
+                    if len(pending) >= 2 * workers:
+                        leaves.append(pending.popleft().result())
+                    pending.append(pool.submit(_bam_la, hash_name, view[start:start + chunk_size]))
+                leaves.extend(f.result() for f in pending)
+        else:
+            while True:
+                chunk = bytearray(chunk_size)
+                n = doc_vao_day_du(src, memoryview(chunk))
+                if not n:
+                    break
+                del chunk[n:]
+                total += n
+                if len(pending) >= 2 * workers:
+                    leaves.append(pending.popleft().result())
+                pending.append(pool.submit(_bam_la, hash_name, chunk))
+                if n < chunk_size:
+                    break
+            leaves.extend(f.result() for f in pending)
+    return goc_merkle(leaves, hash_name), total
+
+
+def bam(src, mode: int = MODE_LINEAR, hash_name: str = "sha256", chunk_size: int = DEFAULT_CHUNK_SIZE,
+        workers: int | None = None):
+    if hash_name not in _HASH_IDS:
+        raise ValueError(f"Thuật toán băm không hỗ trợ: {hash_name}")
+    if not 0 < chunk_size < (1 << 32):
+        raise ValueError("chunk_size phải nằm trong khoảng (0, 2^32)")
+    if mode == MODE_MERKLE:
+        return bam_merkle(src, hash_name, chunk_size, workers)
+    if mode != MODE_LINEAR:
+        raise ValueError(f"Chế độ băm không hỗ trợ: {mode}")
+    return bam_tuan_tu(src, hash_name, chunk_size)
+
+
+# --- CHỮ KÝ TÁCH RỜI ---
+
+def cam_ket(hash_name: str, mode: int, chunk_size: int, file_size: int, digest: bytes) -> bytes:
+    """Digest that is actually signed: binds the signature parameters to the content digest."""
+    h = hashlib.new(hash_name, NGU_CANH)
+    h.update(_HEADER.pack(MAGIC, _HASH_IDS[hash_name], mode, chunk_size, file_size, len(digest)))
+    h.update(digest)
+    return h.digest()
+
+
+class ChuKyTachRoi:
+    """Parsed detached signature."""
+
+    __slots__ = ("hash_name", "mode", "chunk_size", "file_size", "digest", "signature")
+
+    def __init__(self, hash_name, mode, chunk_size, file_size, digest, signature):
+        self.hash_name = hash_name
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.file_size = file_size
+        self.digest = digest
+        self.signature = signature
+
+    def to_bytes(self) -> bytes:
+        return b"".join((_HEADER.pack(MAGIC, _HASH_IDS[self.hash_name], self.mode, self.chunk_size,
+                                      self.file_size, len(self.digest)),
+                         self.digest, _SIG_LEN.pack(len(self.signature)), self.signature))
+
+    @classmethod
+    def from_bytes(cls, blob: bytes):
+        if len(blob) < _HEADER.size:
+            raise ValueError("Chữ ký tách rời quá ngắn")
+        magic, hash_id, mode, chunk_size, file_size, dlen = _HEADER.unpack_from(blob, 0)
+        if magic != MAGIC:
+            raise ValueError("Sai định dạng chữ ký tách rời (magic không khớp)")
+        if hash_id not in HASHES or mode not in _MODE_NAMES or chunk_size == 0:
+            raise ValueError("Tham số trong chữ ký tách rời không hợp lệ")
+        pos = _HEADER.size
+        digest = blob[pos:pos + dlen]
+        pos += dlen
+        if len(digest) != dlen or len(blob) < pos + _SIG_LEN.size:
+            raise ValueError("Chữ ký tách rời bị cắt cụt")
+        (slen,) = _SIG_LEN.unpack_from(blob, pos)
+        pos += _SIG_LEN.size
+        signature = blob[pos:pos + slen]
+        if len(signature) != slen or pos + slen != len(blob):
+            raise ValueError("Chữ ký tách rời có độ dài không hợp lệ")
+        return cls(HASHES[hash_id], mode, chunk_size, file_size, bytes(digest), bytes(signature))
+
+
+def ky_luong(private_key, src, merkle: bool = False, hash_name: str = "sha256",
+             chunk_size: int = DEFAULT_CHUNK_SIZE, workers: int | None = None) -> ChuKyTachRoi:
+    """Sign the content of file-like src without loading it into memory."""
+    if not private_key.has_private():
+        raise ValueError("Ký ECDSA cần khóa bí mật")
+    mode = MODE_MERKLE if merkle else MODE_LINEAR
+    digest, total = bam(src, mode, hash_name, chunk_size, workers)
+    statement = cam_ket(hash_name, mode, chunk_size, total, digest)
+    signature = lay_bo_ky(private_key).sign(DigestFile(hash_name, statement))
+    return ChuKyTachRoi(hash_name, mode, chunk_size, total, digest, signature)
+
+
+def xac_minh_luong(public_key, src, sig: ChuKyTachRoi, workers: int | None = None) -> bool:
+    """Re-hash src with the parameters recorded in sig and verify the signature."""
+    digest, total = bam(src, sig.mode, sig.hash_name, sig.chunk_size, workers)
+    if total != sig.file_size:
+        return False
+    statement = cam_ket(sig.hash_name, sig.mode, sig.chunk_size, total, digest)
+    try:
+        lay_bo_xac_minh(public_key).verify(DigestFile(sig.hash_name, statement), sig.signature)
+        return True
+    except ValueError:
+        return False
+
+
+def ky_file(private_key, path, sig_path=None, **kwargs) -> Path:
+    """Sign path and write the detached signature (default <path>.esig)."""
+    with open(path, "rb") as src:
+        sig = ky_luong(private_key, src, **kwargs)
+    sig_path = Path(sig_path or str(path) + SIG_SUFFIX)
+    sig_path.write_bytes(sig.to_bytes())
+    return sig_path
+
+
+def xac_minh_file(public_key, path, sig_path=None, workers: int | None = None) -> bool:
+    sig = ChuKyTachRoi.from_bytes(Path(sig_path or str(path) + SIG_SUFFIX).read_bytes())
+    if os.path.getsize(path) != sig.file_size:
+        return False
+    with open(path, "rb") as src:
+        return xac_minh_luong(public_key, src, sig, workers)
+
+
+# --- ĐO HIỆU NĂNG ---
+
+def do_hieu_nang(size_mb: int = 256, workers_list=(1, 2, 4), chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Sign a temporary size_mb file in each mode and print MB/s (including the ECDSA sign)."""
+    import tempfile
+    import tracemalloc
+
+    from so_do_chu_ky_ECDSA import tao_cap_khoa_ecdsa
+
+    private_key, public_key = tao_cap_khoa_ecdsa()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "du_lieu.bin"
+        block = os.urandom(1024 * 1024)
+        with open(path, "wb") as f:
+            for _ in range(size_mb):
+                f.write(block)
+
+        print(f"File {size_mb} MB, khối {chunk_size // 1024} KB, {os.cpu_count()} lõi")
+        runs = [("tuần tự (mmap)", {}, None)]
+        runs += [(f"merkle {w} luồng", {"merkle": True, "workers": w}, w) for w in workers_list]
+        for label, kwargs, workers in runs:
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            sig_path = ky_file(private_key, path, chunk_size=chunk_size, **kwargs)
+            t_sign = time.perf_counter() - t0
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            t0 = time.perf_counter()
+            ok = xac_minh_file(public_key, path, sig_path, workers)
+            t_verify = time.perf_counter() - t0
+            print(f"  {label:<16} ký {size_mb / t_sign:8.0f} MB/s, xác minh {size_mb / t_verify:8.0f} MB/s, "
+                  f"bộ nhớ Python đỉnh {peak / 1024:7.0f} KB, khớp: {ok}")
+
+        t0 = time.perf_counter()
+        with open(path, "rb") as f:
+            sig = ky_luong(private_key, _LuongKhongSeek(f), chunk_size=chunk_size)
+        t_stream = time.perf_counter() - t0
+        with open(path, "rb") as f:
+            ok = xac_minh_luong(public_key, f, sig)
+        print(f"  {'luồng (readinto)':<16} ký {size_mb / t_stream:8.0f} MB/s, khớp: {ok}")
+
+
+class _LuongKhongSeek:
+    """Wrap a file so it looks like a pipe (no fileno, no mmap)."""
+
+    def __init__(self, f):
+        self._f = f
+
+    def readinto(self, b):
+        return self._f.readinto(b)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Ký / xác minh ECDSA cho file lớn (chữ ký tách rời).")
+    parser.add_argument("op", choices=["sign", "verify", "benchmark"])
+    parser.add_argument("input", nargs="?", help="File cần ký/xác minh ('-' = stdin)")
+    parser.add_argument("--key", help="File PEM khóa ECC")
+    parser.add_argument("--sig", help=f"File chữ ký (mặc định <input>{SIG_SUFFIX})")
+    parser.add_argument("--hash", choices=sorted(_HASH_IDS), default="sha256")
+    parser.add_argument("--merkle", action="store_true", help="Băm cây Merkle song song")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, help="Số luồng băm (mặc định: số lõi CPU)")
+    parser.add_argument("--size-mb", type=int, default=256, help="Kích thước file khi đo hiệu năng")
+    args = parser.parse_args(argv)
+
+    if args.op == "benchmark":
+        do_hieu_nang(args.size_mb, chunk_size=args.chunk_size)
+        return 0
+    if args.input is None or args.key is None:
+        parser.error("sign/verify cần input và --key")
+    if args.input == "-" and args.sig is None:
+        parser.error("đọc từ stdin thì phải chỉ rõ --sig")
+    key = ECC.import_key(Path(args.key).read_bytes())
+    sig_path = Path(args.sig or args.input + SIG_SUFFIX)
+
+    if args.op == "sign":
+        src = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+        try:
+            sig = ky_luong(key, src, args.merkle, args.hash, args.chunk_size, args.workers)
+        finally:
+            if src is not sys.stdin.buffer:
+                src.close()
+        sig_path.write_bytes(sig.to_bytes())
+        print(f"Đã ký {sig.file_size} bytes ({_MODE_NAMES[sig.mode]}, {sig.hash_name}) -> {sig_path}",
+              file=sys.stderr)
+        return 0
+
+    if args.input == "-":
+        sig = ChuKyTachRoi.from_bytes(sig_path.read_bytes())
+        ok = xac_minh_luong(key, sys.stdin.buffer, sig, args.workers)
+    else:
+        ok = xac_minh_file(key, args.input, sig_path, args.workers)
+    print("hợp lệ" if ok else "KHÔNG hợp lệ", file=sys.stderr)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+import contextlib
+import os
+import time
+
+from Crypto.Random import random as crypto_random
+
+# --- LŨY THỪA MODULO CHO SỐ MŨ BÍ MẬT ---
+#
+# pow() của Python dùng cửa sổ trượt: số phép nhân và vị trí tra bảng phụ
+# thuộc vào các bit của số mũ, nên thời gian (và dấu vết bộ nhớ đệm) làm lộ
+# thông tin về khóa bí mật. Bản cứng hóa ở đây:
+#   - cửa sổ cố định w bit: luôn đúng `bits` phép bình phương và bits/w phép
+#     nhân, phần tử bảng được chọn bằng cách quét hết bảng với mặt nạ bit
+#     (không có chỉ số phụ thuộc bí mật);
+#   - hoặc Montgomery ladder: mỗi bit đúng một phép nhân và một bình phương;
+#   - che mù số mũ: e' = e + t * order với t ngẫu nhiên 64 bit (order là bội
+#     của bậc nhóm, ví dụ p - 1 hoặc e*d - 1 với RSA), nên mỗi lần tính dùng
+#     một chuỗi bit khác nhau;
+#   - che mù cơ số do nơi gọi thực hiện (xem he_mat_ElGamal, he_mat_RSA) vì
+#     cần thông tin công khai riêng của từng hệ mật.
+#
+# Module nằm ở thư mục gốc vì được cả he_mat_ElGamal và he_mat_RSA dùng; các
+# điểm vào (mat_ma, module ở thư mục gốc, benchmarks) đều đã có thư mục gốc
+# trong sys.path.
+#
+# Số nguyên lớn của CPython không có thời gian hằng ở mức từ máy (phép nhân,
+# phép chia lấy dư phụ thuộc độ dài thực của toán hạng), nên đây là biện pháp
+# giảm rò rỉ ở mức thuật toán chứ không phải bảo đảm thời gian hằng tuyệt đối.
+#
+# Công tắc cấu hình: "fast" (mặc định, dùng pow) hoặc "hardened", chọn bằng
+# biến môi trường MAT_MA_LUY_THUA hoặc dat_che_do() lúc khởi động dịch vụ.
+
+CHE_DO_NHANH = "fast"
+CHE_DO_AN_TOAN = "hardened"
+CAC_CHE_DO = (CHE_DO_NHANH, CHE_DO_AN_TOAN)
+BIEN_MOI_TRUONG = "MAT_MA_LUY_THUA"
+DEFAULT_WINDOW = 4
+BLIND_BITS = 64
+
+
+def _che_do_tu_moi_truong() -> str:
+    mode = os.environ.get(BIEN_MOI_TRUONG, CHE_DO_NHANH).strip().lower() or CHE_DO_NHANH
+    if mode not in CAC_CHE_DO:
+        raise ValueError(f"{BIEN_MOI_TRUONG}={mode!r} không hợp lệ (chọn trong {CAC_CHE_DO})")
+    return mode
+
+
+_che_do = _che_do_tu_moi_truong()
+
+
+def che_do() -> str:
+    """Return the current modexp mode ("fast" or "hardened")."""
+    return _che_do
+
+
+def dat_che_do(mode: str) -> str:
+    """Switch the process-wide modexp mode; returns the previous mode."""
+    global _che_do
+    if mode not in CAC_CHE_DO:
+        raise ValueError(f"Chế độ lũy thừa không hợp lệ: {mode!r} (chọn trong {CAC_CHE_DO})")
+    previous, _che_do = _che_do, mode
+    return previous
+
+
+def dang_cung_hoa() -> bool:
+    """True when secret-exponent modexp goes through the hardened engine."""
+    return _che_do == CHE_DO_AN_TOAN
+
+
+@contextlib.contextmanager
+def dung_che_do(mode: str):
+    """Temporarily switch the modexp mode (benchmarks, tests)."""
+    previous = dat_che_do(mode)
+    try:
+        yield
+    finally:
+        dat_che_do(previous)
+
+
+# --- THUẬT TOÁN ---
+
+def _chon(table, digit: int) -> int:
+    # Quét toàn bộ bảng; -(i == digit) là mặt nạ toàn bit 1 hoặc 0
+    acc = 0
+    for i, value in enumerate(table):
+        acc |= value & -(i == digit)
+    return acc
+
+
+def luy_thua_cua_so_co_dinh(base: int, exp: int, mod: int, bits: int, window: int = DEFAULT_WINDOW) -> int:
+    """base^exp mod mod with a fixed window: bits squarings, ceil(bits/window) multiplications.
+
+    exp must be < 2^bits; bits (not exp) fixes the number of operations.
+    """
+    if exp < 0 or exp >> bits:
+        raise ValueError("Số mũ phải nằm trong [0, 2^bits)")
+    base %= mod
+    table = [1 % mod, base]
+    for _ in range(2, 1 << window):
+        table.append(table[-1] * base % mod)
+    mask = (1 << window) - 1
+    result = 1 % mod
+    for shift in range(-(-bits // window) * window - window, -1, -window):
+        for _ in range(window):
+            result = result * result % mod
+        result = result * _chon(table, (exp >> shift) & mask) % mod
+    return result
+
+
+def luy_thua_ladder(base: int, exp: int, mod: int, bits: int) -> int:
+    """base^exp mod mod with a Montgomery ladder over exactly bits bits of exp."""
+    if exp < 0 or exp >> bits:
+        raise ValueError("Số mũ phải nằm trong [0, 2^bits)")
+    r0, r1 = 1 % mod, base % mod
+    for i in range(bits - 1, -1, -1):
+        # Hoán đổi bằng mặt nạ thay vì rẽ nhánh theo bit bí mật
+        swap = -((exp >> i) & 1)
+        diff = (r0 ^ r1) & swap
+        r0, r1 = r0 ^ diff, r1 ^ diff
+        r1 = r0 * r1 % mod
+        r0 = r0 * r0 % mod
+        diff = (r0 ^ r1) & swap
+        r0, r1 = r0 ^ diff, r1 ^ diff
+    return r0
+
+
+THUAT_TOAN = {"window": luy_thua_cua_so_co_dinh, "ladder": luy_thua_ladder}
+
+
+def luy_thua_an_toan(base: int, exp: int, mod: int, order: int | None = None,
+                     thuat_toan: str = "window") -> int:
+    """Hardened base^exp mod mod for a secret exp, regardless of the configured mode.
+
+    order: any multiple of the order of base (p - 1 for Z_p^*, e*d - 1 for RSA);
+    when given, the exponent is blinded with a fresh 64-bit multiple of it.
+    """
+    base, exp, mod = int(base), int(exp), int(mod)
+    if order is not None:
+        order = int(order)
+        exp += crypto_random.getrandbits(BLIND_BITS) * order
+        bits = order.bit_length() + BLIND_BITS + 1
+    else:
+        bits = max(mod.bit_length(), exp.bit_length())
+    return THUAT_TOAN[thuat_toan](base, exp, mod, bits)
+
+
+def luy_thua_bi_mat(base: int, exp: int, mod: int, order: int | None = None) -> int:
+    """base^exp mod mod for a secret exp: pow() in fast mode, luy_thua_an_toan() in hardened mode."""
+    if _che_do == CHE_DO_AN_TOAN:
+        return luy_thua_an_toan(base, exp, mod, order)
+    return pow(base, exp, mod)
+
+
+# --- ĐO HIỆU NĂNG ---
+
+def _ops_per_sec(fn, min_time: float) -> float:
+    count = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        count += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return count / elapsed
+
+
+def benchmark(groups=("modp1536", "ffdhe2048", "ffdhe3072"), min_time: float = 1.0):
+    """Print ops/sec of pow() against the hardened engine for a full-size secret exponent."""
+    import sys
+    from pathlib import Path
+
+    elgamal_dir = str(Path(__file__).resolve().parent / "he_mat_ElGamal")
+    if elgamal_dir not in sys.path:
+        sys.path.insert(0, elgamal_dir)
+    from nhom_chuan_ElGamal import get_group
+
+    print(f"{'nhóm':<10} {'phương pháp':<24} {'ops/s':>10} {'so với pow':>11}")
+    results = []
+    for group in groups:
+        p, g = get_group(group)
+        exp = crypto_random.randrange(2, p - 1)
+        base = pow(g, crypto_random.randrange(2, p - 1), p)
+        expected = pow(base, exp, p)
+        methods = [
+            ("pow", lambda: pow(base, exp, p)),
+            ("cửa sổ cố định w=4", lambda: luy_thua_an_toan(base, exp, p)),
+            ("ladder", lambda: luy_thua_an_toan(base, exp, p, thuat_toan="ladder")),
+            ("cửa sổ + che mù mũ", lambda: luy_thua_an_toan(base, exp, p, order=p - 1)),
+        ]
+        baseline = None
+        for label, fn in methods:
+            assert fn() == expected, label
+            rate = _ops_per_sec(fn, min_time)
+            baseline = baseline or rate
+            results.append({"group": group, "method": label, "ops_per_sec": rate, "ratio": rate / baseline})
+            print(f"{group:<10} {label:<24} {rate:>10.1f} {rate / baseline:>10.2f}x")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,340 @@
+"""
+Mã hóa lai RSA-OAEP + AES-GCM theo luồng cho thông điệp / file lớn.
+
+PKCS1_OAEP chỉ mã hóa được tối đa (kích thước modulus - 2*hLen - 2) byte
+(62 byte với RSA-1024 + SHA-256), và chia nhỏ rồi mã hóa từng khối bằng RSA thì
+mỗi khối tốn một phép toán RSA. Ở đây RSA-OAEP chỉ bọc một khóa AES-256 ngẫu
+nhiên cho cả file; dữ liệu được mã hóa bằng ma_hoa_luong_AES nên thông lượng bị
+giới hạn bởi AES chứ không phải RSA.
+
+Định dạng:
+    MAGIC | len_wrapped (u16) | wrapped_key | luồng ma_hoa_luong_AES (header | khối...)
+
+wrapped_key = RSA-OAEP(SHA-256, label=MAGIC)(khóa AES 32 byte).
+
+Ví dụ:
+    python ma_hoa_lai_RSA.py encrypt bao_cao.pdf bao_cao.pdf.rsa
+    python ma_hoa_lai_RSA.py decrypt bao_cao.pdf.rsa bao_cao.pdf --key he_mat_RSA/private-key.pem
+    python ma_hoa_lai_RSA.py benchmark
+"""
+import argparse
+import contextlib
+import io
+import os
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from Crypto.Cipher import PKCS1_OAEP
+from Crypto.Hash import SHA256
+from Crypto.PublicKey import RSA
+from Crypto.Random import get_random_bytes
+
+from ma_hoa_luong_AES import (DEFAULT_CHUNK_SIZE, doc_vao_day_du, giai_ma_luong_iter, ma_hoa_luong_iter)
+
+BASE_DIR = Path(__file__).resolve().parent
+RSA_DIR = BASE_DIR / "he_mat_RSA"
+
+MAGIC = b"RSH1"
+AES_KEY_LENGTH = 32
+_PREFIX = struct.Struct(">4sH")
+DEFAULT_CACHE_SIZE = 1024
+# Số luồng tối đa dùng chung một khóa AES bọc. Mỗi luồng mã hóa bằng khóa riêng
+# HKDF(khóa AES, salt 16 byte ngẫu nhiên) của ma_hoa_luong_AES, nên giới hạn này
+# chỉ để thay khóa định kỳ, không phải để tránh trùng nonce GCM giữa các luồng.
+DEFAULT_MAX_MESSAGES = 1 << 20
+
+
+def _oaep(key):
+    return PKCS1_OAEP.new(key, hashAlgo=SHA256, label=MAGIC)
+
+
+def boc_khoa(public_key, aes_key: bytes | None = None):
+    """Bọc một khóa AES bằng RSA-OAEP. Trả về (aes_key, prefix của container)."""
+    aes_key = aes_key if aes_key is not None else get_random_bytes(AES_KEY_LENGTH)
+    wrapped = _oaep(public_key).encrypt(aes_key)
+    return aes_key, _PREFIX.pack(MAGIC, len(wrapped)) + wrapped
+
+
+def doc_khoa_boc(src) -> bytes:
+    """Đọc MAGIC và khóa đã bọc ở đầu container; trả về wrapped_key."""
+    fixed = bytearray(_PREFIX.size)
+    if doc_vao_day_du(src, memoryview(fixed)) != _PREFIX.size:
+        raise ValueError("Container quá ngắn: thiếu header RSA")
+    magic, length = _PREFIX.unpack(fixed)
+    if magic != MAGIC:
+        raise ValueError("Sai định dạng container RSA lai (magic không khớp)")
+    wrapped = bytearray(length)
+    if doc_vao_day_du(src, memoryview(wrapped)) != length:
+        raise ValueError("Container quá ngắn: khóa bọc bị cắt cụt")
+    return bytes(wrapped)
+
+
+def mo_khoa(private_key, wrapped: bytes) -> bytes:
+    try:
+        aes_key = _oaep(private_key).decrypt(wrapped)
+    except (ValueError, TypeError):
+        raise ValueError("Không mở được khóa AES (sai khóa RSA hoặc container bị sửa)") from None
+    if len(aes_key) != AES_KEY_LENGTH:
+        raise ValueError("Khóa AES trong container có độ dài không hợp lệ")
+    return aes_key
+
+
+def _ghi_luong(aes_key: bytes, prefix: bytes, src, dst, chunk_size: int) -> int:
+    dst.write(prefix)
+    written = len(prefix)
+    for piece in ma_hoa_luong_iter(aes_key, src, chunk_size):
+        dst.write(piece)
+        written += len(piece)
+    return written
+
+
+def _doc_luong(aes_key: bytes, src, dst) -> int:
+    written = 0
+    for piece in giai_ma_luong_iter(aes_key, src):
+        dst.write(piece)
+        written += len(piece)
+    return written
+
+
+# --- MỘT THÔNG ĐIỆP / MỘT FILE ---
+
+def ma_hoa_lai(public_key, src, dst, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Mã hóa src vào dst (file-like): một phép RSA cho cả luồng. Trả về số byte đã ghi."""
+    aes_key, prefix = boc_khoa(public_key)
+    return _ghi_luong(aes_key, prefix, src, dst, chunk_size)
+
+
+def giai_ma_lai(private_key, src, dst) -> int:
+    """Giải mã container từ src vào dst; mỗi khối chỉ được ghi sau khi xác thực. Trả về số byte bản rõ."""
+    aes_key = mo_khoa(private_key, doc_khoa_boc(src))
+    return _doc_luong(aes_key, src, dst)
+
+
+def ma_hoa_lai_bytes(public_key, data: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE) -> bytes:
+    out = io.BytesIO()
+    ma_hoa_lai(public_key, io.BytesIO(data), out, chunk_size)
+    return out.getvalue()
+
+
+def giai_ma_lai_bytes(private_key, blob: bytes) -> bytes:
+    out = io.BytesIO()
+    giai_ma_lai(private_key, io.BytesIO(blob), out)
+    return out.getvalue()
+
+
+def ma_hoa_lai_file(public_key, in_path, out_path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    with open(in_path, "rb") as src, open(out_path, "wb") as dst:
+        return ma_hoa_lai(public_key, src, dst, chunk_size)
+
+
+def giai_ma_lai_file(private_key, in_path, out_path) -> int:
+    """Giải mã ra file tạm rồi đổi tên, để không để lại bản rõ dở dang khi xác thực thất bại.
+
+    in_path là đường dẫn hoặc một đối tượng file đã mở (ví dụ sys.stdin.buffer).
+    """
+    out_path = Path(out_path)
+    tmp = out_path.with_name(out_path.name + ".part")
+    opened = open(in_path, "rb") if isinstance(in_path, (str, os.PathLike)) else contextlib.nullcontext(in_path)
+    try:
+        with opened as src, open(tmp, "wb") as dst:
+            written = giai_ma_lai(private_key, src, dst)
+        tmp.replace(out_path)
+        return written
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+# --- THEO LÔ: chia sẻ phép toán RSA giữa nhiều thông điệp ---
+
+class PhienMaHoaLai:
+    """Bọc một khóa AES một lần rồi mã hóa nhiều thông điệp / file cho cùng người nhận.
+
+    Mỗi container vẫn độc lập (có đủ khóa bọc, salt và khóa luồng riêng);
+    chỉ phép RSA công khai được dùng chung. Khóa được thay sau max_messages luồng.
+    """
+
+    def __init__(self, public_key, max_messages: int = DEFAULT_MAX_MESSAGES,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.public_key = public_key
+        self.max_messages = max_messages
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self._aes_key = None
+        self._prefix = None
+        self._used = 0
+        self.wraps = 0
+
+    def _lay_khoa(self):
+        with self._lock:
+            if self._aes_key is None or self._used >= self.max_messages:
+                self._aes_key, self._prefix = boc_khoa(self.public_key)
+                self._used = 0
+                self.wraps += 1
+            self._used += 1
+            return self._aes_key, self._prefix
+
+    def ma_hoa(self, src, dst) -> int:
+        aes_key, prefix = self._lay_khoa()
+        return _ghi_luong(aes_key, prefix, src, dst, self.chunk_size)
+
+    def ma_hoa_bytes(self, data: bytes) -> bytes:
+        out = io.BytesIO()
+        self.ma_hoa(io.BytesIO(data), out)
+        return out.getvalue()
+
+    def ma_hoa_file(self, in_path, out_path) -> int:
+        with open(in_path, "rb") as src, open(out_path, "wb") as dst:
+            return self.ma_hoa(src, dst)
+
+
+class BoGiaiMaLai:
+    """Giải mã nhiều container với một khóa bí mật; khóa AES đã mở được giữ trong LRU
+    theo wrapped_key, nên các container cùng phiên chỉ tốn một phép RSA bí mật."""
+
+    def __init__(self, private_key, cache_size: int = DEFAULT_CACHE_SIZE):
+        if not private_key.has_private():
+            raise ValueError("Cần khóa bí mật RSA")
+        self.private_key = private_key
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _mo_khoa(self, wrapped: bytes) -> bytes:
+        with self._lock:
+            aes_key = self._cache.get(wrapped)
+            if aes_key is not None:
+                self.hits += 1
+                self._cache.move_to_end(wrapped)
+                return aes_key
+            self.misses += 1
+        aes_key = mo_khoa(self.private_key, wrapped)
+        with self._lock:
+            self._cache[wrapped] = aes_key
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return aes_key
+
+    def giai_ma(self, src, dst) -> int:
+        aes_key = self._mo_khoa(doc_khoa_boc(src))
+        return _doc_luong(aes_key, src, dst)
+
+    def giai_ma_bytes(self, blob: bytes) -> bytes:
+        out = io.BytesIO()
+        self.giai_ma(io.BytesIO(blob), out)
+        return out.getvalue()
+
+    def giai_ma_file(self, in_path, out_path) -> int:
+        out_path = Path(out_path)
+        tmp = out_path.with_name(out_path.name + ".part")
+        try:
+            with open(in_path, "rb") as src, open(tmp, "wb") as dst:
+                written = self.giai_ma(src, dst)
+            tmp.replace(out_path)
+            return written
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def thong_ke(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+
+# --- ĐO HIỆU NĂNG ---
+
+def _oaep_tung_khoi(public_key, private_key, data: bytes):
+    """Cách làm ngây thơ: chia dữ liệu thành khối vừa OAEP và mã hóa RSA từng khối."""
+    enc, dec = _oaep(public_key), _oaep(private_key)
+    block = public_key.size_in_bytes() - 2 * SHA256.digest_size - 2
+    blocks = [enc.encrypt(data[i:i + block]) for i in range(0, len(data), block)]
+    return b"".join(dec.decrypt(b) for b in blocks)
+
+
+def do_hieu_nang(bits: int = 2048, sizes=(64 * 1024, 8 * 1024 * 1024), so_thong_diep: int = 200):
+    key = RSA.generate(bits)
+    public_key = key.publickey()
+    print(f"RSA-{bits}")
+    for size in sizes:
+        data = get_random_bytes(size)
+        mb = size / 1e6
+        if size <= 256 * 1024:
+            t0 = time.perf_counter()
+            assert _oaep_tung_khoi(public_key, key, data) == data
+            print(f"  OAEP từng khối  {size:>9} bytes: {mb / (time.perf_counter() - t0):8.2f} MB/s (mã hóa + giải mã)")
+        t0 = time.perf_counter()
+        blob = ma_hoa_lai_bytes(public_key, data)
+        t_enc = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        assert giai_ma_lai_bytes(key, blob) == data
+        t_dec = time.perf_counter() - t0
+        print(f"  lai RSA+AES-GCM {size:>9} bytes: mã hóa {mb / t_enc:8.2f} MB/s, giải mã {mb / t_dec:8.2f} MB/s")
+
+    messages = [get_random_bytes(1024) for _ in range(so_thong_diep)]
+    t0 = time.perf_counter()
+    blobs = [ma_hoa_lai_bytes(public_key, m) for m in messages]
+    t_single = time.perf_counter() - t0
+    session = PhienMaHoaLai(public_key)
+    t0 = time.perf_counter()
+    session_blobs = [session.ma_hoa_bytes(m) for m in messages]
+    t_session = time.perf_counter() - t0
+    print(f"  {so_thong_diep} thông điệp 1 KB: mã hóa riêng lẻ {so_thong_diep / t_single:8.0f} msg/s, "
+          f"PhienMaHoaLai {so_thong_diep / t_session:8.0f} msg/s")
+
+    t0 = time.perf_counter()
+    for b in blobs:
+        giai_ma_lai_bytes(key, b)
+    t_single = time.perf_counter() - t0
+    decoder = BoGiaiMaLai(key)
+    t0 = time.perf_counter()
+    ok = all(decoder.giai_ma_bytes(b) == m for b, m in zip(session_blobs, messages))
+    t_session = time.perf_counter() - t0
+    print(f"  {so_thong_diep} thông điệp 1 KB: giải mã riêng lẻ {so_thong_diep / t_single:8.0f} msg/s, "
+          f"BoGiaiMaLai {so_thong_diep / t_session:8.0f} msg/s (khớp: {ok}, {decoder.thong_ke()})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mã hóa lai RSA-OAEP + AES-GCM theo luồng.")
+    parser.add_argument("op", choices=["encrypt", "decrypt", "benchmark"])
+    parser.add_argument("input", nargs="?", help="File vào ('-' = stdin)")
+    parser.add_argument("output", nargs="?", help="File ra ('-' = stdout)")
+    parser.add_argument("--key", help="File PEM khóa RSA (mặc định: he_mat_RSA/public-key.pem hoặc private-key.pem)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--bits", type=int, default=2048, help="Kích thước khóa khi đo hiệu năng")
+    args = parser.parse_args(argv)
+
+    if args.op == "benchmark":
+        do_hieu_nang(args.bits)
+        return 0
+    if args.input is None or args.output is None:
+        parser.error("encrypt/decrypt cần input và output")
+
+    default = RSA_DIR / ("public-key.pem" if args.op == "encrypt" else "private-key.pem")
+    key = RSA.import_key(Path(args.key or default).read_bytes())
+    if args.op == "decrypt" and args.output != "-":
+        # Qua file .part: bản mã bị cắt cụt / giả mạo không để lại bản rõ ở đích
+        n = giai_ma_lai_file(key, sys.stdin.buffer if args.input == "-" else args.input, args.output)
+        print(f"{args.op}: {n} bytes", file=sys.stderr)
+        return 0
+    src = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    dst = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        if args.op == "encrypt":
+            n = ma_hoa_lai(key, src, dst, args.chunk_size)
+        else:
+            n = giai_ma_lai(key, src, dst)
+    finally:
+        if src is not sys.stdin.buffer:
+            src.close()
+        if dst is not sys.stdout.buffer:
+            dst.close()
+    print(f"{args.op}: {n} bytes", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
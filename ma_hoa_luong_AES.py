@@ -0,0 +1,228 @@
+import io
+import struct
+
+from Crypto.Cipher import AES
+from Crypto.Hash import SHA256
+from Crypto.Protocol.KDF import HKDF
+from Crypto.Random import get_random_bytes
+
+# --- MÃ HÓA AES-GCM THEO LUỒNG (STREAM) ---
+#
+# header = MAGIC | chunk_size (u32) | salt (16 bytes) | nonce_prefix (7 bytes)
+# frame  = ciphertext (chunk_size bytes, khối cuối có thể ngắn hơn) | tag (16 bytes)
+#
+# Mỗi luồng dùng khóa riêng HKDF-SHA256(khóa, salt), với salt ngẫu nhiên trong
+# header, nên có thể dùng lại cùng một khóa (khóa phiên ECDH tĩnh, khóa AES của
+# ma_hoa_lai_RSA) cho rất nhiều luồng: nonce chỉ cần không lặp trong một luồng,
+# thay vì tiền tố 56 bit ngẫu nhiên phải không trùng giữa mọi luồng (trùng sau
+# khoảng 2^28 luồng là mất cả bí mật lẫn xác thực của GCM).
+#
+# Nonce của khối i = nonce_prefix | i (u32 big-endian) | cờ khối cuối (1 byte).
+# Bộ đếm và cờ khối cuối ngăn việc đổi thứ tự, xóa hoặc cắt cụt khối. Header
+# được xác thực kèm mọi khối (associated data).
+#
+# Cả hai chiều chỉ dùng hai bộ đệm cố định (đọc trước một khối để biết khối
+# hiện tại có phải khối cuối không), nên bộ nhớ không phụ thuộc kích thước dữ liệu.
+
+MAGIC = b"AGS2"  # AGS1 (không có salt) không còn được hỗ trợ
+TAG_LENGTH = 16
+SALT_LENGTH = 16
+NONCE_PREFIX_LENGTH = 7
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# Giới hạn chunk_size đọc từ header: bên giải mã cấp phát ~2 * (chunk_size + 16) byte
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+_HEADER = struct.Struct(">4sI16s7s")
+HEADER_LENGTH = _HEADER.size
+_MAX_CHUNKS = 1 << 32
+
+
+def _khoa_luong(key: bytes, salt: bytes) -> bytes:
+    """Per-stream AES key derived from the caller's key and the header salt."""
+    return HKDF(key, len(key), salt, SHA256, context=MAGIC)
+
+
+def _nonce(prefix: bytes, counter: int, final: bool) -> bytes:
+    if counter >= _MAX_CHUNKS:
+        raise ValueError("Luồng quá dài: bộ đếm khối bị tràn")
+    return prefix + counter.to_bytes(4, "big") + (b"\x01" if final else b"\x00")
+
+
+def doc_vao_day_du(src, view: memoryview) -> int:
+    """Fill view from src, looping over short reads (pipes, sockets). Returns the number of bytes read."""
+    total = 0
+    size = len(view)
+    readinto = getattr(src, "readinto", None)
+    while total < size:
+        if readinto is not None:
+            n = readinto(view[total:])
+        else:
+            data = src.read(size - total)
+            n = len(data)
+            view[total:total + n] = data
+        if not n:
+            break
+        total += n
+    return total
+
+
+def tao_header(chunk_size: int = DEFAULT_CHUNK_SIZE, nonce_prefix: bytes | None = None) -> bytes:
+    if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+        raise ValueError(f"chunk_size phải nằm trong khoảng (0, {MAX_CHUNK_SIZE}]")
+    if nonce_prefix is None:
+        nonce_prefix = get_random_bytes(NONCE_PREFIX_LENGTH)
+    return _HEADER.pack(MAGIC, chunk_size, get_random_bytes(SALT_LENGTH), nonce_prefix)
+
+
+def doc_header(src):
+    """Read and parse a stream header. Returns (header, chunk_size, salt, nonce_prefix)."""
+    header = bytearray(HEADER_LENGTH)
+    if doc_vao_day_du(src, memoryview(header)) != HEADER_LENGTH:
+        raise ValueError("Luồng quá ngắn: thiếu header")
+    magic, chunk_size, salt, prefix = _HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError("Sai định dạng luồng AES-GCM (magic không khớp)")
+    if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+        raise ValueError("chunk_size trong header không hợp lệ")
+    return bytes(header), chunk_size, salt, prefix
+
+
+def ma_hoa_luong_iter(key: bytes, src, chunk_size: int = DEFAULT_CHUNK_SIZE, header: bytes | None = None):
+    """Encrypt file-like src, yielding the header and then one frame per chunk.
+
+    Yielded frames are views into a reused buffer: write or copy each one
+    before advancing the generator.
+    """
+    header = header or tao_header(chunk_size)
+    _, chunk_size, salt, prefix = _HEADER.unpack(header)
+    key = _khoa_luong(key, salt)
+    yield header
+
+    bufs = (bytearray(chunk_size), bytearray(chunk_size))
+    out = bytearray(chunk_size + TAG_LENGTH)
+    out_view = memoryview(out)
+    cur = 0
+    n = doc_vao_day_du(src, memoryview(bufs[cur]))
+    counter = 0
+    while True:
+        nxt_n = doc_vao_day_du(src, memoryview(bufs[1 - cur])) if n == chunk_size else 0
+        final = nxt_n == 0
+        cipher = AES.new(key, AES.MODE_GCM, nonce=_nonce(prefix, counter, final))
+        cipher.update(header)
+        cipher.encrypt(memoryview(bufs[cur])[:n], output=out_view[:n])
+        out_view[n:n + TAG_LENGTH] = cipher.digest()
+        yield out_view[:n + TAG_LENGTH]
+        if final:
+            return
+        counter += 1
+        cur = 1 - cur
+        n = nxt_n
+
+
+def giai_ma_luong_iter(key: bytes, src):
+    """Decrypt a stream from src, yielding each plaintext chunk once its tag verifies.
+
+    Yielded chunks are views into a reused buffer. Raises ValueError on the
+    first chunk that fails authentication, or if the stream was truncated.
+    """
+    header, chunk_size, salt, prefix = doc_header(src)
+    key = _khoa_luong(key, salt)
+    frame_size = chunk_size + TAG_LENGTH
+    bufs = (bytearray(frame_size), bytearray(frame_size))
+    out = bytearray(chunk_size)
+    out_view = memoryview(out)
+    cur = 0
+    n = doc_vao_day_du(src, memoryview(bufs[cur]))
+    counter = 0
+    while True:
+        if n < TAG_LENGTH:
+            raise ValueError("Luồng bị cắt cụt: khối thiếu tag")
+        nxt_n = doc_vao_day_du(src, memoryview(bufs[1 - cur])) if n == frame_size else 0
+        final = nxt_n == 0
+        frame = memoryview(bufs[cur])[:n]
+        body = n - TAG_LENGTH
+        cipher = AES.new(key, AES.MODE_GCM, nonce=_nonce(prefix, counter, final))
+        cipher.update(header)
+        cipher.decrypt(frame[:body], output=out_view[:body])
+        try:
+            cipher.verify(frame[body:])
+        except ValueError:
+            raise ValueError(f"Xác thực khối {counter} thất bại (khóa sai, dữ liệu bị thay đổi hoặc cắt cụt)")
+        yield out_view[:body]
+        if final:
+            return
+        counter += 1
+        cur = 1 - cur
+        n = nxt_n
+
+
+def ma_hoa_luong(key: bytes, src, dst, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Encrypt src into dst. Returns the number of bytes written."""
+    written = 0
+    for piece in ma_hoa_luong_iter(key, src, chunk_size):
+        dst.write(piece)
+        written += len(piece)
+    return written
+
+
+def giai_ma_luong(key: bytes, src, dst) -> int:
+    """Decrypt src into dst, writing each chunk only after it verifies. Returns plaintext bytes."""
+    written = 0
+    for piece in giai_ma_luong_iter(key, src):
+        dst.write(piece)
+        written += len(piece)
+    return written
+
+
+def ma_hoa_bytes(key: bytes, data: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE) -> bytes:
+    out = io.BytesIO()
+    ma_hoa_luong(key, io.BytesIO(data), out, chunk_size)
+    return out.getvalue()
+
+
+def giai_ma_bytes(key: bytes, blob: bytes) -> bytes:
+    out = io.BytesIO()
+    giai_ma_luong(key, io.BytesIO(blob), out)
+    return out.getvalue()
+
+
+# --- KẾT HỢP VỚI KÊNH ECDH ---
+
+def ma_hoa_file_ecdh(private_key, peer_public_key, src, dst, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Encrypt src for the peer using the HKDF-derived ECDH session key (any ECDH curve)."""
+    from thoa_thuan_khoa_ECDH import khoa_chung_hkdf
+
+    key = khoa_chung_hkdf(private_key, peer_public_key)
+    return ma_hoa_luong(key, src, dst, chunk_size)
+
+
+def giai_ma_file_ecdh(private_key, peer_public_key, src, dst) -> int:
+    """Decrypt a stream produced by ma_hoa_file_ecdh on the other side of the channel."""
+    from thoa_thuan_khoa_ECDH import khoa_chung_hkdf
+
+    key = khoa_chung_hkdf(private_key, peer_public_key)
+    return giai_ma_luong(key, src, dst)
+
+
+if __name__ == '__main__':
+    import time
+    from he_mat_ECC import tao_cap_khoa
+
+    alice = tao_cap_khoa()
+    bob = tao_cap_khoa()
+    data = get_random_bytes(8 * 1024 * 1024 + 123)
+
+    src, enc = io.BytesIO(data), io.BytesIO()
+    t0 = time.perf_counter()
+    ma_hoa_file_ecdh(alice, bob.public_key(), src, enc)
+    t_enc = time.perf_counter() - t0
+
+    enc.seek(0)
+    dec = io.BytesIO()
+    t0 = time.perf_counter()
+    giai_ma_file_ecdh(bob, alice.public_key(), enc, dec)
+    t_dec = time.perf_counter() - t0
+
+    mb = len(data) / 1e6
+    print(f"Dữ liệu nhị phân {mb:.1f} MB, bản mã {len(enc.getvalue()) / 1e6:.1f} MB")
+    print(f"Mã hóa: {mb / t_enc:.1f} MB/s, giải mã: {mb / t_dec:.1f} MB/s")
+    print(f"Giải mã khớp với bản gốc: {dec.getvalue() == data}")
@@ -0,0 +1,21 @@
+"""
+Điểm vào dòng lệnh dùng chung cho các hệ mật của dự án:
+
+    python -m mat_ma <lệnh> [tham số...]
+
+Gói không import PyCryptodome hay module hệ mật nào lúc nạp; mỗi lệnh chỉ
+import đúng module nó cần khi được gọi, nên một lần gọi trong pipeline shell
+(ví dụ xác minh một chữ ký) chỉ trả chi phí khởi động của lệnh đó.
+"""
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ELGAMAL_DIR = os.path.join(BASE_DIR, "he_mat_ElGamal")
+RSA_DIR = os.path.join(BASE_DIR, "he_mat_RSA")
+BENCH_DIR = os.path.join(BASE_DIR, "benchmarks")
+
+# Các module trong thư mục con dùng import cùng thư mục (from doc_key_ElGamal import ...)
+for _d in (ELGAMAL_DIR, RSA_DIR, BASE_DIR):
+    if _d not in sys.path:
+        sys.path.insert(0, _d)
@@ -0,0 +1,5 @@
+import sys
+
+from mat_ma.dong_lenh import main
+
+sys.exit(main())
@@ -0,0 +1,54 @@
+"""
+Bảng lệnh của `python -m mat_ma`. Mỗi lệnh là một chuỗi "module:hàm" và chỉ
+được import khi chính lệnh đó chạy; hàm nhận danh sách tham số còn lại (argv)
+và trả về mã thoát.
+"""
+import importlib
+import sys
+
+from mat_ma import BENCH_DIR
+
+# tên lệnh -> (đích "module:hàm", mô tả)
+LENH = {
+    "keygen": ("mat_ma.lenh:keygen", "Sinh cặp khóa rsa / elgamal / ecdsa"),
+    "sign": ("mat_ma.lenh:sign", "Ký một file (ecdsa, elgamal)"),
+    "verify": ("mat_ma.lenh:verify", "Xác minh chữ ký của một file, mã thoát 1 nếu sai"),
+    "file-sig": ("ky_file_ECDSA:main", "Ký / xác minh ECDSA file lớn, chữ ký tách rời (tuần tự hoặc Merkle)"),
+    "hybrid": ("ma_hoa_lai_RSA:main", "Mã hóa lai RSA-OAEP + AES-GCM theo luồng"),
+    "bulk": ("xu_ly_hang_loat:main", "Xử lý hàng loạt bằng nhiều tiến trình"),
+    "server": ("may_chu_mat_ma:main", "Máy chủ mật mã asyncio"),
+    "load": ("tai_thu_may_chu:main", "Tạo tải cho máy chủ mật mã"),
+    "bench": ("chay_do_hieu_nang:main", "Bộ đo hiệu năng thống nhất"),
+}
+
+
+def nap_lenh(name: str):
+    """Import and return the function behind command name."""
+    target = LENH[name][0]
+    module_name, func_name = target.split(":")
+    if name == "bench" and BENCH_DIR not in sys.path:
+        sys.path.insert(0, BENCH_DIR)
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def in_tro_giup(file=sys.stdout):
+    print("Cách dùng: python -m mat_ma <lệnh> [tham số...]\n\nCác lệnh:", file=file)
+    for name, (_, desc) in LENH.items():
+        print(f"  {name:<8} {desc}", file=file)
+    print("\nXem tham số của từng lệnh: python -m mat_ma <lệnh> -h", file=file)
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        in_tro_giup(sys.stdout if argv else sys.stderr)
+        return 0 if argv else 2
+    name, rest = argv[0], argv[1:]
+    if name not in LENH:
+        print(f"Lệnh không hợp lệ: {name}\n", file=sys.stderr)
+        in_tro_giup(sys.stderr)
+        return 2
+    # argparse của lệnh con lấy tên chương trình từ sys.argv[0]
+    sys.argv[0] = f"python -m mat_ma {name}"
+    result = nap_lenh(name)(rest)
+    return int(result or 0)
@@ -0,0 +1,143 @@
+"""
+Các lệnh keygen / sign / verify của `python -m mat_ma`.
+
+Module hệ mật được import bên trong từng nhánh, nên `verify ecdsa` chỉ nạp
+so_do_chu_ky_ECDSA (ECC, DSS/EdDSA và hàm băm theo đường cong của khóa).
+Định dạng chữ ký giống xu_ly_hang_loat: ECDSA là chữ ký DSS thô (r | s),
+ElGamal là r | s big-endian, mỗi phần dài bằng số byte của p.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from mat_ma import ELGAMAL_DIR
+
+SIG_SUFFIX = ".sig"
+ECDSA_PRIVATE_FILE = "ecdsa-private.pem"
+ECDSA_PUBLIC_FILE = "ecdsa-public.pem"
+
+
+def _doc_dau_vao(path: str) -> bytes:
+    return sys.stdin.buffer.read() if path == "-" else Path(path).read_bytes()
+
+
+# --- SINH KHÓA ---
+
+def _keygen_ecdsa(argv) -> int:
+    parser = argparse.ArgumentParser(description="Sinh cặp khóa ECDSA.")
+    parser.add_argument("--out", default=".", help=f"Thư mục ghi {ECDSA_PRIVATE_FILE}/{ECDSA_PUBLIC_FILE}")
+    args = parser.parse_args(argv)
+
+    from so_do_chu_ky_ECDSA import tao_cap_khoa_ecdsa
+
+    private_key, public_key = tao_cap_khoa_ecdsa()
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / ECDSA_PRIVATE_FILE).write_text(private_key.export_key(format="PEM"), encoding="ascii")
+    (out_dir / ECDSA_PUBLIC_FILE).write_text(public_key.export_key(format="PEM"), encoding="ascii")
+    return 0
+
+
+def keygen(argv) -> int:
+    """keygen rsa|elgamal|ecdsa [tham số của lệnh sinh khóa tương ứng]"""
+    if not argv or argv[0] not in ("rsa", "elgamal", "ecdsa"):
+        print("Cách dùng: python -m mat_ma keygen {rsa,elgamal,ecdsa} [-h] ...", file=sys.stderr)
+        return 2
+    scheme, rest = argv[0], argv[1:]
+    if scheme == "rsa":
+        from sinh_key_RSA import main as keygen_rsa
+
+        return keygen_rsa(rest) or 0
+    if scheme == "elgamal":
+        from sinh_key_ElGamal import main as keygen_elgamal
+
+        return keygen_elgamal(rest) or 0
+    return _keygen_ecdsa(rest)
+
+
+# --- KÝ / XÁC MINH ---
+
+def _nap_elgamal(key_dir):
+    from doc_key_ElGamal import load_elgamal_keypair
+
+    private_key, public_key = load_elgamal_keypair(Path(key_dir or ELGAMAL_DIR))
+    return private_key, public_key, (int(public_key.p).bit_length() + 7) // 8
+
+
+def _nap_ecc(key_path):
+    if key_path is None:
+        raise SystemExit("ECDSA cần tham số --key (file PEM khóa ECC)")
+    from Crypto.PublicKey import ECC
+
+    return ECC.import_key(Path(key_path).read_bytes())
+
+
+def ky(scheme: str, data: bytes, key) -> bytes:
+    """Sign data; key is an ECC key (ecdsa) or a key directory (elgamal)."""
+    if scheme == "ecdsa":
+        from so_do_chu_ky_ECDSA import tao_chu_ky_ecdsa
+
+        if not key.has_private():
+            raise ValueError("Ký ECDSA cần khóa bí mật")
+        return tao_chu_ky_ecdsa(key, data)
+
+    from he_mat_ElGamal import elgamal_sign
+
+    private_key, _, width = _nap_elgamal(key)
+    if private_key is None:
+        raise ValueError("Thiếu private key ElGamal")
+    r, s = elgamal_sign(private_key, data)
+    return r.to_bytes(width, "big") + s.to_bytes(width, "big")
+
+
+def xac_minh(scheme: str, data: bytes, signature: bytes, key) -> bool:
+    """Verify signature over data; key as in ky()."""
+    if scheme == "ecdsa":
+        from so_do_chu_ky_ECDSA import xac_minh_chu_ky_ecdsa
+
+        return xac_minh_chu_ky_ecdsa(key.public_key(), data, signature)
+
+    from he_mat_ElGamal import elgamal_verify
+
+    _, public_key, width = _nap_elgamal(key)
+    if len(signature) != 2 * width:
+        return False
+    sig = (int.from_bytes(signature[:width], "big"), int.from_bytes(signature[width:], "big"))
+    return elgamal_verify(public_key, data, sig)
+
+
+def _parser(op: str):
+    parser = argparse.ArgumentParser(description=("Ký" if op == "sign" else "Xác minh chữ ký của") + " một file.")
+    parser.add_argument("scheme", choices=["ecdsa", "elgamal"])
+    parser.add_argument("input", help="File thông điệp ('-' = stdin)")
+    parser.add_argument("--key", help="ecdsa: file PEM khóa ECC; elgamal: thư mục khóa (mặc định he_mat_ElGamal)")
+    return parser
+
+
+def sign(argv) -> int:
+    parser = _parser("sign")
+    parser.add_argument("-o", "--output", help=f"File chữ ký ('-' = stdout, mặc định <input>{SIG_SUFFIX})")
+    args = parser.parse_args(argv)
+    key = _nap_ecc(args.key) if args.scheme == "ecdsa" else args.key
+    signature = ky(args.scheme, _doc_dau_vao(args.input), key)
+    output = args.output or ("-" if args.input == "-" else args.input + SIG_SUFFIX)
+    if output == "-":
+        sys.stdout.buffer.write(signature)
+    else:
+        Path(output).write_bytes(signature)
+    return 0
+
+
+def verify(argv) -> int:
+    parser = _parser("verify")
+    parser.add_argument("signature", nargs="?", help=f"File chữ ký (mặc định <input>{SIG_SUFFIX})")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Chỉ trả mã thoát")
+    args = parser.parse_args(argv)
+    if args.signature is None and args.input == "-":
+        parser.error("đọc thông điệp từ stdin thì phải chỉ rõ file chữ ký")
+    key = _nap_ecc(args.key) if args.scheme == "ecdsa" else args.key
+    signature = Path(args.signature or args.input + SIG_SUFFIX).read_bytes()
+    ok = xac_minh(args.scheme, _doc_dau_vao(args.input), signature, key)
+    if not args.quiet:
+        print("hợp lệ" if ok else "KHÔNG hợp lệ", file=sys.stderr)
+    return 0 if ok else 1
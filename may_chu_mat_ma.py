@@ -0,0 +1,522 @@
+"""
+Máy chủ mật mã asyncio (TCP hoặc Unix socket) với giao thức nhị phân có tiền tố độ dài.
+
+Khung (frame), cả hai chiều:
+    u32 độ dài phần thân | thân
+Thân yêu cầu:   u32 mã yêu cầu | u8 thao tác | dữ liệu
+Thân phản hồi:  u32 mã yêu cầu | u8 trạng thái (0 = OK, 1 = lỗi) | dữ liệu (lỗi: thông báo UTF-8)
+
+Client được gửi liên tiếp nhiều yêu cầu không chờ (pipelining); phản hồi trả về
+theo thứ tự hoàn thành và được ghép lại bằng mã yêu cầu. Phép toán số lớn / điểm
+elliptic chạy trong nhóm tiến trình (khóa máy chủ nạp một lần mỗi tiến trình con)
+để vòng lặp sự kiện luôn rảnh. Các yêu cầu ký / xác minh ECDSA đến gần nhau được
+gom thành một lô trước khi gửi sang tiến trình con.
+
+Thao tác:
+    PING               -> b"pong"
+    ECDH_HANDSHAKE     điểm SEC1 của client -> điểm SEC1 nén của máy chủ; đặt khóa phiên cho kết nối
+    AES_SEAL           bản rõ -> nonce(16) | tag(16) | bản mã   (cần handshake trước)
+    AES_OPEN           nonce | tag | bản mã -> bản rõ
+    ECDSA_SIGN         thông điệp -> chữ ký (r||s) bằng khóa máy chủ
+    ECDSA_VERIFY       u16 len | khóa công khai DER | u16 len | chữ ký | thông điệp -> b"\\x01" / b"\\x00"
+    ECDSA_PUBLIC_KEY   -> khóa công khai ECDSA của máy chủ (DER)
+    ELGAMAL_ENCRYPT    bản rõ -> bản mã lai ElGamal + AES-GCM
+    ELGAMAL_DECRYPT    bản mã lai -> bản rõ
+    STATS              -> JSON thống kê máy chủ
+
+Ví dụ:
+    python may_chu_mat_ma.py --port 9400 --workers 4
+    python may_chu_mat_ma.py --unix /tmp/mmattt.sock
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+ELGAMAL_DIR = BASE_DIR / "he_mat_ElGamal"
+for _d in (ELGAMAL_DIR, BASE_DIR):
+    if str(_d) not in sys.path:
+        sys.path.insert(0, str(_d))
+
+from Crypto.Cipher import AES
+from Crypto.PublicKey import ECC
+
+from he_mat_ECC import CURVE_NAME, tao_cap_khoa
+
+FRAME = struct.Struct(">I")
+REQUEST = struct.Struct(">IB")
+RESPONSE = struct.Struct(">IB")
+MAX_FRAME = 16 * 1024 * 1024
+
+PING = 0
+ECDH_HANDSHAKE = 1
+AES_SEAL = 2
+AES_OPEN = 3
+ECDSA_SIGN = 4
+ECDSA_VERIFY = 5
+ECDSA_PUBLIC_KEY = 6
+ELGAMAL_ENCRYPT = 7
+ELGAMAL_DECRYPT = 8
+STATS = 9
+
+OP_NAMES = {
+    PING: "ping", ECDH_HANDSHAKE: "ecdh", AES_SEAL: "seal", AES_OPEN: "open",
+    ECDSA_SIGN: "sign", ECDSA_VERIFY: "verify", ECDSA_PUBLIC_KEY: "pubkey",
+    ELGAMAL_ENCRYPT: "elgamal-encrypt", ELGAMAL_DECRYPT: "elgamal-decrypt", STATS: "stats",
+}
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+DEFAULT_PORT = 9400
+DEFAULT_MAX_INFLIGHT = 256      # số yêu cầu đang xử lý tối đa trên một kết nối
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_BATCH_DELAY = 0.002     # giây chờ gom lô kể từ yêu cầu đầu tiên
+INLINE_AES_LIMIT = 64 * 1024    # AES-GCM dữ liệu nhỏ chạy ngay trên vòng lặp sự kiện
+
+
+class LoiGiaoThuc(Exception):
+    """Khung hoặc dữ liệu yêu cầu không hợp lệ."""
+
+
+def dong_goi_khung(body: bytes) -> bytes:
+    return FRAME.pack(len(body)) + body
+
+
+async def doc_khung(reader: asyncio.StreamReader, max_frame: int = MAX_FRAME) -> bytes | None:
+    """Đọc một khung; None nếu đầu kia đóng kết nối đúng ranh giới khung."""
+    try:
+        header = await reader.readexactly(FRAME.size)
+    except asyncio.IncompleteReadError as e:
+        if e.partial:
+            raise LoiGiaoThuc("Kết nối đóng giữa chừng tiêu đề khung") from None
+        return None
+    (length,) = FRAME.unpack(header)
+    if length > max_frame:
+        raise LoiGiaoThuc(f"Khung quá lớn: {length} > {max_frame}")
+    return await reader.readexactly(length)
+
+
+def dong_goi_xac_minh(public_der: bytes, signature: bytes, message: bytes) -> bytes:
+    return struct.pack(">H", len(public_der)) + public_der + struct.pack(">H", len(signature)) + signature + message
+
+
+def tach_xac_minh(payload: bytes):
+    view = memoryview(payload)
+    try:
+        (klen,) = struct.unpack_from(">H", view, 0)
+        public_der = bytes(view[2:2 + klen])
+        (slen,) = struct.unpack_from(">H", view, 2 + klen)
+    except struct.error:
+        raise LoiGiaoThuc("Yêu cầu xác minh bị cắt cụt") from None
+    start = 4 + klen
+    if start + slen > len(view):
+        raise LoiGiaoThuc("Yêu cầu xác minh bị cắt cụt")
+    return public_der, bytes(view[start:start + slen]), bytes(view[start + slen:])
+
+
+# --- TIẾN TRÌNH CON: khóa máy chủ nạp một lần ---
+
+_worker = {}
+
+
+def _init_worker(ecc_der: bytes, elgamal_dir: str | None):
+    from thoa_thuan_khoa_ECDH import BoThoaThuanECDH
+
+    key = ECC.import_key(ecc_der)
+    _worker["ecc"] = key
+    _worker["ecdh"] = BoThoaThuanECDH(key)
+    _worker["verify_keys"] = {}
+    if elgamal_dir is not None:
+        from doc_key_ElGamal import load_elgamal_keypair
+        _worker["elgamal"] = load_elgamal_keypair(Path(elgamal_dir))
+
+
+def _w_ecdh(peer_point: bytes) -> bytes:
+    peer = ECC.import_key(peer_point, curve_name=CURVE_NAME)
+    return _worker["ecdh"].khoa_chung(peer)
+
+
+def _w_sign_batch(messages) -> list:
+    from chu_ky_lo_ECDSA import tao_chu_ky_ecdsa_lo
+    return tao_chu_ky_ecdsa_lo(_worker["ecc"], messages)
+
+
+def _w_verify_batch(public_der: bytes, messages, signatures) -> list:
+    from chu_ky_lo_ECDSA import xac_minh_chu_ky_ecdsa_lo
+
+    keys = _worker["verify_keys"]
+    key = keys.get(public_der)
+    if key is None:
+        if len(keys) >= 1024:
+            keys.clear()
+        key = keys[public_der] = ECC.import_key(public_der)
+    return xac_minh_chu_ky_ecdsa_lo(key, messages, signatures)
+
+
+def _w_elgamal(op: int, data: bytes) -> bytes:
+    from ma_hoa_luong_ElGamal import elgamal_encrypt_bytes, elgamal_decrypt_bytes
+
+    private_key, public_key = _worker["elgamal"]
+    if op == ELGAMAL_ENCRYPT:
+        return elgamal_encrypt_bytes(public_key, data)
+    if private_key is None:
+        raise ValueError("Máy chủ không có khóa bí mật ElGamal")
+    return elgamal_decrypt_bytes(private_key, data)
+
+
+# --- GOM LÔ ---
+
+class GomLo:
+    """Gom các yêu cầu cùng nhóm (ví dụ cùng khóa công khai) thành một lần gọi theo lô.
+
+    Lô được gửi khi đủ max_batch phần tử hoặc sau max_delay giây kể từ phần tử đầu.
+    run_batch(group, items) là coroutine trả về danh sách kết quả cùng thứ tự items.
+    """
+
+    def __init__(self, run_batch, max_batch: int = DEFAULT_BATCH_SIZE, max_delay: float = DEFAULT_BATCH_DELAY):
+        self.run_batch = run_batch
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending = {}  # group -> (items, futures, timer)
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, group, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        entry = self._pending.get(group)
+        if entry is None:
+            timer = loop.call_later(self.max_delay, self._flush, group)
+            entry = self._pending[group] = ([], [], timer)
+        entry[0].append(item)
+        entry[1].append(future)
+        if len(entry[0]) >= self.max_batch:
+            self._flush(group)
+        return await future
+
+    def _flush(self, group):
+        entry = self._pending.pop(group, None)
+        if entry is None:
+            return
+        items, futures, timer = entry
+        timer.cancel()
+        self.batches += 1
+        self.items += len(items)
+        asyncio.ensure_future(self._run(group, items, futures))
+
+    async def _run(self, group, items, futures):
+        try:
+            results = await self.run_batch(group, items)
+        except Exception as e:
+            for f in futures:
+                if not f.done():
+                    f.set_exception(e)
+            return
+        for f, r in zip(futures, results):
+            if not f.done():
+                f.set_result(r)
+
+    def thong_ke(self) -> dict:
+        return {"batches": self.batches, "items": self.items,
+                "mean_batch": self.items / self.batches if self.batches else 0.0}
+
+
+# --- MÁY CHỦ ---
+
+class MayChuMatMa:
+    """Máy chủ asyncio; các phép toán nặng chạy trên ProcessPoolExecutor."""
+
+    def __init__(self, ecc_key=None, elgamal_dir=ELGAMAL_DIR, workers: int | None = None,
+                 max_inflight: int = DEFAULT_MAX_INFLIGHT, batch_size: int = DEFAULT_BATCH_SIZE,
+                 batch_delay: float = DEFAULT_BATCH_DELAY, max_frame: int = MAX_FRAME):
+        self.ecc_key = ecc_key if ecc_key is not None else tao_cap_khoa()
+        self.elgamal_dir = str(elgamal_dir) if elgamal_dir is not None else None
+        self.workers = workers
+        self.max_inflight = max_inflight
+        self.max_frame = max_frame
+        self.public_point = self.ecc_key.public_key().export_key(format="SEC1", compress=True)
+        self.public_der = self.ecc_key.public_key().export_key(format="DER")
+        self.pool = None
+        self.servers = []
+        self._signer = GomLo(self._sign_batch, batch_size, batch_delay)
+        self._verifier = GomLo(self._verify_batch, batch_size, batch_delay)
+        self.counts = {name: 0 for name in OP_NAMES.values()}
+        self.errors = 0
+        self.connections = 0
+        self._conn_tasks = set()
+        self.started = time.time()
+
+    def _start_pool(self):
+        if self.pool is None:
+            ecc_der = self.ecc_key.export_key(format="DER")
+            # forkserver/spawn: tiến trình con không kế thừa socket của các kết nối đang mở
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                            initializer=_init_worker, initargs=(ecc_der, self.elgamal_dir))
+
+    async def _offload(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, fn, *args)
+
+    async def _sign_batch(self, _group, messages):
+        return await self._offload(_w_sign_batch, messages)
+
+    async def _verify_batch(self, public_der, items):
+        messages = [m for m, _ in items]
+        signatures = [s for _, s in items]
+        return await self._offload(_w_verify_batch, public_der, messages, signatures)
+
+    async def _aes(self, fn, *args):
+        if sum(len(a) for a in args if isinstance(a, (bytes, bytearray, memoryview))) <= INLINE_AES_LIMIT:
+            return fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    async def xu_ly(self, op: int, payload: bytes, session: dict) -> bytes:
+        """Thực hiện một thao tác; session là trạng thái riêng của kết nối."""
+        if op == PING:
+            return b"pong"
+        if op == ECDH_HANDSHAKE:
+            session["key"] = await self._offload(_w_ecdh, payload)
+            return self.public_point
+        if op in (AES_SEAL, AES_OPEN):
+            key = session.get("key")
+            if key is None:
+                raise LoiGiaoThuc("Cần ECDH_HANDSHAKE trước khi dùng AES-GCM")
+            return await self._aes(_aes_seal if op == AES_SEAL else _aes_open, key, payload)
+        if op == ECDSA_SIGN:
+            return await self._signer.submit(None, payload)
+        if op == ECDSA_VERIFY:
+            public_der, signature, message = tach_xac_minh(payload)
+            return b"\x01" if await self._verifier.submit(public_der, (message, signature)) else b"\x00"
+        if op == ECDSA_PUBLIC_KEY:
+            return self.public_der
+        if op in (ELGAMAL_ENCRYPT, ELGAMAL_DECRYPT):
+            if self.elgamal_dir is None:
+                raise LoiGiaoThuc("Máy chủ không bật ElGamal")
+            return await self._offload(_w_elgamal, op, payload)
+        if op == STATS:
+            return json.dumps(self.thong_ke()).encode("utf-8")
+        raise LoiGiaoThuc(f"Thao tác không hỗ trợ: {op}")
+
+    async def _handle_request(self, body: bytes, session: dict, writer, write_lock, slots):
+        if len(body) < REQUEST.size:
+            slots.release()  # không có mã yêu cầu để trả lời: bỏ qua
+            return
+        request_id, op = REQUEST.unpack_from(body)
+        try:
+            result = await self.xu_ly(op, body[REQUEST.size:], session)
+            response = RESPONSE.pack(request_id, STATUS_OK) + result
+            self.counts[OP_NAMES[op]] += 1
+        except Exception as e:
+            self.errors += 1
+            response = RESPONSE.pack(request_id, STATUS_ERROR) + f"{type(e).__name__}: {e}".encode("utf-8")
+        finally:
+            slots.release()
+        async with write_lock:
+            writer.write(dong_goi_khung(response))
+            await writer.drain()
+
+    async def _handle_connection(self, reader, writer):
+        self.connections += 1
+        self._conn_tasks.add(asyncio.current_task())
+        session = {}
+        write_lock = asyncio.Lock()
+        slots = asyncio.Semaphore(self.max_inflight)
+        tasks = set()
+        try:
+            while True:
+                # Giới hạn số yêu cầu đang xử lý: ngừng đọc khi client gửi quá nhanh
+                await slots.acquire()
+                try:
+                    body = await doc_khung(reader, self.max_frame)
+                except LoiGiaoThuc:
+                    slots.release()
+                    break
+                if body is None:
+                    slots.release()
+                    break
+                task = asyncio.ensure_future(self._handle_request(body, session, writer, write_lock, slots))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+            self._conn_tasks.discard(asyncio.current_task())
+
+    async def start(self, host: str = "127.0.0.1", port: int | None = DEFAULT_PORT, unix_path=None):
+        self._start_pool()
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(self._handle_connection, path=str(unix_path))
+        else:
+            server = await asyncio.start_server(self._handle_connection, host, port)
+        self.servers.append(server)
+        return server
+
+    async def close(self, grace: float = 1.0):
+        for server in self.servers:
+            server.close()
+            await server.wait_closed()
+        self.servers.clear()
+        # Cho các kết nối đang mở kết thúc gọn trước khi hủy
+        if self._conn_tasks:
+            _, pending = await asyncio.wait(list(self._conn_tasks), timeout=grace)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            self.pool = None
+
+    def thong_ke(self) -> dict:
+        return {"uptime_s": time.time() - self.started, "connections": self.connections,
+                "requests": self.counts, "errors": self.errors,
+                "sign_batching": self._signer.thong_ke(), "verify_batching": self._verifier.thong_ke()}
+
+
+def _aes_seal(key: bytes, data: bytes) -> bytes:
+    cipher = AES.new(key, AES.MODE_GCM)
+    ciphertext, tag = cipher.encrypt_and_digest(data)
+    return cipher.nonce + tag + ciphertext
+
+
+def _aes_open(key: bytes, blob: bytes) -> bytes:
+    if len(blob) < 32:
+        raise LoiGiaoThuc("Bản mã AES-GCM quá ngắn")
+    cipher = AES.new(key, AES.MODE_GCM, nonce=blob[:16])
+    return cipher.decrypt_and_verify(blob[32:], blob[16:32])
+
+
+# --- CLIENT (có pipelining) ---
+
+class KetNoiMatMa:
+    """Client asyncio: gửi nhiều yêu cầu cùng lúc trên một kết nối, ghép phản hồi theo mã yêu cầu."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self._next_id = 0
+        self._waiting = {}
+        self._reader_task = asyncio.ensure_future(self._read_loop())
+
+    @classmethod
+    async def mo(cls, host: str = "127.0.0.1", port: int = DEFAULT_PORT, unix_path=None):
+        if unix_path is not None:
+            reader, writer = await asyncio.open_unix_connection(str(unix_path))
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def _read_loop(self):
+        error = ConnectionError("Máy chủ đóng kết nối")
+        try:
+            while True:
+                body = await doc_khung(self.reader)
+                if body is None:
+                    break
+                request_id, status = RESPONSE.unpack_from(body)
+                future = self._waiting.pop(request_id, None)
+                if future is None or future.done():
+                    continue
+                payload = body[RESPONSE.size:]
+                if status == STATUS_OK:
+                    future.set_result(payload)
+                else:
+                    future.set_exception(RuntimeError(payload.decode("utf-8", "replace")))
+        except (LoiGiaoThuc, ConnectionError, asyncio.IncompleteReadError) as e:
+            error = e
+        finally:
+            for future in self._waiting.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._waiting.clear()
+
+    async def goi(self, op: int, payload: bytes = b"") -> bytes:
+        request_id = self._next_id
+        self._next_id = (self._next_id + 1) & 0xFFFFFFFF
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[request_id] = future
+        self.writer.write(dong_goi_khung(REQUEST.pack(request_id, op) + payload))
+        await self.writer.drain()
+        return await future
+
+    async def bat_tay_ecdh(self, client_key=None) -> bytes:
+        """ECDH với khóa máy chủ; trả về khóa phiên (cùng HKDF với máy chủ)."""
+        from thoa_thuan_khoa_ECDH import BoThoaThuanECDH
+
+        client_key = client_key if client_key is not None else tao_cap_khoa()
+        point = client_key.public_key().export_key(format="SEC1")
+        server_point = await self.goi(ECDH_HANDSHAKE, point)
+        return BoThoaThuanECDH(client_key).khoa_chung(ECC.import_key(server_point, curve_name=CURVE_NAME))
+
+    async def dong(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        self._reader_task.cancel()
+
+
+async def _serve(args):
+    ecc_key = ECC.import_key(Path(args.ecc_key).read_bytes()) if args.ecc_key else None
+    server = MayChuMatMa(ecc_key=ecc_key, elgamal_dir=None if args.no_elgamal else args.elgamal_dir,
+                         workers=args.workers, max_inflight=args.max_inflight,
+                         batch_size=args.batch_size, batch_delay=args.batch_delay / 1000)
+    await server.start(args.host, args.port, args.unix)
+    where = args.unix if args.unix else f"{args.host}:{args.port}"
+    print(f"Máy chủ mật mã lắng nghe tại {where} (pid {os.getpid()})", file=sys.stderr)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+    try:
+        await stop.wait()
+    finally:
+        await server.close()
+        if args.unix:
+            Path(args.unix).unlink(missing_ok=True)
+        print(json.dumps(server.thong_ke(), ensure_ascii=False), file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Máy chủ mật mã asyncio (ECDH, AES-GCM, ECDSA, ElGamal).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="Đường dẫn Unix socket (thay cho TCP)")
+    parser.add_argument("--workers", type=int, default=None, help="Số tiến trình tính toán (mặc định: số lõi CPU)")
+    parser.add_argument("--ecc-key", help="File PEM/DER khóa bí mật ECC của máy chủ (mặc định: sinh mới)")
+    parser.add_argument("--elgamal-dir", default=str(ELGAMAL_DIR), help="Thư mục khóa ElGamal")
+    parser.add_argument("--no-elgamal", action="store_true", help="Tắt các thao tác ElGamal")
+    parser.add_argument("--max-inflight", type=int, default=DEFAULT_MAX_INFLIGHT,
+                        help="Số yêu cầu đang xử lý tối đa trên một kết nối")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Kích thước lô ký/xác minh tối đa")
+    parser.add_argument("--batch-delay", type=float, default=DEFAULT_BATCH_DELAY * 1000,
+                        help="Thời gian chờ gom lô (ms)")
+    args = parser.parse_args(argv)
+    asyncio.run(_serve(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+"""
+Phong bì nhiều người nhận: mã hóa dữ liệu một lần bằng khóa nội dung ngẫu nhiên,
+rồi bọc khóa đó cho từng người nhận bằng ECDH (P-256/384/521, X25519, X448),
+RSA-OAEP hoặc ElGamal.
+
+Định dạng:
+    MAGIC | table_size (u32, lũy thừa của 2) | wraps_length (u32)
+    bảng  : table_size mục 25 byte = id (16) | loại (u8) | offset (u32) | length (u32)
+    wraps : các khóa đã bọc nối liền nhau (offset tính từ đầu phần wraps)
+    luồng ma_hoa_luong_AES của dữ liệu (khóa = khóa nội dung)
+
+id = SHA-256(khóa công khai)[:16]. Bảng là bảng băm địa chỉ mở (dò tuyến tính,
+hệ số tải <= 0.5) với vị trí bắt đầu lấy từ 8 byte đầu của id, nên người nhận
+tìm ra mục của mình sau O(1) lần đọc; mục trống toàn byte 0. Khi nguồn cho phép
+seek, giải mã chỉ đọc mục bảng đã dò, khóa bọc của chính người nhận và dữ liệu.
+
+Khóa bọc theo loại:
+    ECDH    : độ dài điểm (u8) | điểm tạm (SEC1 nén / u của X25519, X448) | nonce (12)
+              | AES-GCM(KEK, khóa nội dung) | tag (16)
+              KEK = HKDF-SHA256(ECDH(khóa tạm, người nhận), salt = id | loại, info "mre-ecdh"),
+              độ dài theo đường cong; một khóa tạm cho mỗi đường cong trong phong bì
+    RSA     : RSA-OAEP(SHA-256, label=MAGIC)(khóa nội dung)
+    ElGamal : width (u16) | c1 | c2 | nonce (12) | AES-GCM(KEK, khóa nội dung) | tag (16)
+              KEK = HKDF-SHA256(m) với (c1, c2) = ElGamal(m), m ngẫu nhiên
+Mọi AES-GCM bọc khóa dùng id | loại làm associated data.
+"""
+import hashlib
+import io
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+for _d in (BASE_DIR / "he_mat_ElGamal", BASE_DIR):
+    if str(_d) not in sys.path:
+        sys.path.insert(0, str(_d))
+
+from Crypto.Cipher import AES, PKCS1_OAEP
+from Crypto.Hash import SHA256
+from Crypto.Protocol.KDF import HKDF
+from Crypto.PublicKey import ECC, ElGamal, RSA
+from Crypto.Random import get_random_bytes
+from Crypto.Random import random as crypto_random
+
+from he_mat_ECC import giai_ma_diem_cong_khai, ma_hoa_diem_cong_khai, tao_cap_khoa, ten_duong_cong
+from ma_hoa_luong_AES import DEFAULT_CHUNK_SIZE, doc_vao_day_du, giai_ma_luong_iter, ma_hoa_luong_iter
+
+MAGIC = b"MRE2"
+CONTENT_KEY_LENGTH = 32
+ID_LENGTH = 16
+NONCE_LENGTH = 12
+TAG_LENGTH = 16
+KIND_ECDH = 1
+KIND_RSA = 2
+KIND_ELGAMAL = 3
+
+_PREFIX = struct.Struct(">4sII")
+_ENTRY = struct.Struct(f">{ID_LENGTH}sBII")
+_EMPTY = bytes(_ENTRY.size)
+# Dưới ngưỡng này bọc khóa tuần tự: khởi động nhóm tiến trình đắt hơn phần tính toán
+PARALLEL_THRESHOLD = 32
+
+
+# --- NHẬN DIỆN NGƯỜI NHẬN ---
+
+def _loai_khoa(key) -> int:
+    if isinstance(key, ECC.EccKey):
+        return KIND_ECDH
+    if isinstance(key, RSA.RsaKey):
+        return KIND_RSA
+    if all(hasattr(key, a) for a in ("p", "g", "y")):
+        return KIND_ELGAMAL
+    raise TypeError(f"Không hỗ trợ loại khóa người nhận: {type(key).__name__}")
+
+
+def _ma_hoa_khoa_cong_khai(key, kind: int) -> bytes:
+    """Biểu diễn chuẩn của phần công khai, dùng để tính id và gửi sang tiến trình con."""
+    if kind == KIND_ECDH:
+        return key.public_key().export_key(format="DER")
+    if kind == KIND_RSA:
+        return key.publickey().export_key(format="DER")
+    p, g, y = int(key.p), int(key.g), int(key.y)
+    width = (p.bit_length() + 7) // 8
+    return struct.pack(">H", width) + b"".join(v.to_bytes(width, "big") for v in (p, g, y))
+
+
+def ma_nguoi_nhan(key) -> bytes:
+    """id 16 byte của người nhận (tính từ phần công khai của khóa)."""
+    kind = _loai_khoa(key)
+    return _id_tu_ma_hoa(kind, _ma_hoa_khoa_cong_khai(key, kind))
+
+
+def _id_tu_ma_hoa(kind: int, encoded: bytes) -> bytes:
+    return hashlib.sha256(bytes([kind]) + encoded).digest()[:ID_LENGTH]
+
+
+def _elgamal_tu_ma_hoa(encoded: bytes):
+    (width,) = struct.unpack_from(">H", encoded)
+    p, g, y = (int.from_bytes(encoded[2 + i * width:2 + (i + 1) * width], "big") for i in range(3))
+    return ElGamal.construct((p, g, y))
+
+
+def _gcm_boc(kek: bytes, content_key: bytes, aad: bytes) -> bytes:
+    nonce = get_random_bytes(NONCE_LENGTH)
+    cipher = AES.new(kek, AES.MODE_GCM, nonce=nonce)
+    cipher.update(aad)
+    ct, tag = cipher.encrypt_and_digest(content_key)
+    return nonce + ct + tag
+
+
+def _gcm_mo(kek: bytes, blob: bytes, aad: bytes) -> bytes:
+    nonce, ct, tag = blob[:NONCE_LENGTH], blob[NONCE_LENGTH:-TAG_LENGTH], blob[-TAG_LENGTH:]
+    cipher = AES.new(kek, AES.MODE_GCM, nonce=nonce)
+    cipher.update(aad)
+    return cipher.decrypt_and_verify(ct, tag)
+
+
+def _elgamal_kek(m: int, width: int, aad: bytes) -> bytes:
+    return HKDF(m.to_bytes(width, "big"), CONTENT_KEY_LENGTH, aad, SHA256, context=b"mre-elgamal")
+
+
+def _ecdh_kek(private_key, public_key, aad: bytes) -> bytes:
+    from thoa_thuan_khoa_ECDH import khoa_chung_hkdf
+
+    return khoa_chung_hkdf(private_key, public_key, info=b"mre-ecdh", salt=aad)
+
+
+# --- BỌC KHÓA (chạy được trong tiến trình con: chỉ nhận bytes) ---
+
+def _boc_mot(job):
+    kind, encoded, content_key, ephemeral_der = job
+    rid = _id_tu_ma_hoa(kind, encoded)
+    aad = rid + bytes([kind])
+    if kind == KIND_ECDH:
+        ephemeral = ECC.import_key(ephemeral_der)
+        kek = _ecdh_kek(ephemeral, ECC.import_key(encoded), aad)
+        point = ma_hoa_diem_cong_khai(ephemeral)
+        return rid, kind, bytes([len(point)]) + point + _gcm_boc(kek, content_key, aad)
+    if kind == KIND_RSA:
+        oaep = PKCS1_OAEP.new(RSA.import_key(encoded), hashAlgo=SHA256, label=MAGIC)
+        return rid, kind, oaep.encrypt(content_key)
+
+    from he_mat_ElGamal import elgamal_encrypt
+
+    pub = _elgamal_tu_ma_hoa(encoded)
+    p = int(pub.p)
+    width = (p.bit_length() + 7) // 8
+    m = crypto_random.randint(2, p - 2)
+    c1, c2 = elgamal_encrypt(pub, m, crypto_random.randint(1, p - 2))
+    blob = struct.pack(">H", width) + int(c1).to_bytes(width, "big") + int(c2).to_bytes(width, "big")
+    return rid, kind, blob + _gcm_boc(_elgamal_kek(m, width, aad), content_key, aad)
+
+
+def _boc_lo(jobs):
+    return [_boc_mot(job) for job in jobs]
+
+
+def _boc_tat_ca(recipients, content_key: bytes, workers: int | None):
+    ephemerals = {}  # đường cong -> DER của khóa tạm, một khóa tạm cho mỗi đường cong
+    jobs = []
+    for key in recipients:
+        kind = _loai_khoa(key)
+        ephemeral_der = None
+        if kind == KIND_ECDH:
+            curve = ten_duong_cong(key)
+            ephemeral_der = ephemerals.get(curve)
+            if ephemeral_der is None:
+                ephemeral_der = ephemerals[curve] = tao_cap_khoa(curve).export_key(format="DER")
+        jobs.append((kind, _ma_hoa_khoa_cong_khai(key, kind), content_key, ephemeral_der))
+
+    if workers == 1 or len(jobs) < PARALLEL_THRESHOLD:
+        return _boc_lo(jobs)
+    workers = workers or os.cpu_count() or 1
+    size = max(1, -(-len(jobs) // (workers * 4)))
+    chunks = [jobs[i:i + size] for i in range(0, len(jobs), size)]
+    wrapped = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(_boc_lo, chunks):
+            wrapped.extend(part)
+    return wrapped
+
+
+# --- BẢNG NGƯỜI NHẬN ---
+
+def _kich_thuoc_bang(n: int) -> int:
+    size = 1
+    while size < 2 * n:
+        size <<= 1
+    return size
+
+
+def _vi_tri(rid: bytes, table_size: int) -> int:
+    return int.from_bytes(rid[:8], "big") & (table_size - 1)
+
+
+def _dung_header(wrapped) -> bytes:
+    table_size = _kich_thuoc_bang(len(wrapped))
+    table = [None] * table_size
+    wraps = bytearray()
+    for rid, kind, blob in wrapped:
+        i = _vi_tri(rid, table_size)
+        while table[i] is not None:
+            if table[i][0] == rid:
+                raise ValueError("Người nhận bị trùng")
+            i = (i + 1) & (table_size - 1)
+        table[i] = (rid, kind, len(wraps), len(blob))
+        wraps += blob
+    parts = [_PREFIX.pack(MAGIC, table_size, len(wraps))]
+    parts += [_ENTRY.pack(*e) if e is not None else _EMPTY for e in table]
+    parts.append(bytes(wraps))
+    return b"".join(parts)
+
+
+class _NguonDoc:
+    """Đọc header từ src: dùng seek khi có thể, nếu không thì đọc tuần tự và bỏ qua."""
+
+    def __init__(self, src):
+        self.src = src
+        try:
+            self.base = src.tell()
+            src.seek(self.base)
+            self.seekable = True
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            self.seekable = False
+        self.pos = 0
+
+    def read_at(self, offset: int, size: int) -> bytes:
+        if self.seekable:
+            self.src.seek(self.base + offset)
+        else:
+            if offset < self.pos:
+                raise ValueError("Nguồn không seek được: không thể đọc lùi")
+            self.skip_to(offset)
+        # Đọc từng phần tối đa 1 MiB: kích thước lấy từ header chưa được tin cậy,
+        # bộ nhớ chỉ tăng theo số byte thực sự đọc được
+        buf = bytearray()
+        while len(buf) < size:
+            piece = bytearray(min(size - len(buf), 1 << 20))
+            n = doc_vao_day_du(self.src, memoryview(piece))
+            buf += memoryview(piece)[:n]
+            if n < len(piece):
+                raise ValueError("Phong bì bị cắt cụt")
+        self.pos = offset + size
+        return bytes(buf)
+
+    def skip_to(self, offset: int):
+        if self.seekable:
+            self.src.seek(self.base + offset)
+        else:
+            while self.pos < offset:
+                # read() của pipe / socket có thể trả về ít hơn step byte
+                data = self.src.read(min(offset - self.pos, 1 << 16))
+                if not data:
+                    raise ValueError("Phong bì bị cắt cụt")
+                self.pos += len(data)
+        self.pos = offset
+
+
+def _tim_muc(reader: _NguonDoc, rid: bytes):
+    """Trả về (kind, blob) của người nhận và vị trí bắt đầu luồng dữ liệu."""
+    magic, table_size, wraps_length = _PREFIX.unpack(reader.read_at(0, _PREFIX.size))
+    if magic != MAGIC:
+        raise ValueError("Sai định dạng phong bì (magic không khớp)")
+    if table_size == 0 or table_size & (table_size - 1):
+        raise ValueError("Kích thước bảng người nhận không hợp lệ")
+    wraps_start = _PREFIX.size + table_size * _ENTRY.size
+    if reader.seekable:
+        def entry_at(i):
+            return reader.read_at(_PREFIX.size + i * _ENTRY.size, _ENTRY.size)
+    else:
+        # Không seek được: dò tuyến tính có thể quay vòng về ô 0, nên đọc cả bảng một lần
+        table = reader.read_at(_PREFIX.size, table_size * _ENTRY.size)
+
+        def entry_at(i):
+            return table[i * _ENTRY.size:(i + 1) * _ENTRY.size]
+    i = _vi_tri(rid, table_size)
+    for _ in range(table_size):
+        entry = entry_at(i)
+        if entry == _EMPTY:
+            break
+        entry_id, kind, offset, length = _ENTRY.unpack(entry)
+        if entry_id == rid:
+            if offset + length > wraps_length:
+                raise ValueError("Mục người nhận trỏ ra ngoài phần khóa bọc")
+            blob = reader.read_at(wraps_start + offset, length)
+            return kind, blob, wraps_start + wraps_length
+        i = (i + 1) & (table_size - 1)
+    raise KeyError("Khóa này không có trong danh sách người nhận")
+
+
+def _mo_khoa_noi_dung(private_key, rid: bytes, kind: int, blob: bytes) -> bytes:
+    aad = rid + bytes([kind])
+    try:
+        if kind == KIND_ECDH:
+            plen = blob[0]
+            point = giai_ma_diem_cong_khai(blob[1:1 + plen], private_key.curve)
+            return _gcm_mo(_ecdh_kek(private_key, point, aad), blob[1 + plen:], aad)
+        if kind == KIND_RSA:
+            return PKCS1_OAEP.new(private_key, hashAlgo=SHA256, label=MAGIC).decrypt(blob)
+        if kind == KIND_ELGAMAL:
+            from he_mat_ElGamal import elgamal_decrypt
+
+            (width,) = struct.unpack_from(">H", blob)
+            c1 = int.from_bytes(blob[2:2 + width], "big")
+            c2 = int.from_bytes(blob[2 + width:2 + 2 * width], "big")
+            m = elgamal_decrypt(private_key, c1, c2)
+            return _gcm_mo(_elgamal_kek(m, width, aad), blob[2 + 2 * width:], aad)
+    except (ValueError, TypeError, IndexError, struct.error):
+        raise ValueError("Không mở được khóa nội dung (sai khóa hoặc mục người nhận bị sửa)") from None
+    raise ValueError(f"Loại bọc khóa không hỗ trợ: {kind}")
+
+
+# --- API ---
+
+def tao_phong_bi(recipients, src, dst, chunk_size: int = DEFAULT_CHUNK_SIZE, workers: int | None = None) -> int:
+    """Mã hóa src một lần cho mọi người nhận, ghi phong bì vào dst. Trả về số byte đã ghi.
+
+    recipients: khóa công khai ECC (P-256), RSA hoặc ElGamal, có thể trộn lẫn.
+    workers: số tiến trình bọc khóa (1 = tuần tự; mặc định song song khi nhiều người nhận).
+    """
+    recipients = list(recipients)
+    if not recipients:
+        raise ValueError("Cần ít nhất một người nhận")
+    content_key = get_random_bytes(CONTENT_KEY_LENGTH)
+    header = _dung_header(_boc_tat_ca(recipients, content_key, workers))
+    dst.write(header)
+    written = len(header)
+    for piece in ma_hoa_luong_iter(content_key, src, chunk_size):
+        dst.write(piece)
+        written += len(piece)
+    return written
+
+
+def mo_phong_bi(private_key, src, dst) -> int:
+    """Giải mã phong bì bằng khóa bí mật của một người nhận. Trả về số byte bản rõ."""
+    kind = _loai_khoa(private_key)
+    rid = _id_tu_ma_hoa(kind, _ma_hoa_khoa_cong_khai(private_key, kind))
+    reader = _NguonDoc(src)
+    entry_kind, blob, payload_start = _tim_muc(reader, rid)
+    if entry_kind != kind:
+        raise ValueError("Loại khóa không khớp với mục người nhận")
+    content_key = _mo_khoa_noi_dung(private_key, rid, kind, blob)
+    reader.skip_to(payload_start)
+    written = 0
+    for piece in giai_ma_luong_iter(content_key, src):
+        dst.write(piece)
+        written += len(piece)
+    return written
+
+
+def tao_phong_bi_bytes(recipients, data: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                       workers: int | None = None) -> bytes:
+    out = io.BytesIO()
+    tao_phong_bi(recipients, io.BytesIO(data), out, chunk_size, workers)
+    return out.getvalue()
+
+
+def mo_phong_bi_bytes(private_key, blob: bytes) -> bytes:
+    out = io.BytesIO()
+    mo_phong_bi(private_key, io.BytesIO(blob), out)
+    return out.getvalue()
+
+
+# --- ĐO HIỆU NĂNG ---
+
+def do_hieu_nang(so_nguoi_nhan: int = 100, size: int = 8 * 1024 * 1024):
+    """So sánh N lần mã hóa ECDH + AES riêng lẻ với một phong bì N người nhận."""
+    from ma_hoa_luong_AES import ma_hoa_bytes
+    from thoa_thuan_khoa_ECDH import khoa_chung_hkdf
+
+    keys = [tao_cap_khoa() for _ in range(so_nguoi_nhan)]
+    publics = [k.public_key() for k in keys]
+    data = get_random_bytes(size)
+    sender = tao_cap_khoa()
+
+    t0 = time.perf_counter()
+    for pub in publics:
+        ma_hoa_bytes(khoa_chung_hkdf(sender, pub), data)
+    t_separate = time.perf_counter() - t0
+
+    results = {}
+    for workers in (1, None):
+        t0 = time.perf_counter()
+        blob = tao_phong_bi_bytes(publics, data, workers=workers)
+        results[workers] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    ok = mo_phong_bi_bytes(keys[-1], blob) == data
+    t_open = time.perf_counter() - t0
+    print(f"{so_nguoi_nhan} người nhận, {size / 1e6:.1f} MB")
+    print(f"  mã hóa riêng cho từng người nhận: {t_separate:8.2f} s, {so_nguoi_nhan * size / 1e6:.0f} MB bản mã")
+    print(f"  phong bì, bọc khóa tuần tự:        {results[1]:8.2f} s, {len(blob) / 1e6:.1f} MB bản mã")
+    print(f"  phong bì, bọc khóa song song:      {results[None]:8.2f} s")
+    print(f"  một người nhận mở phong bì:        {t_open:8.2f} s (khớp: {ok})")
+
+
+if __name__ == "__main__":
+    do_hieu_nang()
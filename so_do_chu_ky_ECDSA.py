@@ -1,6 +1,6 @@
 from Crypto.PublicKey import ECC
-from Crypto.Hash import SHA256
-from Crypto.Signature import DSS
+from Crypto.Hash import SHA256, SHA384, SHA512
+from Crypto.Signature import DSS, eddsa
 from Crypto import Random
 from binascii import hexlify
 
@@ -10,24 +10,71 @@ from binascii import hexlify
 CURVE_NAME = 'P-256' 
 HASH_ALGORITHM = SHA256
 
+# ECDSA trên các đường cong NIST (hàm băm cùng độ mạnh với đường cong) và
+# EdDSA thuần (RFC 8032, tự băm thông điệp bên trong) trên Ed25519 / Ed448
+HASH_THEO_DUONG_CONG = {'P-256': SHA256, 'P-384': SHA384, 'P-521': SHA512}
+DUONG_CONG_EDDSA = ('Ed25519', 'Ed448')
+DUONG_CONG_CHU_KY = tuple(HASH_THEO_DUONG_CONG) + DUONG_CONG_EDDSA
+
+# Bộ chuẩn hóa tên đường cong dùng chung cho chữ ký và ECDH (he_mat_ECC import
+# từ đây, để `mat_ma verify` không phải nạp he_mat_ECC). Khóa tra: tên viết
+# thường, bỏ '-', '_', khoảng trắng và tiền tố 'nist'.
+_BIET_DANH = {ten.lower().replace('-', ''): ten
+              for ten in DUONG_CONG_CHU_KY + ('Curve25519', 'Curve448')}
+_BIET_DANH.update({'x25519': 'Curve25519', 'x448': 'Curve448', 'secp256r1': 'P-256',
+                   'prime256v1': 'P-256', 'secp384r1': 'P-384', 'secp521r1': 'P-521'})
+
+
+def chuan_hoa_duong_cong(curve):
+    """Tên đường cong theo PyCryptodome ('x25519' -> 'Curve25519', 'NIST P-384' -> 'P-384', ...)."""
+    khoa = curve.lower().replace('-', '').replace('_', '').replace(' ', '')
+    return _BIET_DANH.get(khoa.removeprefix('nist'), curve)
+
+
+def _ten_duong_cong(key, curve=None):
+    ten = chuan_hoa_duong_cong(key.curve)
+    if curve is not None and chuan_hoa_duong_cong(curve) != ten:
+        raise ValueError(f"Khóa thuộc đường cong {ten}, không phải {curve}")
+    return ten
+
+
+def hash_cua_khoa(key):
+    """Hàm băm ECDSA theo đường cong của khóa (SHA256 / SHA384 / SHA512); lỗi với khóa EdDSA."""
+    ten = _ten_duong_cong(key)
+    if ten not in HASH_THEO_DUONG_CONG:
+        raise ValueError(f"Khóa {ten} dùng EdDSA, không phải ECDSA với DSS")
+    return HASH_THEO_DUONG_CONG[ten]
+
+
+def _ma_hoa_thong_diep(thong_diep):
+    return thong_diep.encode('utf-8') if isinstance(thong_diep, str) else thong_diep
+
 # --- 1. TẠO KHÓA ECDSA ---
 
-def tao_cap_khoa_ecdsa():
-    """Tạo khóa bí mật và khóa công khai cho ECDSA."""
+def tao_cap_khoa_ecdsa(curve=CURVE_NAME):
+    """Tạo khóa bí mật và khóa công khai cho ECDSA (P-256/384/521) hoặc EdDSA (Ed25519/Ed448)."""
+    curve = chuan_hoa_duong_cong(curve)
+    if curve not in DUONG_CONG_CHU_KY:
+        raise ValueError(f"Đường cong không hỗ trợ cho chữ ký: {curve} (chọn trong {DUONG_CONG_CHU_KY})")
     # Khóa ECC được tạo ra tự động chứa d (bí mật) và điểm công khai Q
-    private_key = ECC.generate(curve=CURVE_NAME)
+    private_key = ECC.generate(curve=curve)
     public_key = private_key.public_key()
     return private_key, public_key
 
 # --- 2. TẠO CHỮ KÝ (Signing) ---
 
-def tao_chu_ky_ecdsa(private_key, thong_diep):
+def tao_chu_ky_ecdsa(private_key, thong_diep, curve=None):
     """
-    Tạo chữ ký số (r, s) cho thông điệp.
-    Sử dụng thuật toán DSS với SHA256.
+    Tạo chữ ký số (r, s) cho thông điệp (str hoặc bytes).
+    Sử dụng thuật toán DSS với hàm băm theo đường cong của khóa,
+    hoặc EdDSA (rfc8032) nếu khóa thuộc Ed25519 / Ed448.
     """
+    ten = _ten_duong_cong(private_key, curve)
+    if ten in DUONG_CONG_EDDSA:
+        return eddsa.new(private_key, 'rfc8032').sign(_ma_hoa_thong_diep(thong_diep))
+
     # 1. Băm thông điệp
-    h = HASH_ALGORITHM.new(thong_diep.encode('utf-8'))
+    h = HASH_THEO_DUONG_CONG[ten].new(_ma_hoa_thong_diep(thong_diep))
     
     # 2. Tạo đối tượng ký DSS
     signer = DSS.new(private_key, 'fips-186-3')
@@ -40,20 +87,25 @@ def tao_chu_ky_ecdsa(private_key, thong_diep):
 
 # --- 3. XÁC MINH CHỮ KÝ (Verification) ---
 
-def xac_minh_chu_ky_ecdsa(public_key, thong_diep, signature):
+def xac_minh_chu_ky_ecdsa(public_key, thong_diep, signature, curve=None):
     """
     Xác minh chữ ký số (r, s) của thông điệp bằng khóa công khai.
     """
-    # 1. Băm thông điệp
-    h = HASH_ALGORITHM.new(thong_diep.encode('utf-8'))
-    
-    # 2. Tạo đối tượng xác minh DSS
-    verifier = DSS.new(public_key, 'fips-186-3')
+    ten = _ten_duong_cong(public_key, curve)
+    data = _ma_hoa_thong_diep(thong_diep)
+    if ten in DUONG_CONG_EDDSA:
+        verifier = eddsa.new(public_key, 'rfc8032')
+    else:
+        # 1. Băm thông điệp
+        data = HASH_THEO_DUONG_CONG[ten].new(data)
+
+        # 2. Tạo đối tượng xác minh DSS
+        verifier = DSS.new(public_key, 'fips-186-3')
     
     # 3. Xác minh chữ ký
     try:
         # Nếu xác minh thành công, không có exception nào được ném ra
-        verifier.verify(h, signature)
+        verifier.verify(data, signature)
         return True
     except ValueError:
         # Nếu xác minh thất bại (chữ ký sai hoặc thông điệp bị thay đổi)
@@ -0,0 +1,156 @@
+"""
+Bộ tạo tải cho may_chu_mat_ma: mở nhiều kết nối, mỗi kết nối giữ nhiều yêu cầu
+đang chờ (pipelining), rồi báo thông lượng và độ trễ p50/p90/p99/max.
+
+Ví dụ:
+    python tai_thu_may_chu.py verify --connections 8 --concurrency 32 --duration 10
+    python tai_thu_may_chu.py seal --size 4096 --requests 20000
+    python tai_thu_may_chu.py sign --unix /tmp/mmattt.sock
+    python tai_thu_may_chu.py verify --spawn-server --workers 4   # tự chạy máy chủ cục bộ
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+from may_chu_mat_ma import (AES_OPEN, AES_SEAL, DEFAULT_PORT, ECDH_HANDSHAKE, ECDSA_SIGN, ECDSA_VERIFY,
+                            ELGAMAL_DECRYPT, ELGAMAL_ENCRYPT, PING, STATS, KetNoiMatMa, MayChuMatMa,
+                            _aes_seal, dong_goi_xac_minh)
+from he_mat_ECC import tao_cap_khoa
+
+OPS = ("ping", "ecdh", "seal", "open", "sign", "verify", "elgamal-encrypt", "elgamal-decrypt")
+
+
+async def _chuan_bi(conn: KetNoiMatMa, op: str, size: int, variety: int):
+    """Tạo sẵn danh sách (mã thao tác, dữ liệu) để vòng đo chỉ còn gửi/nhận."""
+    messages = [os.urandom(size) for _ in range(variety)]
+    if op == "ping":
+        return [(PING, b"")]
+    if op == "ecdh":
+        return [(ECDH_HANDSHAKE, tao_cap_khoa().public_key().export_key(format="SEC1")) for _ in range(variety)]
+    if op in ("seal", "open"):
+        key = await conn.bat_tay_ecdh()
+        if op == "seal":
+            return [(AES_SEAL, m) for m in messages]
+        return [(AES_OPEN, _aes_seal(key, m)) for m in messages]
+    if op == "sign":
+        return [(ECDSA_SIGN, m) for m in messages]
+    if op == "verify":
+        from chu_ky_lo_ECDSA import tao_chu_ky_ecdsa_lo
+
+        key = tao_cap_khoa()
+        public_der = key.public_key().export_key(format="DER")
+        signatures = tao_chu_ky_ecdsa_lo(key, messages)
+        return [(ECDSA_VERIFY, dong_goi_xac_minh(public_der, s, m)) for m, s in zip(messages, signatures)]
+    if op == "elgamal-encrypt":
+        return [(ELGAMAL_ENCRYPT, m) for m in messages]
+    blobs = await asyncio.gather(*(conn.goi(ELGAMAL_ENCRYPT, m) for m in messages))
+    return [(ELGAMAL_DECRYPT, b) for b in blobs]
+
+
+async def _chay_ket_noi(conn, requests, concurrency, deadline, budget, latencies, errors):
+    index = 0
+
+    async def one_slot():
+        nonlocal index
+        while time.perf_counter() < deadline and budget[0] > 0:
+            budget[0] -= 1
+            op, payload = requests[index % len(requests)]
+            index += 1
+            t0 = time.perf_counter()
+            try:
+                await conn.goi(op, payload)
+                latencies.append(time.perf_counter() - t0)
+            except RuntimeError:
+                errors[0] += 1
+
+    await asyncio.gather(*(one_slot() for _ in range(concurrency)))
+
+
+async def tao_tai(op: str, host: str = "127.0.0.1", port: int = DEFAULT_PORT, unix_path=None,
+                  connections: int = 4, concurrency: int = 16, duration: float = 5.0,
+                  requests: int | None = None, size: int = 256, variety: int = 64) -> dict:
+    """Chạy tải và trả về thống kê (ops/s, độ trễ theo ms, số lỗi, thống kê máy chủ)."""
+    conns = [await KetNoiMatMa.mo(host, port, unix_path) for _ in range(connections)]
+    try:
+        plans = [await _chuan_bi(c, op, size, variety) for c in conns]
+        latencies = []
+        errors = [0]
+        budget = [requests if requests is not None else float("inf")]
+        start = time.perf_counter()
+        deadline = start + (duration if requests is None else float("inf"))
+        await asyncio.gather(*(_chay_ket_noi(c, plan, concurrency, deadline, budget, latencies, errors)
+                               for c, plan in zip(conns, plans)))
+        wall = time.perf_counter() - start
+        server_stats = json.loads(await conns[0].goi(STATS))
+    finally:
+        for c in conns:
+            await c.dong()
+
+    report = {"op": op, "connections": connections, "concurrency": concurrency, "size": size,
+              "requests": len(latencies), "errors": errors[0], "wall_s": wall,
+              "ops_per_sec": len(latencies) / wall if wall else 0.0, "server": server_stats}
+    if len(latencies) >= 2:
+        q = statistics.quantiles(latencies, n=100, method="inclusive")
+        report.update(p50_ms=q[49] * 1e3, p90_ms=q[89] * 1e3, p99_ms=q[98] * 1e3,
+                      max_ms=max(latencies) * 1e3, mean_ms=statistics.fmean(latencies) * 1e3)
+    return report
+
+
+def in_bao_cao(report: dict):
+    print(f"{report['op']}: {report['requests']} yêu cầu, {report['errors']} lỗi trong {report['wall_s']:.2f}s "
+          f"({report['connections']} kết nối x {report['concurrency']} đang chờ, {report['size']} bytes)")
+    print(f"  thông lượng: {report['ops_per_sec']:.1f} yêu cầu/s")
+    if "p50_ms" in report:
+        print(f"  độ trễ ms: p50 {report['p50_ms']:.2f}  p90 {report['p90_ms']:.2f}  "
+              f"p99 {report['p99_ms']:.2f}  max {report['max_ms']:.2f}")
+    server = report["server"]
+    for name in ("sign_batching", "verify_batching"):
+        if server[name]["batches"]:
+            print(f"  {name}: {server[name]['batches']} lô, trung bình {server[name]['mean_batch']:.1f} yêu cầu/lô")
+
+
+async def _main(args):
+    server = None
+    if args.spawn_server:
+        server = MayChuMatMa(workers=args.workers)
+        await server.start(args.host, 0 if args.unix is None else None, args.unix)
+        if args.unix is None:
+            args.port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        report = await tao_tai(args.op, args.host, args.port, args.unix, args.connections, args.concurrency,
+                               args.duration, args.requests, args.size, args.variety)
+    finally:
+        if server is not None:
+            await server.close()
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        in_bao_cao(report)
+    return 1 if report["errors"] else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tạo tải cho máy chủ mật mã và đo độ trễ.")
+    parser.add_argument("op", choices=OPS)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="Unix socket của máy chủ")
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=16, help="Số yêu cầu đang chờ trên mỗi kết nối")
+    parser.add_argument("--duration", type=float, default=5.0, help="Thời gian chạy (s)")
+    parser.add_argument("--requests", type=int, help="Dừng sau chừng này yêu cầu (thay cho --duration)")
+    parser.add_argument("--size", type=int, default=256, help="Kích thước thông điệp (bytes)")
+    parser.add_argument("--variety", type=int, default=64, help="Số thông điệp khác nhau mỗi kết nối")
+    parser.add_argument("--spawn-server", action="store_true", help="Chạy máy chủ ngay trong tiến trình này")
+    parser.add_argument("--workers", type=int, default=None, help="Số tiến trình của máy chủ tự chạy")
+    parser.add_argument("--json", action="store_true", help="In báo cáo dạng JSON")
+    args = parser.parse_args(argv)
+    return asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
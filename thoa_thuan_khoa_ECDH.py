@@ -0,0 +1,158 @@
+import threading
+import time
+from collections import OrderedDict
+
+from Crypto.Hash import SHA256
+from Crypto.Protocol.KDF import HKDF
+from Crypto.PublicKey import ECC
+
+from he_mat_ECC import (CURVE_NAME, bi_mat_chung_ecdh, do_dai_khoa, la_montgomery, tao_cap_khoa,
+                        tinh_khoa_chung_ecdh)
+
+# --- THỎA THUẬN KHÓA ECDH THEO LÔ ---
+#
+# Một máy chủ dùng một khóa bí mật d_A với hàng nghìn khóa công khai P_B.
+# Khóa phiên K = HKDF-SHA256(x(d_A * P_B)) được lưu trong bộ nhớ đệm LRU có
+# giới hạn, khóa theo điểm P_B đã mã hóa, nên một client quay lại không cần
+# nhân vô hướng lần nữa. Tọa độ x được mã hóa với độ dài cố định của đường cong
+# (không bỏ các byte 0 ở đầu) trước khi đưa vào HKDF. Với X25519 / X448 giá trị
+# chung là tọa độ u theo RFC 7748 (key_agreement). Độ dài khóa mặc định theo
+# đường cong của khóa (do_dai_khoa: 16 byte cho P-256 / X25519, 32 byte cho
+# P-384 / P-521 / X448).
+
+HKDF_INFO = b"ECDH AES-GCM session key"
+DEFAULT_CACHE_SIZE = 4096
+
+
+def dan_xuat_khoa_hkdf(shared_point, key_length: int | None = None, info: bytes = HKDF_INFO,
+                       salt: bytes | None = None) -> bytes:
+    """Dẫn xuất khóa đối xứng từ điểm chung S (P-256/384/521) bằng HKDF-SHA256 trên tọa độ x của S."""
+    if key_length is None:
+        key_length = do_dai_khoa(shared_point.curve)
+    x_coord = shared_point.x.to_bytes(shared_point.size_in_bytes())
+    return HKDF(x_coord, key_length, salt, SHA256, context=info)
+
+
+def khoa_chung_hkdf(private_key, public_key, key_length: int | None = None, info: bytes = HKDF_INFO,
+                    salt: bytes | None = None) -> bytes:
+    """Khóa HKDF-SHA256 từ một cặp khóa ECDH trên mọi đường cong, kể cả X25519 / X448."""
+    if key_length is None:
+        key_length = do_dai_khoa(private_key.curve)
+    return HKDF(bi_mat_chung_ecdh(private_key, public_key), key_length, salt, SHA256, context=info)
+
+
+class BoThoaThuanECDH:
+    """ECDH cho một khóa bí mật cố định với bộ nhớ đệm LRU khóa phiên theo điểm đối tác."""
+
+    def __init__(self, private_key, cache_size: int = DEFAULT_CACHE_SIZE,
+                 key_length: int | None = None, info: bytes = HKDF_INFO):
+        if not private_key.has_private():
+            raise ValueError("Cần khóa bí mật ECC")
+        self.curve = private_key.curve
+        self._montgomery = la_montgomery(self.curve)
+        # X25519 / X448 đi qua key_agreement; đường cong NIST tách số mũ bí mật
+        # một lần, không đọc lại thuộc tính của khóa cho mỗi đối tác
+        self._private_key = private_key
+        self._d = None if self._montgomery else private_key.d
+        self.key_length = do_dai_khoa(self.curve) if key_length is None else key_length
+        self.info = info
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _ma_hoa_diem(self, point) -> bytes:
+        """Khóa cache: x | y (NIST) hoặc u (X25519 / X448) với độ dài cố định."""
+        size = point.size_in_bytes()
+        if self._montgomery:
+            return point.x.to_bytes(size)
+        return point.x.to_bytes(size) + point.y.to_bytes(size)
+
+    def khoa_chung(self, public_key) -> bytes:
+        """Khóa phiên với một khóa công khai (hoặc một EccPoint / EccXPoint) của đối tác."""
+        point = getattr(public_key, "pointQ", public_key)
+        if point.curve != self.curve:
+            raise ValueError("Khóa công khai không cùng đường cong")
+        cache_key = self._ma_hoa_diem(point)
+        with self._lock:
+            key = self._cache.get(cache_key)
+            if key is not None:
+                self.hits += 1
+                self._cache.move_to_end(cache_key)
+                return key
+            self.misses += 1
+        if self._montgomery:
+            if point is public_key:
+                public_key = ECC.EccKey(curve=self.curve, point=point)
+            key = khoa_chung_hkdf(self._private_key, public_key, self.key_length, self.info)
+        else:
+            key = dan_xuat_khoa_hkdf(self._d * point, self.key_length, self.info)
+        with self._lock:
+            self._cache[cache_key] = key
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return key
+
+    def khoa_chung_lo(self, public_keys) -> list:
+        """Khóa phiên cho nhiều khóa công khai đối tác, theo đúng thứ tự đầu vào."""
+        return [self.khoa_chung(pk) for pk in public_keys]
+
+    def thong_ke(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._cache), "cache_size": self.cache_size,
+                    "hits": self.hits, "misses": self.misses}
+
+
+def tinh_khoa_chung_ecdh_lo(private_key, public_keys, key_length: int | None = None,
+                            info: bytes = HKDF_INFO) -> list:
+    """Một khóa bí mật, nhiều khóa công khai đối tác (không giữ cache giữa các lần gọi)."""
+    agent = BoThoaThuanECDH(private_key, cache_size=max(1, len(public_keys)),
+                            key_length=key_length, info=info)
+    return agent.khoa_chung_lo(public_keys)
+
+
+def tinh_khoa_chung_ecdh_khoa_tam(private_keys, public_key, key_length: int | None = None,
+                                  info: bytes = HKDF_INFO) -> list:
+    """Một đối tác cố định, nhiều khóa tạm thời (ephemeral) phía mình."""
+    return [khoa_chung_hkdf(pk, public_key, key_length, info) for pk in private_keys]
+
+
+# --- ĐO HIỆU NĂNG ---
+
+def do_hieu_nang(so_doi_tac: int = 500, so_lan_lap: int = 4):
+    """So sánh keys/sec của tinh_khoa_chung_ecdh với BoThoaThuanECDH (lạnh và có cache)."""
+    server = tao_cap_khoa()
+    clients = [tao_cap_khoa().public_key() for _ in range(so_doi_tac)]
+    requests = clients * so_lan_lap  # mỗi client kết nối lại so_lan_lap lần
+
+    t0 = time.perf_counter()
+    for pk in requests:
+        tinh_khoa_chung_ecdh(server, pk)
+    goc = len(requests) / (time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    tinh_khoa_chung_ecdh_lo(server, clients)
+    lanh = len(clients) / (time.perf_counter() - t0)
+
+    agent = BoThoaThuanECDH(server)
+    t0 = time.perf_counter()
+    agent.khoa_chung_lo(requests)
+    co_cache = len(requests) / (time.perf_counter() - t0)
+
+    print(f"Đường cong {CURVE_NAME}, {so_doi_tac} đối tác x {so_lan_lap} lần kết nối")
+    print(f"tinh_khoa_chung_ecdh (mỗi lần gọi) : {goc:9.0f} khóa/s")
+    print(f"tinh_khoa_chung_ecdh_lo (không lặp) : {lanh:9.0f} khóa/s")
+    print(f"BoThoaThuanECDH (có cache LRU)      : {co_cache:9.0f} khóa/s ({co_cache / goc:.1f}x)")
+    print(f"Thống kê cache: {agent.thong_ke()}")
+
+
+if __name__ == '__main__':
+    alice = tao_cap_khoa()
+    bob = tao_cap_khoa()
+    k_a = BoThoaThuanECDH(alice).khoa_chung(bob.public_key())
+    k_b = BoThoaThuanECDH(bob).khoa_chung(alice.public_key())
+    print(f"Khóa chung HKDF của Alice: {k_a.hex()}")
+    print(f"Khóa chung HKDF của Bob  : {k_b.hex()}")
+    print(f"Khớp: {k_a == k_b}\n")
+    do_hieu_nang()
@@ -0,0 +1,312 @@
+"""
+Xử lý hàng loạt: mã hóa/giải mã/ký/xác minh nhiều thông điệp bằng một nhóm tiến trình.
+
+Ví dụ:
+    python xu_ly_hang_loat.py rsa encrypt thu_muc_vao -o thu_muc_ra
+    python xu_ly_hang_loat.py elgamal sign messages.txt -o signatures.txt --workers 4
+    python xu_ly_hang_loat.py ecdsa verify signatures.txt --key ecdsa-public.pem
+
+Đầu vào là một thư mục (mỗi file là một công việc) hoặc một file văn bản
+(mỗi dòng là một công việc, "-" để đọc stdin). Khóa được nạp đúng một lần
+trong mỗi tiến trình con (initializer), không gửi kèm từng công việc.
+"""
+import argparse
+import base64
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+RSA_DIR = BASE_DIR / "he_mat_RSA"
+ELGAMAL_DIR = BASE_DIR / "he_mat_ElGamal"
+
+# Các module ElGamal dùng import cùng thư mục (from doc_key_ElGamal import ...)
+for _d in (ELGAMAL_DIR, BASE_DIR):
+    if str(_d) not in sys.path:
+        sys.path.insert(0, str(_d))
+
+SUPPORTED = {
+    "rsa": ("encrypt", "decrypt"),
+    "elgamal": ("encrypt", "decrypt", "sign", "verify"),
+    "ecc": ("encrypt", "decrypt"),
+    "ecdsa": ("sign", "verify"),
+}
+SIG_SUFFIX = ".sig"
+ENC_SUFFIX = ".enc"
+# Nhãn HKDF của khóa AES-GCM cho mỗi công việc "ecc" (ECDH khóa tạm + người nhận)
+ECC_HKDF_INFO = b"xu_ly_hang_loat ecc job key"
+
+# --- TRẠNG THÁI CỦA TIẾN TRÌNH CON (khởi tạo một lần) ---
+
+_worker = {}
+
+
+def _init_worker(scheme: str, op: str, key_path: str | None, block_size: int):
+    """Nạp khóa và dựng sẵn đối tượng mã hóa/ký cho tiến trình con."""
+    _worker["scheme"] = scheme
+    _worker["op"] = op
+    _worker["handler"] = _make_handler(scheme, op, key_path, block_size)
+
+
+def _make_handler(scheme: str, op: str, key_path: str | None, block_size: int):
+    if scheme == "rsa":
+        from Crypto.PublicKey import RSA
+        from Crypto.Cipher import PKCS1_OAEP
+
+        default = RSA_DIR / ("public-key.pem" if op == "encrypt" else "private-key.pem")
+        key = RSA.import_key(Path(key_path or default).read_bytes())
+        cipher = PKCS1_OAEP.new(key)
+        return (lambda data, extra: cipher.encrypt(data)) if op == "encrypt" else \
+            (lambda data, extra: cipher.decrypt(data))
+
+    if scheme == "elgamal":
+        from doc_key_ElGamal import load_elgamal_keypair
+        from he_mat_ElGamal import elgamal_sign, elgamal_verify
+        from ma_hoa_luong_ElGamal import elgamal_encrypt_bytes, elgamal_decrypt_bytes
+
+        private_key, public_key = load_elgamal_keypair(Path(key_path) if key_path else ELGAMAL_DIR)
+        if op in ("decrypt", "sign") and private_key is None:
+            raise ValueError("Thiếu private key ElGamal")
+        width = (int(public_key.p).bit_length() + 7) // 8
+        if op == "encrypt":
+            return lambda data, extra: elgamal_encrypt_bytes(public_key, data, block_size)
+        if op == "decrypt":
+            return lambda data, extra: elgamal_decrypt_bytes(private_key, data)
+        if op == "sign":
+            def sign(data, extra):
+                r, s = elgamal_sign(private_key, data)
+                return r.to_bytes(width, "big") + s.to_bytes(width, "big")
+            return sign
+
+        def verify(data, extra):
+            if len(extra) != 2 * width:
+                return False
+            sig = (int.from_bytes(extra[:width], "big"), int.from_bytes(extra[width:], "big"))
+            return elgamal_verify(public_key, data, sig)
+        return verify
+
+    if key_path is None:
+        raise ValueError(f"Lược đồ {scheme} cần tham số --key (file PEM khóa ECC)")
+
+    from Crypto.PublicKey import ECC
+
+    key = ECC.import_key(Path(key_path).read_bytes())
+
+    if scheme == "ecc":
+        from Crypto.Cipher import AES
+        from he_mat_ECC import giai_ma_diem_cong_khai, ma_hoa_diem_cong_khai, tao_cap_khoa, ten_duong_cong
+        from thoa_thuan_khoa_ECDH import khoa_chung_hkdf
+
+        if op == "encrypt":
+            recipient = key.public_key()
+            curve = ten_duong_cong(recipient)
+
+            def encrypt(data, extra):
+                # Khóa tạm thời cho mỗi công việc, trên đường cong của người nhận;
+                # điểm công khai gửi kèm bản mã
+                ephemeral = tao_cap_khoa(curve)
+                shared = khoa_chung_hkdf(ephemeral, recipient, info=ECC_HKDF_INFO)
+                cipher = AES.new(shared, AES.MODE_GCM)
+                ciphertext, tag = cipher.encrypt_and_digest(data)
+                point = ma_hoa_diem_cong_khai(ephemeral)
+                return bytes([len(point)]) + point + cipher.nonce + tag + ciphertext
+            return encrypt
+
+        if not key.has_private():
+            raise ValueError("Giải mã ECC cần khóa bí mật")
+
+        def decrypt(data, extra):
+            plen = data[0]
+            point = giai_ma_diem_cong_khai(data[1:1 + plen], key.curve)
+            nonce = data[1 + plen:17 + plen]
+            tag = data[17 + plen:33 + plen]
+            shared = khoa_chung_hkdf(key, point, info=ECC_HKDF_INFO)
+            cipher = AES.new(shared, AES.MODE_GCM, nonce=nonce)
+            return cipher.decrypt_and_verify(data[33 + plen:], tag)
+        return decrypt
+
+    # ecdsa: tạo sẵn đối tượng DSS một lần cho mỗi tiến trình
+    from Crypto.Signature import DSS
+    from so_do_chu_ky_ECDSA import hash_cua_khoa
+
+    hash_algo = hash_cua_khoa(key)
+    if op == "sign":
+        if not key.has_private():
+            raise ValueError("Ký ECDSA cần khóa bí mật")
+        signer = DSS.new(key, "fips-186-3")
+        return lambda data, extra: signer.sign(hash_algo.new(data))
+
+    verifier = DSS.new(key.public_key(), "fips-186-3")
+
+    def verify(data, extra):
+        try:
+            verifier.verify(hash_algo.new(data), extra)
+            return True
+        except ValueError:
+            return False
+    return verify
+
+
+def _run_job(job):
+    """Chạy một công việc trong tiến trình con. job = (index, data, extra)."""
+    index, data, extra = job
+    start = time.perf_counter()
+    try:
+        result, error = _worker["handler"](data, extra), None
+    except (ValueError, KeyError, IndexError) as e:
+        result, error = None, str(e)
+    elapsed = time.perf_counter() - start
+    return index, result, error, os.getpid(), elapsed, len(data)
+
+
+# --- ĐỌC ĐẦU VÀO / GHI ĐẦU RA ---
+
+def _line_jobs(lines, op: str):
+    jobs = []
+    for i, line in enumerate(lines):
+        line = line.rstrip(b"\r\n")
+        if not line:
+            continue
+        if op == "decrypt":
+            jobs.append((i, base64.b64decode(line), None))
+        elif op == "verify":
+            message, _, sig = line.rpartition(b"\t")
+            jobs.append((i, message, base64.b64decode(sig)))
+        else:
+            jobs.append((i, line, None))
+    return jobs
+
+
+def _dir_jobs(folder: Path, op: str):
+    names = []
+    jobs = []
+    for path in sorted(p for p in folder.iterdir() if p.is_file()):
+        if op == "verify":
+            if path.suffix == SIG_SUFFIX:
+                continue
+            sig_path = path.with_name(path.name + SIG_SUFFIX)
+            if not sig_path.exists():
+                continue
+            extra = sig_path.read_bytes()
+        else:
+            extra = None
+        jobs.append((len(names), path.read_bytes(), extra))
+        names.append(path.name)
+    return names, jobs
+
+
+def _output_name(name: str, op: str) -> str:
+    if op == "encrypt":
+        return name + ENC_SUFFIX
+    if op == "decrypt":
+        return name[: -len(ENC_SUFFIX)] if name.endswith(ENC_SUFFIX) else name + ".dec"
+    return name + SIG_SUFFIX
+
+
+def _format_line(op: str, data: bytes, result) -> bytes:
+    if op == "sign":
+        return data + b"\t" + base64.b64encode(result)
+    if op == "decrypt":
+        return result
+    return base64.b64encode(result)
+
+
+def run_bulk(scheme: str, op: str, jobs, key_path=None, workers=None, chunksize=16, block_size=64 * 1024):
+    """Chạy các công việc trên nhóm tiến trình; trả về (kết quả theo index, thống kê theo pid)."""
+    if op not in SUPPORTED.get(scheme, ()):
+        raise ValueError(f"Lược đồ {scheme} không hỗ trợ thao tác {op}")
+    results = {}
+    stats = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(scheme, op, key_path, block_size)) as pool:
+        for index, result, error, pid, elapsed, nbytes in pool.map(_run_job, jobs, chunksize=chunksize):
+            results[index] = (result, error)
+            s = stats.setdefault(pid, {"jobs": 0, "bytes": 0, "busy": 0.0, "errors": 0})
+            s["jobs"] += 1
+            s["bytes"] += nbytes
+            s["busy"] += elapsed
+            s["errors"] += error is not None
+    return results, stats
+
+
+def print_stats(stats, wall: float):
+    print("\n[THÔNG LƯỢNG THEO TIẾN TRÌNH]", file=sys.stderr)
+    print(f"{'pid':>8} {'jobs':>8} {'lỗi':>6} {'bận(s)':>9} {'jobs/s':>10} {'MB/s':>8}", file=sys.stderr)
+    total_jobs = 0
+    for pid, s in sorted(stats.items()):
+        busy = s["busy"] or 1e-9
+        total_jobs += s["jobs"]
+        print(f"{pid:>8} {s['jobs']:>8} {s['errors']:>6} {s['busy']:>9.3f} "
+              f"{s['jobs'] / busy:>10.1f} {s['bytes'] / busy / 1e6:>8.2f}", file=sys.stderr)
+    print(f"Tổng: {total_jobs} công việc trong {wall:.3f}s "
+          f"({total_jobs / (wall or 1e-9):.1f} jobs/s)", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mã hóa/giải mã/ký/xác minh hàng loạt bằng nhóm tiến trình.")
+    parser.add_argument("scheme", choices=sorted(SUPPORTED))
+    parser.add_argument("op", choices=["encrypt", "decrypt", "sign", "verify"])
+    parser.add_argument("input", help="Thư mục, file mỗi dòng một thông điệp, hoặc '-' (stdin)")
+    parser.add_argument("-o", "--output", help="Thư mục/file đầu ra (mặc định: stdout với chế độ theo dòng)")
+    parser.add_argument("--key", help="File PEM (RSA/ECC) hoặc thư mục khóa (ElGamal)")
+    parser.add_argument("--workers", type=int, default=None, help="Số tiến trình (mặc định: số lõi CPU)")
+    parser.add_argument("--chunksize", type=int, default=16, help="Số công việc gửi cho tiến trình con mỗi lần")
+    parser.add_argument("--block-size", type=int, default=64 * 1024,
+                        help="Kích thước khối AES-GCM của mã hóa lai ElGamal")
+    args = parser.parse_args(argv)
+
+    if args.op not in SUPPORTED[args.scheme]:
+        parser.error(f"Lược đồ {args.scheme} chỉ hỗ trợ: {', '.join(SUPPORTED[args.scheme])}")
+
+    src = Path(args.input)
+    dir_mode = args.input != "-" and src.is_dir()
+    if dir_mode:
+        names, jobs = _dir_jobs(src, args.op)
+    else:
+        lines = sys.stdin.buffer.readlines() if args.input == "-" else src.read_bytes().splitlines()
+        jobs = _line_jobs(lines, args.op)
+    by_index = {job[0]: job[1] for job in jobs}
+
+    start = time.perf_counter()
+    results, stats = run_bulk(args.scheme, args.op, jobs, args.key, args.workers, args.chunksize, args.block_size)
+    wall = time.perf_counter() - start
+
+    failed = 0
+    if dir_mode:
+        out_dir = Path(args.output) if args.output else src
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for index, (result, error) in sorted(results.items()):
+            name = names[index]
+            if error is not None:
+                failed += 1
+                print(f"{name}: LỖI {error}", file=sys.stderr)
+            elif args.op == "verify":
+                failed += not result
+                print(f"{name}: {'HỢP LỆ' if result else 'KHÔNG HỢP LỆ'}")
+            else:
+                (out_dir / _output_name(name, args.op)).write_bytes(result)
+    else:
+        out = open(args.output, "wb") if args.output else sys.stdout.buffer
+        try:
+            for index, (result, error) in sorted(results.items()):
+                if error is not None:
+                    failed += 1
+                    print(f"dòng {index + 1}: LỖI {error}", file=sys.stderr)
+                    continue
+                if args.op == "verify":
+                    failed += not result
+                    out.write(b"OK\n" if result else b"FAIL\n")
+                else:
+                    out.write(_format_line(args.op, by_index[index], result) + b"\n")
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+
+    print_stats(stats, wall)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())